@@ -0,0 +1,150 @@
+"""
+목록 필터/정렬 벤치마크 (요약 컬럼 SQL vs analysis_result JSON 파싱)
+
+테스트 DB 에 밝기, 가로세로 비율이 다양한 분석 결과를 가진 행을 N개 만들고
+"어두운 이미지를 밝기 순으로 50개" 와 "가로로 긴(비율 1.5 이상) 이미지 수" 를
+    - json  : 모든 행의 analysis_result 를 읽어 Python 에서 필터/정렬 (요약 컬럼 이전 방식)
+    - column: 요약 컬럼 조건과 ORDER BY (인덱스)
+로 구하는 시간을 비교합니다. 쿼리 계획도 함께 출력합니다.
+
+사용법:
+    python benchmarks/bench_analysis_filters.py [--rows 100000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from image_analysis.models import UploadedImage, get_analysis_fields  # noqa: E402
+
+PAGE_SIZE = 50
+
+
+def sample_result():
+    width = random.choice([4000, 3000, 1080, 1920])
+    height = random.choice([3000, 4000, 1920, 1080])
+    brightness = round(random.uniform(0, 100), 2)
+    level = 'dark' if brightness < 30 else 'medium' if brightness < 70 else 'bright'
+    return {
+        'dimensions': {'width': width, 'height': height, 'aspect_ratio': round(width / height, 2)},
+        'format': 'JPEG',
+        'mode': 'RGB',
+        'colors': {
+            'dominant_colors': [{'rgb': [random.randrange(256) for _ in range(3)], 'count': 500 - k} for k in range(5)],
+            'unique_colors_count': random.randint(1, 10000),
+        },
+        'brightness': {'average': brightness, 'level': level, 'contrast': round(random.uniform(0, 50), 2)},
+        'is_grayscale': False,
+        'has_transparency': False,
+    }
+
+
+def create_rows(count):
+    batch = []
+    for i in range(count):
+        result = sample_result()
+        batch.append(UploadedImage(
+            image=f'uploads/2024/05/01/image{i}.jpg',
+            file_name=f'image{i}.jpg',
+            analysis_completed=True,
+            analysis_status=UploadedImage.AnalysisStatus.COMPLETED,
+            analysis_result=result,
+            **get_analysis_fields(result)
+        ))
+        if len(batch) == 5000:
+            UploadedImage.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UploadedImage.objects.bulk_create(batch)
+
+
+def dark_by_brightness_json():
+    rows = []
+    for pk, result in UploadedImage.objects.values_list('pk', 'analysis_result').iterator(chunk_size=2000):
+        brightness = result['brightness']
+        if brightness['level'] == 'dark':
+            rows.append((brightness['average'], pk))
+    rows.sort(reverse=True)
+    return [pk for _, pk in rows[:PAGE_SIZE]]
+
+
+def dark_by_brightness_column():
+    return list(
+        UploadedImage.objects.filter(brightness_level='dark')
+        .order_by('-brightness_average', '-id')
+        .values_list('pk', flat=True)[:PAGE_SIZE]
+    )
+
+
+def wide_count_json():
+    return sum(
+        1 for result in UploadedImage.objects.values_list('analysis_result', flat=True).iterator(chunk_size=2000)
+        if result['dimensions']['aspect_ratio'] >= 1.5
+    )
+
+
+def wide_count_column():
+    return UploadedImage.objects.filter(aspect_ratio__gte=1.5).count()
+
+
+def measure(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outcome = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), outcome
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    random.seed(0)
+    start = time.perf_counter()
+    create_rows(args.rows)
+    print(f'{args.rows} rows created in {time.perf_counter() - start:.1f}s')
+
+    print(f"{'query':<22} {'path':<7} {'ms':>9}")
+    cases = [
+        ('dark by brightness', dark_by_brightness_json, dark_by_brightness_column),
+        ('wide count', wide_count_json, wide_count_column),
+    ]
+    for name, json_path, column_path in cases:
+        json_ms, expected = measure(json_path, 1)
+        column_ms, outcome = measure(column_path, args.repeat)
+        assert outcome == expected, f'{name}: 결과가 다릅니다.'
+        print(f'{name:<22} {"json":<7} {json_ms * 1000:>9.1f}')
+        print(f'{name:<22} {"column":<7} {column_ms * 1000:>9.2f}')
+
+    plan = (
+        UploadedImage.objects.filter(brightness_level='dark')
+        .order_by('-brightness_average', '-id').values('pk')[:PAGE_SIZE].explain()
+    )
+    print('dark plan:', plan.replace('\n', ' | '))
+    plan = UploadedImage.objects.filter(aspect_ratio__gte=1.5).values('aspect_ratio').explain()
+    print('wide plan:', plan.replace('\n', ' | '))
+
+    runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""
+업로드 1건당 이미지 열기/디코드 횟수와 처리 시간 벤치마크
+
+기존 방식(단계마다 Image.open)과 분석 컨텍스트 방식(한 번 열고 공유)을 비교합니다.
+
+사용법:
+    python benchmarks/bench_analysis_pipeline.py [--runs 20] [--size 4000x3000]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from PIL import Image, ImageFile  # noqa: E402
+
+from image_analysis.utils import (  # noqa: E402
+    analyze_image, get_image_metadata, get_analysis_context,
+)
+
+
+class DecodeCounter:
+    """Image.open 호출과 실제 픽셀 디코드(load) 횟수를 센다."""
+
+    def __init__(self):
+        self.opens = 0
+        self.decodes = 0
+        self._open = Image.open
+        self._load = ImageFile.ImageFile.load
+
+    def __enter__(self):
+        counter = self
+
+        def counting_open(*args, **kwargs):
+            counter.opens += 1
+            return counter._open(*args, **kwargs)
+
+        def counting_load(img):
+            if img.tile:
+                counter.decodes += 1
+            return counter._load(img)
+
+        Image.open = counting_open
+        ImageFile.ImageFile.load = counting_load
+        return self
+
+    def __exit__(self, *exc):
+        Image.open = self._open
+        ImageFile.ImageFile.load = self._load
+
+
+def legacy_pipeline(image_file):
+    """컨텍스트 도입 이전 요청 처리 흐름 (validate -> create -> analyze -> EXIF)"""
+    Image.open(image_file).format
+    image_file.seek(0)
+    Image.open(image_file).size
+    image_file.seek(0)
+
+    img = Image.open(image_file)
+    rgb = img.convert('RGB') if img.mode != 'RGB' else img
+    rgb.resize((100, 100)).getcolors(10000)
+    gray = img.convert('L').resize((100, 100))
+    pixels = list(gray.getdata())
+    sum(pixels) / len(pixels)
+    image_file.seek(0)
+
+    img = Image.open(image_file)
+    if hasattr(img, '_getexif'):
+        img._getexif()
+    image_file.seek(0)
+
+
+def context_pipeline(image_file):
+    """분석 컨텍스트를 공유하는 현재 요청 처리 흐름"""
+    ctx = get_analysis_context(image_file)
+    ctx.format
+    analyze_image(ctx)
+    get_image_metadata(ctx)
+
+
+def make_fixture(fmt, size):
+    img = Image.effect_noise(size, 64).convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, fmt)
+    return buf.getvalue()
+
+
+def run(pipeline, data, runs):
+    timings = []
+    with DecodeCounter() as counter:
+        for _ in range(runs):
+            image_file = io.BytesIO(data)
+            start = time.perf_counter()
+            pipeline(image_file)
+            timings.append(time.perf_counter() - start)
+    return counter.opens / runs, counter.decodes / runs, sorted(timings)[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--size', default='4000x3000')
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split('x'))
+
+    print(f"{'format':<6} {'pipeline':<8} {'opens':>6} {'decodes':>8} {'p50 ms':>9}")
+    for fmt in ('JPEG', 'PNG', 'WEBP'):
+        data = make_fixture(fmt, size)
+        for name, pipeline in (('legacy', legacy_pipeline), ('context', context_pipeline)):
+            opens, decodes, p50 = run(pipeline, data, args.runs)
+            print(f"{fmt:<6} {name:<8} {opens:>6.1f} {decodes:>8.1f} {p50 * 1000:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+애니메이션 분석 벤치마크 (첫 프레임만 vs 모든 프레임 vs 프레임 샘플링)
+
+프레임마다 색이 바뀌는 애니메이션 GIF/WEBP 로
+    - first  : 첫 프레임만 분석 (샘플링 이전 방식, 애니메이션 정보 없음)
+    - all    : ImageSequence 로 모든 프레임을 디코드해 작업용 사본을 만듦 (예산 없는 방식)
+    - sampled: analyze_image (고르게 고른 프레임, IMAGE_ANIMATION_FRAME_BUDGET 까지만 디코드)
+의 처리 시간과 평균 밝기를 비교합니다. 모든 프레임의 평균 밝기를 기준값으로 함께 출력합니다.
+
+사용법:
+    python benchmarks/bench_animation.py [--frames 20,100,300] [--size 480x360] [--runs 5]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from PIL import Image, ImageDraw, ImageSequence  # noqa: E402
+
+from image_analysis.header import read_header  # noqa: E402
+from image_analysis.utils import WORKING_SIZE, analyze_image  # noqa: E402
+
+
+def make_fixture(fmt, frames, size):
+    """밝기가 점점 밝아지고 움직이는 도형이 있는 애니메이션"""
+    images = []
+    for index in range(frames):
+        level = int(255 * index / max(frames - 1, 1))
+        img = Image.new('RGB', size, (level, level // 2, 255 - level))
+        draw = ImageDraw.Draw(img)
+        x = index * 7 % size[0]
+        draw.ellipse((x, size[1] // 3, x + size[0] // 4, size[1] // 3 + size[0] // 4), fill=(255, 255, 255))
+        images.append(img)
+    buf = io.BytesIO()
+    images[0].save(buf, fmt, save_all=True, append_images=images[1:], duration=40, loop=0)
+    return buf.getvalue()
+
+
+def first_frame(data):
+    img = Image.open(io.BytesIO(data))
+    gray = img.convert('RGB').resize(WORKING_SIZE).convert('L')
+    return sum(gray.getdata()) / (WORKING_SIZE[0] * WORKING_SIZE[1]) / 255 * 100
+
+
+def all_frames(data):
+    img = Image.open(io.BytesIO(data))
+    total = 0
+    count = 0
+    for frame in ImageSequence.Iterator(img):
+        gray = frame.convert('RGB').resize(WORKING_SIZE).convert('L')
+        total += sum(gray.getdata())
+        count += 1
+    return total / (count * WORKING_SIZE[0] * WORKING_SIZE[1]) / 255 * 100
+
+
+def sampled(data):
+    image_file = io.BytesIO(data)
+    image_file.image_header = read_header(image_file)[0]
+    result = analyze_image(image_file)
+    return result['brightness']['average']
+
+
+def measure(func, data, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        value = func(data)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', default='20,100,300')
+    parser.add_argument('--size', default='480x360')
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    size = tuple(int(value) for value in args.size.split('x'))
+
+    print(f"{'format':<6} {'frames':>6} {'path':<8} {'ms':>8} {'brightness':>11}")
+    for fmt in ('GIF', 'WEBP'):
+        for frames in (int(value) for value in args.frames.split(',')):
+            data = make_fixture(fmt, frames, size)
+            for name, func in (('first', first_frame), ('all', all_frames), ('sampled', sampled)):
+                seconds, brightness = measure(func, data, args.runs)
+                print(f'{fmt:<6} {frames:>6} {name:<8} {seconds * 1000:>8.1f} {brightness:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+일괄 업로드 처리량 벤치마크 (images/sec)
+
+같은 이미지 N장을
+    - one-by-one: POST /api/images/ 를 N번 호출
+    - batch     : POST /api/images/batch/ 한 번 호출 (프로세스 풀 분석 + bulk_create)
+으로 업로드해 처리량을 비교합니다. 임시 MEDIA_ROOT 와 테스트 DB 를 사용하며,
+중복 제거가 끼어들지 않도록 이미지마다 내용이 다릅니다.
+
+사용법:
+    python benchmarks/bench_batch_upload.py [--images 32] [--size 1600x1200] [--workers 4]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+
+def make_images(count, size):
+    """서로 다른 내용의 JPEG 이미지 count 장"""
+    from PIL import Image
+
+    images = []
+    for i in range(count):
+        img = Image.effect_noise(size, 60).convert('RGB')
+        img.paste((random.randrange(256), random.randrange(256), random.randrange(256)), (0, 0, 64, 64))
+        buffer = io.BytesIO()
+        img.save(buffer, 'JPEG', quality=90)
+        images.append((f'image{i}.jpg', buffer.getvalue()))
+    return images
+
+
+def as_uploads(images):
+    uploads = []
+    for name, data in images:
+        upload = io.BytesIO(data)
+        upload.name = name
+        uploads.append(upload)
+    return uploads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--images', type=int, default=32)
+    parser.add_argument('--size', default='1600x1200')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='일괄 분석 프로세스 수 (0 이면 요청 프로세스에서 분석)')
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split('x'))
+
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from django.test.runner import DiscoverRunner
+
+    settings.MEDIA_ROOT = tempfile.mkdtemp()
+    settings.IMAGE_ANALYSIS_ASYNC = False
+    settings.IMAGE_ANALYSIS_BATCH_WORKERS = args.workers
+    settings.IMAGE_ANALYSIS_BATCH_MAX_FILES = max(args.images, 50)
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    from image_analysis.batch import batch_analyzer
+    from image_analysis.cache import analysis_cache
+
+    client = Client()
+    print(f'{args.images} images {size[0]}x{size[1]}, batch workers={args.workers}, cpus={os.cpu_count()}')
+
+    # 프로세스 풀 기동 시간은 첫 요청에만 들어가므로 미리 띄워 둠
+    client.post('/api/images/batch/', {'images': as_uploads(make_images(1, (32, 32)))}).getvalue()
+
+    rows = {}
+    for name in ('one-by-one', 'batch'):
+        uploads = as_uploads(make_images(args.images, size))
+        analysis_cache._local.clear()
+
+        start = time.perf_counter()
+        if name == 'one-by-one':
+            for upload in uploads:
+                response = client.post('/api/images/', {'image': upload})
+                assert response.status_code == 201, response.content
+        else:
+            response = client.post('/api/images/batch/', {'images': uploads})
+            assert response.status_code == 200
+            response.getvalue()
+        rows[name] = time.perf_counter() - start
+
+    print(f"{'path':<12} {'seconds':>8} {'images/sec':>11}")
+    for name, elapsed in rows.items():
+        print(f'{name:<12} {elapsed:>8.2f} {args.images / elapsed:>11.1f}')
+    print(f"speedup: {rows['one-by-one'] / rows['batch']:.2f}x")
+
+    batch_analyzer.shutdown()
+    runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+색상 검색 지연 시간 벤치마크 (ImageColor 인덱스 vs analysis_result JSON 스캔)
+
+테스트 DB 에 주요 색상과 색상 구간 행을 가진 이미지를 N개 만들고, 기준 색에 가까운 색의 비율이
+min_share 이상인 이미지를
+    - scan : 모든 행의 analysis_result 를 읽어 주요 색상을 Python 에서 검사 (인덱스 이전 방식)
+    - index: find_by_color (ImageColor (구간, 비율, 이미지) 인덱스)
+로 찾는 시간을 비교합니다. 쿼리 계획도 함께 출력합니다.
+
+사용법:
+    python benchmarks/bench_color_search.py [--rows 100000,1000000] [--tolerance 20] [--min-share 0.2]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db.models import Sum  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from image_analysis.color_index import bins_within, find_by_color, rgb_bin  # noqa: E402
+from image_analysis.models import ImageColor, UploadedImage  # noqa: E402
+
+# 이미지 색상을 고를 색 목록 (구간 번호는 미리 계산)
+PALETTE_SIZE = 512
+QUERY_COLORS = [(30, 64, 175), (220, 38, 38), (22, 163, 74), (250, 250, 250), (120, 120, 120)]
+
+
+def make_palette():
+    colors = [tuple(random.randrange(256) for _ in range(3)) for _ in range(PALETTE_SIZE)]
+    return [(color, rgb_bin(color)) for color in colors + QUERY_COLORS]
+
+
+def create_rows(start, count, palette):
+    images = []
+    colors = []
+    for i in range(start, start + count):
+        picked = random.sample(palette, random.randint(2, 5))
+        weights = [random.random() for _ in picked]
+        total = sum(weights)
+        shares = [weight / total for weight in weights]
+        images.append(UploadedImage(
+            image=f'uploads/2024/05/01/image{i}.jpg',
+            file_name=f'image{i}.jpg',
+            analysis_completed=True,
+            analysis_status=UploadedImage.AnalysisStatus.COMPLETED,
+            analysis_result={'colors': {'dominant_colors': [
+                {'rgb': list(color), 'count': int(share * 10000)} for (color, _), share in zip(picked, shares)
+            ]}},
+        ))
+        colors.append([(color_bin, share) for (_, color_bin), share in zip(picked, shares)])
+        if len(images) == 5000:
+            _flush(images, colors)
+            images, colors = [], []
+    if images:
+        _flush(images, colors)
+
+
+def _flush(images, colors):
+    UploadedImage.objects.bulk_create(images)
+    rows = {}
+    for image, image_colors in zip(images, colors):
+        for color_bin, share in image_colors:
+            rows[(image.pk, color_bin)] = rows.get((image.pk, color_bin), 0) + share
+    ImageColor.objects.bulk_create(
+        [ImageColor(image_id=pk, bin=color_bin, share=round(share, 4)) for (pk, color_bin), share in rows.items()],
+        batch_size=5000,
+    )
+
+
+def scan(rgb, tolerance, min_share, bin_cache):
+    """인덱스 없이: 모든 행의 JSON 을 읽어 주요 색상의 구간을 검사"""
+    bins = set(bins_within(rgb, tolerance))
+    matches = []
+    for pk, result in UploadedImage.objects.values_list('pk', 'analysis_result').iterator(chunk_size=2000):
+        total = 0
+        for color in result['colors']['dominant_colors']:
+            key = tuple(color['rgb'])
+            if key not in bin_cache:
+                bin_cache[key] = rgb_bin(key)
+            if bin_cache[key] in bins:
+                total += color['count'] / 10000
+        if total >= min_share:
+            matches.append((pk, total))
+    matches.sort(key=lambda match: (-match[1], -match[0]))
+    return matches[:20]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default='100000,1000000', help='쉼표로 구분한 행 수 (누적해서 생성)')
+    parser.add_argument('--tolerance', type=float, default=20)
+    parser.add_argument('--min-share', type=float, default=0.2)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    random.seed(0)
+    palette = make_palette()
+    bin_cache = {color: color_bin for color, color_bin in palette}
+
+    print(f"{'rows':>9} {'color':>8} {'scan ms':>9} {'index p50':>10} {'index max':>10} {'found':>6}")
+    created = 0
+    for rows in sorted(int(value) for value in args.rows.split(',')):
+        start = time.perf_counter()
+        create_rows(created, rows - created, palette)
+        created = rows
+        print(f'  ({rows} images, {ImageColor.objects.count()} color rows ready in {time.perf_counter() - start:.1f}s)')
+
+        for rgb in QUERY_COLORS:
+            start = time.perf_counter()
+            scanned = scan(rgb, args.tolerance, args.min_share, bin_cache)
+            scan_ms = (time.perf_counter() - start) * 1000
+
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                matches = find_by_color(ImageColor.objects.all(), rgb, args.tolerance, args.min_share, 20)
+                timings.append((time.perf_counter() - start) * 1000)
+            # 비율은 반올림되어 저장되므로 개수만 비교
+            assert len(matches) == len(scanned), (len(matches), len(scanned))
+
+            print(f"{rows:>9} {'%02x%02x%02x' % rgb:>8} {scan_ms:>9.1f} {statistics.median(timings):>10.2f} "
+                  f'{max(timings):>10.2f} {len(matches):>6}')
+
+    bins = bins_within(QUERY_COLORS[0], args.tolerance)
+    plan = ImageColor.objects.filter(bin__in=bins).values('image_id').annotate(total=Sum('share')).explain()
+    print('plan:', plan.replace('\n', ' | '))
+
+    runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+색상/밝기 분석 엔진 벤치마크 (PillowEngine vs NumpyEngine)
+
+100x100 작업용 사본 기준으로 평균, 히스토그램, 고유 색상 수 계산 시간을 비교합니다.
+
+사용법:
+    python benchmarks/bench_engines.py [--runs 500]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from image_analysis.engines import PillowEngine, NumpyEngine, np  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=500)
+    args = parser.parse_args()
+
+    engines = [PillowEngine()]
+    if np is not None:
+        engines.append(NumpyEngine())
+    else:
+        print('NumPy 가 설치되어 있지 않아 PillowEngine 만 측정합니다.')
+
+    rgb = Image.effect_noise((100, 100), 64).convert('RGB')
+    gray = rgb.convert('L')
+
+    print(f"{'engine':<8} {'mean us':>9} {'hist us':>9} {'unique us':>9}")
+    for engine in engines:
+        row = []
+        for fn in (lambda: engine.mean(gray),
+                   lambda: engine.histogram(gray),
+                   lambda: engine.unique_colors(rgb)):
+            row.append(timeit.timeit(fn, number=args.runs) / args.runs * 1e6)
+        print(f"{engine.name:<8} {row[0]:>9.1f} {row[1]:>9.1f} {row[2]:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
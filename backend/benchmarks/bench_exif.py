@@ -0,0 +1,114 @@
+"""
+EXIF 추출 벤치마크 (모든 태그 str() vs 허용 목록 태그만 타입 그대로)
+
+MakerNote 크기가 다른 JPEG 로
+    - legacy : _getexif() 로 모든 태그를 읽어 str() 로 저장 (이전 방식)
+    - compact: exif.extract_exif (허용 목록, 바이너리 제외, 필요한 IFD 만 파싱)
+의 추출 시간과 metadata / analysis_result JSON 크기를 비교합니다.
+원본 EXIF 바이트(ImageExif 에 따로 저장되는 크기)도 함께 출력합니다.
+
+사용법:
+    python benchmarks/bench_exif.py [--runs 200] [--maker-note 0,8192,32768,60000]
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from PIL import Image  # noqa: E402
+from PIL.ExifTags import TAGS  # noqa: E402
+from PIL.TiffImagePlugin import IFDRational  # noqa: E402
+
+from image_analysis.utils import analyze_image, get_analysis_context, get_image_metadata  # noqa: E402
+
+
+def make_fixture(maker_note):
+    """카메라 JPEG 와 비슷한 EXIF (촬영 정보, GPS, MakerNote, UserComment) 를 가진 이미지"""
+    exif = Image.Exif()
+    exif[0x010F] = 'Canon'
+    exif[0x0110] = 'Canon EOS R5'
+    exif[0x0112] = 1
+    exif[0x0131] = 'Firmware 1.8.1'
+    exif[0x0132] = '2024:05:01 10:20:30'
+    exif[0x011A] = IFDRational(72, 1)
+    exif[0x011B] = IFDRational(72, 1)
+    exif_ifd = exif.get_ifd(0x8769)
+    exif_ifd[0x829A] = IFDRational(1, 250)
+    exif_ifd[0x829D] = IFDRational(28, 10)
+    exif_ifd[0x8827] = 400
+    exif_ifd[0x9000] = b'0232'
+    exif_ifd[0x9003] = '2024:05:01 10:20:30'
+    exif_ifd[0x9209] = 16
+    exif_ifd[0x920A] = IFDRational(50, 1)
+    exif_ifd[0xA434] = 'RF24-105mm F4 L IS USM'
+    exif_ifd[0x9286] = b'ASCII\x00\x00\x00' + b' ' * 264
+    if maker_note:
+        exif_ifd[0x927C] = bytes(range(256)) * (maker_note // 256)
+    gps = exif.get_ifd(0x8825)
+    gps[1] = 'N'
+    gps[2] = (IFDRational(37, 1), IFDRational(33, 1), IFDRational(2010, 100))
+    gps[3] = 'E'
+    gps[4] = (IFDRational(126, 1), IFDRational(58, 1), IFDRational(4080, 100))
+
+    buf = io.BytesIO()
+    Image.effect_noise((1024, 768), 64).convert('RGB').save(buf, 'JPEG', exif=exif)
+    return buf.getvalue()
+
+
+def legacy_metadata(image_file):
+    """이전 get_image_metadata (태그마다 str())"""
+    img = Image.open(image_file)
+    exif_data = {}
+    for tag_id, value in (img._getexif() or {}).items():
+        exif_data[TAGS.get(tag_id, tag_id)] = str(value)
+    image_file.seek(0)
+    return exif_data
+
+
+def compact_metadata(image_file):
+    return get_image_metadata(get_analysis_context(image_file))
+
+
+def measure(extract, data, runs):
+    timings = []
+    for _ in range(runs):
+        image_file = io.BytesIO(data)
+        start = time.perf_counter()
+        metadata = extract(image_file)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), metadata
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--maker-note', default='0,8192,32768,60000', help='쉼표로 구분한 MakerNote 바이트 수')
+    args = parser.parse_args()
+
+    print(f"{'maker note':>10} {'raw exif':>9} {'path':<8} {'ms':>7} {'metadata B':>11} {'result B':>9}")
+    for maker_note in (int(value) for value in args.maker_note.split(',')):
+        data = make_fixture(maker_note)
+        ctx = get_analysis_context(io.BytesIO(data))
+        raw_size = len(ctx.raw_exif)
+        base = analyze_image(ctx)
+        base.pop('metadata', None)
+
+        for name, extract in (('legacy', legacy_metadata), ('compact', compact_metadata)):
+            seconds, metadata = measure(extract, data, args.runs)
+            metadata_size = len(json.dumps(metadata, ensure_ascii=False).encode())
+            result_size = len(json.dumps({**base, 'metadata': metadata}, ensure_ascii=False).encode())
+            print(f'{maker_note:>10} {raw_size:>9} {name:<8} {seconds * 1000:>7.3f} {metadata_size:>11} {result_size:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+업로드 검증 비용 벤치마크 (헤더 검사 vs Pillow 검증 + 디코드)
+
+    - bomb : 12000x12000 단색 PNG (압축 후 수백 KB, 디코드하면 144MP)
+    - photo: 4000x3000 JPEG
+    - junk : 이미지가 아닌 파일
+에 대해
+    - before: 이전 경로 (Django ImageField 검증 = Image.open + verify, 이후 분석 단계 디코드)
+    - header: check_header (헤더만 읽고 포맷/픽셀 예산 검사, 거절하면 디코드 없음)
+의 CPU 시간(중앙값)과 결과를 비교합니다.
+
+사용법:
+    python benchmarks/bench_header_validation.py [--repeat 5]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django import forms  # noqa: E402
+from django.core.files.uploadedfile import SimpleUploadedFile  # noqa: E402
+from PIL import Image  # noqa: E402
+
+from image_analysis.header import check_header  # noqa: E402
+from image_analysis.utils import ImageAnalysisContext  # noqa: E402
+
+
+def make_files():
+    bomb = io.BytesIO()
+    Image.new('L', (12000, 12000)).save(bomb, 'PNG')
+    photo = io.BytesIO()
+    Image.effect_noise((4000, 3000), 40).convert('RGB').save(photo, 'JPEG', quality=85)
+    return [
+        ('bomb', 'bomb.png', bomb.getvalue()),
+        ('photo', 'photo.jpg', photo.getvalue()),
+        ('junk', 'junk.jpg', os.urandom(200 * 1024)),
+    ]
+
+
+def before(name, data):
+    """이전 경로: verify 로 전체를 읽고, 통과하면 분석 단계에서 디코드"""
+    upload = SimpleUploadedFile(name, data)
+    try:
+        forms.ImageField().clean(upload)
+    except forms.ValidationError:
+        return 'rejected'
+    ImageAnalysisContext(io.BytesIO(data)).rgb_small
+    return 'decoded'
+
+
+def header(name, data):
+    _, rejection = check_header(io.BytesIO(data))
+    return f'rejected ({rejection[0]})' if rejection else 'accepted'
+
+
+def measure(func, name, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        outcome = func(name, data)
+        timings.append(time.process_time() - start)
+    return statistics.median(timings), outcome
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # 이전 경로에서는 Pillow 의 기본 한도(약 1.8억 픽셀)까지 디코드됨
+    Image.MAX_IMAGE_PIXELS = 2 * 89478485
+
+    print(f"{'file':<6} {'KB':>7} {'path':<7} {'cpu ms':>9}  outcome")
+    for case, name, data in make_files():
+        for path, func in (('before', before), ('header', header)):
+            elapsed, outcome = measure(func, name, data, args.repeat)
+            print(f'{case:<6} {len(data) / 1024:>7.0f} {path:<7} {elapsed * 1000:>9.2f}  {outcome}')
+
+
+if __name__ == '__main__':
+    main()
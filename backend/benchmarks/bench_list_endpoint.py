@@ -0,0 +1,172 @@
+"""
+이미지 목록 API 응답 시간/최대 메모리 벤치마크
+
+테스트 DB 에 EXIF 문자열이 포함된 분석 결과를 가진 행을 N개 만들고
+    - before   : 전체 행을 UploadedImageSerializer 로 직렬화 (페이지네이션 이전의 list)
+    - first    : GET /api/images/ 첫 페이지 (analysis_result defer)
+    - deep     : 중간 지점 커서로 GET /api/images/?cursor=...
+    - fields   : GET /api/images/?fields=id,file_name,mood
+의 응답 시간과 tracemalloc 최대 할당량을 비교합니다.
+
+사용법:
+    python benchmarks/bench_list_endpoint.py [--rows 100000] [--page-size 50] [--repeat 5]
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db.models import Q  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIRequestFactory  # noqa: E402
+
+from image_analysis.models import UploadedImage  # noqa: E402
+from image_analysis.pagination import KeysetPagination  # noqa: E402
+from image_analysis.serializers import UploadedImageSerializer  # noqa: E402
+
+
+def sample_result(i):
+    """EXIF 메타데이터(MakerNote 등 문자열화된 바이너리 포함)가 있는 분석 결과"""
+    return {
+        'dimensions': {'width': 4000, 'height': 3000, 'aspect_ratio': 1.33},
+        'format': 'JPEG',
+        'mode': 'RGB',
+        'file_size_bytes': 2456789,
+        'file_size_kb': 2399.21,
+        'colors': {
+            'dominant_colors': [{'rgb': [i % 256, 120, 80], 'count': 500 - k} for k in range(5)],
+            'unique_colors_count': 8123,
+        },
+        'brightness': {'average': 52.1, 'level': 'medium', 'contrast': 21.3},
+        'is_grayscale': False,
+        'has_transparency': False,
+        'metadata': {
+            'Make': 'Canon',
+            'Model': 'Canon EOS 5D Mark IV',
+            'DateTime': '2024:05:01 12:00:00',
+            'MakerNote': str(bytes(range(256)) * 2),
+            'ExifVersion': "b'0231'",
+        },
+    }
+
+
+def create_rows(count):
+    now = timezone.now()
+    batch = []
+    for i in range(count):
+        batch.append(UploadedImage(
+            image=f'uploads/2024/05/01/image{i}.jpg',
+            uploaded_at=now - timedelta(seconds=count - i),
+            file_name=f'image{i}.jpg',
+            file_size=2456789,
+            image_width=4000,
+            image_height=3000,
+            analysis_completed=True,
+            analysis_status=UploadedImage.AnalysisStatus.COMPLETED,
+            analysis_result=sample_result(i),
+            mood='balanced',
+        ))
+        if len(batch) == 5000:
+            UploadedImage.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UploadedImage.objects.bulk_create(batch)
+
+
+def measure(func, repeat):
+    """응답 시간(중앙값)과 최대 메모리 (tracemalloc 이 느리게 만들므로 시간은 따로 잼)"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        size = func()
+        timings.append(time.perf_counter() - start)
+    elapsed = statistics.median(timings)
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    settings.IMAGE_LIST_PAGE_SIZE = args.page_size
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    start = time.perf_counter()
+    create_rows(args.rows)
+    print(f'{args.rows} rows created in {time.perf_counter() - start:.1f}s')
+
+    client = Client()
+    request = APIRequestFactory().get('/api/images/')
+
+    def before():
+        serializer = UploadedImageSerializer(UploadedImage.objects.all(), many=True, context={'request': request})
+        return len(JSONRenderer().render(serializer.data))
+
+    middle = UploadedImage.objects.order_by('-uploaded_at', '-id')[args.rows // 2]
+    middle_cursor = KeysetPagination().encode_cursor(middle, 'uploaded_at')
+
+    def get(url):
+        def run():
+            response = client.get(url)
+            assert response.status_code == 200, response.content
+            return len(response.content)
+        return run
+
+    # URL 해석, 뷰 import 등 첫 요청 비용은 제외
+    client.get('/api/images/?page_size=1')
+
+    cases = [
+        ('before', before),
+        ('first', get('/api/images/')),
+        ('deep', get(f'/api/images/?cursor={middle_cursor}')),
+        ('fields', get('/api/images/?fields=id,file_name,mood')),
+    ]
+
+    print(f"{'case':<8} {'ms':>10} {'peak MB':>10} {'bytes':>12}")
+    for name, func in cases:
+        # 전체 직렬화는 한 번만, 페이지 요청은 여러 번 재서 중앙값 사용
+        elapsed, peak, size = measure(func, 1 if name == 'before' else args.repeat)
+        print(f'{name:<8} {elapsed * 1000:>10.1f} {peak / 1024 / 1024:>10.2f} {size:>12}')
+
+    # 깊은 페이지가 인덱스를 타는지 확인
+    uploaded_at, pk = middle.uploaded_at, middle.pk
+    plan = (
+        UploadedImage.objects.order_by('-uploaded_at', '-id')
+        .filter(Q(uploaded_at__lte=uploaded_at), Q(uploaded_at__lt=uploaded_at) | Q(pk__lt=pk))
+        .defer('analysis_result')[:args.page_size + 1]
+        .explain()
+    )
+    print('deep page plan:', plan.replace('\n', ' | '))
+
+    runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+"""
+대표 색상 벤치마크 (가장 많은 RGB 값 vs 중앙값 분할 vs 옥트리 + k-means 팔레트)
+
+100x100 작업용 사본으로
+    - legacy   : 가장 많이 나온 정확한 RGB 값 상위 5개 (이전 analyze_colors)
+    - mediancut: Image.quantize(5, MEDIANCUT)
+    - palette  : utils.extract_palette (옥트리 16색 + k-means 보정 후 LAB 거리가 가까운 색 합침)
+의 계산 시간, 고른 색 사이의 최소 LAB 거리(ΔE, 클수록 서로 구분됨), 고른 색이 대표하는 픽셀 비율을 비교합니다.
+
+사용법:
+    python benchmarks/bench_palette.py [--runs 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from itertools import combinations
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFilter  # noqa: E402
+
+from image_analysis.utils import WORKING_SIZE, extract_palette, lab_distance, to_lab  # noqa: E402
+
+
+def make_photo():
+    """하늘/바다 그라데이션에 노이즈가 있는 사진 같은 이미지"""
+    size = (1200, 900)
+    sky = Image.merge('RGB', (
+        Image.linear_gradient('L').resize(size).point(lambda value: 90 + value // 3),
+        Image.linear_gradient('L').resize(size).point(lambda value: 140 + value // 4),
+        Image.new('L', size, 230),
+    ))
+    noise = Image.effect_noise(size, 18).convert('RGB')
+    img = Image.blend(sky, noise, 0.15)
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((0, 600, 1200, 900), fill=(194, 170, 120))
+    draw.ellipse((800, 100, 950, 250), fill=(250, 220, 120))
+    return img.filter(ImageFilter.GaussianBlur(2))
+
+
+def make_noisy():
+    """고유 색이 아주 많은 이미지"""
+    size = (1200, 900)
+    return Image.merge('RGB', [Image.effect_noise(size, 90) for _ in range(3)])
+
+
+def make_flat():
+    """단색 도형 몇 개 (안티앨리어싱 가장자리)"""
+    random.seed(1)
+    img = Image.new('RGB', (1200, 900), (245, 245, 240))
+    draw = ImageDraw.Draw(img)
+    for color in ((220, 40, 60), (30, 90, 200), (40, 160, 90), (30, 30, 30)):
+        x, y = random.randrange(900), random.randrange(600)
+        draw.ellipse((x, y, x + 300, y + 300), fill=color)
+    return img.resize((600, 450), Image.LANCZOS)
+
+
+def legacy(rgb, k=5):
+    colors = rgb.getcolors(rgb.width * rgb.height)
+    return sorted(colors, key=lambda item: item[0], reverse=True)[:k]
+
+
+def mediancut(rgb, k=5):
+    quantized = rgb.quantize(k, method=Image.Quantize.MEDIANCUT)
+    palette = quantized.getpalette()
+    return [
+        (count, tuple(palette[index * 3:index * 3 + 3]))
+        for count, index in sorted(quantized.getcolors(k), reverse=True)
+    ]
+
+
+def min_distance(colors):
+    """고른 색들 사이의 최소 ΔE"""
+    if len(colors) < 2:
+        return float('nan')
+    swatch = Image.new('RGB', (len(colors), 1))
+    swatch.putdata([color for _, color in colors])
+    labs = list(to_lab(swatch).getdata())
+    return min(lab_distance(first, second) for first, second in combinations(labs, 2))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    fixtures = {'photo': make_photo(), 'noisy': make_noisy(), 'flat': make_flat()}
+    methods = {'legacy': legacy, 'mediancut': mediancut, 'palette': extract_palette}
+
+    print(f"{'image':<6} {'method':<10} {'ms':>7} {'colors':>6} {'min ΔE':>7} {'coverage':>9}")
+    for name, img in fixtures.items():
+        rgb = img.resize(WORKING_SIZE, reducing_gap=3.0)
+        pixel_count = rgb.width * rgb.height
+        for method_name, method in methods.items():
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                colors = method(rgb, 5)
+                timings.append(time.perf_counter() - start)
+            coverage = sum(count for count, _ in colors) / pixel_count
+            print(
+                f'{name:<6} {method_name:<10} {statistics.median(timings) * 1000:>7.3f} {len(colors):>6} '
+                f'{min_distance(colors):>7.1f} {coverage:>9.1%}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+축소 디코드(draft/reduce) 메모리/지연 시간 벤치마크
+
+JPEG, PNG, WEBP 픽스처를 만들어 전체 디코드 후 축소(legacy)와
+분석 컨텍스트의 축소 디코드(reduced)를 비교합니다.
+최대 RSS 를 정확히 재기 위해 각 측정은 별도 프로세스에서 실행됩니다.
+
+사용법:
+    python benchmarks/bench_reduced_decode.py [--size 4000x3000] [--runs 5]
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from PIL import Image  # noqa: E402
+
+
+def legacy(path):
+    img = Image.open(path)
+    rgb = img.convert('RGB') if img.mode != 'RGB' else img
+    rgb.resize((100, 100))
+    img.convert('L').resize((100, 100))
+
+
+def reduced(path):
+    from image_analysis.utils import ImageAnalysisContext
+
+    with open(path, 'rb') as f:
+        ctx = ImageAnalysisContext(f)
+        ctx.rgb_small
+        ctx.gray_small
+
+
+def peak_rss_kb():
+    """현재 프로세스의 최대 RSS (KB). ru_maxrss 는 exec 이전 부모 값을 물려받으므로 VmHWM 우선"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(mode, path, runs):
+    """자식 프로세스에서 실행: 한 번 측정하고 'p50_ms max_rss_kb' 를 출력"""
+    fn = legacy if mode == 'legacy' else reduced
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(path)
+        timings.append(time.perf_counter() - start)
+    rss_kb = peak_rss_kb()
+    print(f"{sorted(timings)[len(timings) // 2] * 1000:.1f} {rss_kb}")
+
+
+def make_fixture(fmt, size, directory):
+    img = Image.radial_gradient('L').resize(size).convert('RGB')
+    img = Image.blend(img, Image.effect_noise(size, 40).convert('RGB'), 0.3)
+    path = os.path.join(directory, f'fixture.{fmt.lower()}')
+    img.save(path, fmt)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', default='4000x3000')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child[0], args.child[1], args.runs)
+        return
+
+    size = tuple(int(v) for v in args.size.split('x'))
+    print(f'size={args.size}')
+    print(f"{'format':<6} {'mode':<8} {'p50 ms':>9} {'max RSS MB':>11}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in ('JPEG', 'PNG', 'WEBP'):
+            path = make_fixture(fmt, size, directory)
+            for mode in ('legacy', 'reduced'):
+                out = subprocess.run(
+                    [sys.executable, __file__, '--runs', str(args.runs), '--child', mode, path],
+                    capture_output=True, text=True, check=True,
+                )
+                p50, rss_kb = out.stdout.split()
+                print(f"{fmt:<6} {mode:<8} {float(p50):>9.1f} {int(rss_kb) / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
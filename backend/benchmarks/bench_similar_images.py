@@ -0,0 +1,128 @@
+"""
+유사 이미지 검색 지연 시간 벤치마크 (지각 해시 multi-index vs 전체 스캔)
+
+테스트 DB 에 무작위 64비트 지각 해시를 가진 행을 N개 만들고 (기준 해시에서 비트 몇 개만 다른
+유사 이미지 포함), 해밍 거리 d 이내의 이미지를
+    - scan : 모든 행의 해시를 읽어 거리 계산 (인덱스 없이 찾는 경우)
+    - index: find_similar (16비트 조각 인덱스로 후보만 읽음)
+로 찾는 시간을 비교합니다. 무작위 해시는 실제 사진보다 고르게 퍼져 있으므로
+실제 데이터에서는 후보 수가 이보다 많을 수 있습니다.
+
+사용법:
+    python benchmarks/bench_similar_images.py [--rows 100000,1000000] [--distance 8] [--queries 50]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+from image_analysis.models import UploadedImage  # noqa: E402
+from image_analysis.similarity import (  # noqa: E402
+    candidate_filter, find_similar, get_similarity_fields, hamming_distance,
+)
+
+# 기준 해시마다 심어 둘 유사 이미지 수
+NEAR_DUPLICATES = 5
+
+
+def near(value, bits):
+    """value 에서 무작위 비트 bits 개를 뒤집은 해시"""
+    for position in random.sample(range(64), bits):
+        value ^= 1 << position
+    return value
+
+
+def create_rows(start, count, queries, distance):
+    batch = []
+    for i in range(start, start + count):
+        value = random.getrandbits(64)
+        # 앞쪽 행은 기준 해시의 유사 이미지로 채움
+        index = i - start
+        if index < len(queries) * NEAR_DUPLICATES:
+            value = near(queries[index // NEAR_DUPLICATES], random.randint(1, distance))
+        batch.append(UploadedImage(
+            image=f'uploads/2024/05/01/image{i}.jpg',
+            file_name=f'image{i}.jpg',
+            analysis_completed=True,
+            analysis_status=UploadedImage.AnalysisStatus.COMPLETED,
+            **get_similarity_fields({'perceptual_hash': f'{value:016x}'})
+        ))
+        if len(batch) == 5000:
+            UploadedImage.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        UploadedImage.objects.bulk_create(batch)
+
+
+def scan(value, distance):
+    matches = []
+    for pk, candidate_hash in UploadedImage.objects.values_list('pk', 'perceptual_hash').iterator(chunk_size=2000):
+        if hamming_distance(value, int(candidate_hash, 16)) <= distance:
+            matches.append(pk)
+    return matches
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', default='100000,1000000', help='쉼표로 구분한 행 수 (누적해서 생성)')
+    parser.add_argument('--distance', type=int, default=8)
+    parser.add_argument('--queries', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    random.seed(0)
+    queries = [random.getrandbits(64) for _ in range(args.queries)]
+
+    print(f"{'rows':>9} {'scan ms':>9} {'index p50':>10} {'index p99':>10} {'candidates':>11} {'found':>6}")
+    created = 0
+    for rows in sorted(int(value) for value in args.rows.split(',')):
+        start = time.perf_counter()
+        create_rows(created, rows - created, queries if created == 0 else [], args.distance)
+        created = rows
+        print(f'  ({rows} rows ready in {time.perf_counter() - start:.1f}s)')
+
+        # 전체 스캔은 느리므로 한 번만
+        start = time.perf_counter()
+        scanned = scan(queries[0], args.distance)
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        found = 0
+        for value in queries:
+            start = time.perf_counter()
+            matches = find_similar(UploadedImage.objects.all(), f'{value:016x}', args.distance, 20)
+            timings.append((time.perf_counter() - start) * 1000)
+            found += len(matches)
+        timings.sort()
+        p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+        candidates = UploadedImage.objects.filter(candidate_filter(queries[0], args.distance)).count()
+        indexed = {pk for pk, _ in find_similar(UploadedImage.objects.all(), f'{queries[0]:016x}', args.distance, 10 ** 6)}
+        assert indexed == set(scanned), 'index 결과가 전체 스캔과 다릅니다.'
+
+        print(f'{rows:>9} {scan_ms:>9.1f} {statistics.median(timings):>10.2f} {p99:>10.2f} '
+              f'{candidates:>11} {found / len(queries):>6.1f}')
+
+    plan = UploadedImage.objects.filter(candidate_filter(queries[0], args.distance)).values('pk').explain()
+    print('candidate plan:', plan.replace('\n', ' | ')[:300])
+
+    runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
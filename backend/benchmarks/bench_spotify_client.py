@@ -0,0 +1,74 @@
+"""
+Spotify HTTP 클라이언트 지연 시간 벤치마크
+
+로컬 가짜 Spotify 서버를 대상으로 fetch_tracks() (업스트림 호출) 의 p50/p99 지연 시간을 잽니다.
+    - before: 요청마다 새 커넥션 (requests.get/post 직접 호출과 동일)
+    - after : SpotifyService 의 keep-alive 커넥션 풀 세션
+
+사용법:
+    python benchmarks/bench_spotify_client.py [--requests 500] [--latency 0.002]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import requests  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from benchmarks.fake_spotify import FakeSpotifyServer  # noqa: E402
+from image_analysis.spotify_service import SpotifyService  # noqa: E402
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(int(len(values) * pct / 100), len(values) - 1)]
+
+
+def run(service, count):
+    timings = []
+    for _ in range(count):
+        start = time.perf_counter()
+        service.fetch_tracks('bright_warm')
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0, help='가짜 서버 응답 지연(초)')
+    args = parser.parse_args()
+
+    server = FakeSpotifyServer(latency=args.latency).start()
+    settings.SPOTIFY_CLIENT_ID = 'bench'
+    settings.SPOTIFY_CLIENT_SECRET = 'bench'
+    settings.SPOTIFY_TOKEN_URL = server.url + '/api/token'
+    settings.SPOTIFY_API_URL = server.url + '/v1'
+
+    print(f"{'client':<8} {'p50 ms':>8} {'p99 ms':>8} {'connections':>12}")
+    for name in ('before', 'after'):
+        service = SpotifyService()
+        if name == 'before':
+            # requests 모듈 함수는 호출마다 새 세션(= 새 커넥션)을 만든다
+            service.session = requests.api
+        service.get_access_token()
+
+        connections_before = server.counts['connections']
+        timings = run(service, args.requests)
+        connections = server.counts['connections'] - connections_before
+        print(f"{name:<8} {percentile(timings, 50) * 1000:>8.2f} "
+              f"{percentile(timings, 99) * 1000:>8.2f} {connections:>12}")
+
+    server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+"""
+아주 큰 이미지 분석의 최대 메모리 벤치마크 (전체 디코드 vs 스트립 단위 디코드)
+
+10MP ~ 200MP RGB PNG (선택 시 BMP) 를 만들어
+    - full     : 전체를 디코드한 뒤 reduce() (IMAGE_STREAMING_MIN_PIXELS 를 아주 크게 설정, 이전 방식)
+    - streaming: streaming.stream_reduce 로 스트립 단위 디코드
+로 analyze_image 를 실행하고, 크기/방식마다 새 프로세스에서 처리 시간과 최대 RSS 증가량을 잽니다.
+두 방식의 평균 밝기와 주요 색상이 같은지도 함께 출력합니다.
+
+픽스처는 행 단위로 압축해 쓰므로 만들 때도 전체 픽셀을 메모리에 올리지 않습니다.
+(업로드 검증의 IMAGE_UPLOAD_MAX_PIXELS 와 Pillow 의 MAX_IMAGE_PIXELS 는 이 벤치마크에서 적용하지 않음)
+
+사용법:
+    python benchmarks/bench_streaming_decode.py [--megapixels 10,50,100,200] [--formats PNG,BMP] [--skip-full-above 0]
+"""
+import argparse
+import json
+import os
+import resource
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+ASPECT = 4 / 3
+
+
+def fixture_size(megapixels):
+    height = int((megapixels * 1000 * 1000 / ASPECT) ** 0.5)
+    return int(height * ASPECT), height
+
+
+def _row(base, y, row_bytes):
+    """두 행마다 조금씩 밀린 그라데이션 (행 전체를 새로 만들지 않고 잘라 붙임)"""
+    shift = (y // 2 * 3 * 7) % row_bytes
+    return base[shift:shift + row_bytes]
+
+
+def _base_row(width):
+    row = bytearray()
+    for x in range(width):
+        row += bytes((x * 255 // width, (x * 7) % 256, 255 - x * 255 // width))
+    return bytes(row * 2)
+
+
+def _png_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def write_png(path, width, height):
+    base = _base_row(width)
+    row_bytes = width * 3
+    compressor = zlib.compressobj(1)
+    with open(path, 'wb') as out:
+        out.write(b'\x89PNG\r\n\x1a\n')
+        out.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        pending = b''
+        up_row = b'\x02' + b'\x00' * row_bytes
+        for y in range(height):
+            # 홀수 행은 위 행과 같으므로 Up 필터(차이 0)로 저장 (스트립 경계의 필터 처리도 함께 확인)
+            pending += compressor.compress(up_row if y % 2 else b'\x00' + _row(base, y, row_bytes))
+            if len(pending) >= 1 << 20:
+                out.write(_png_chunk(b'IDAT', pending))
+                pending = b''
+        pending += compressor.flush()
+        out.write(_png_chunk(b'IDAT', pending))
+        out.write(_png_chunk(b'IEND', b''))
+
+
+def write_bmp(path, width, height):
+    base = _base_row(width)
+    row_bytes = width * 3
+    stride = (row_bytes + 3) & ~3
+    padding = b'\x00' * (stride - row_bytes)
+    with open(path, 'wb') as out:
+        out.write(b'BM' + struct.pack('<IHHI', 54 + stride * height, 0, 0, 54))
+        out.write(struct.pack('<IiiHHIIiiII', 40, width, height, 1, 24, 0, stride * height, 2835, 2835, 0, 0))
+        # 아래쪽 행부터 저장
+        for y in range(height - 1, -1, -1):
+            out.write(_row(base, y, row_bytes) + padding)
+
+
+def child(path, mode):
+    import django
+
+    django.setup()
+
+    from django.conf import settings
+    from PIL import Image
+
+    from image_analysis.header import read_header
+    from image_analysis.utils import analyze_image
+
+    Image.MAX_IMAGE_PIXELS = None
+    if mode == 'full':
+        settings.IMAGE_STREAMING_MIN_PIXELS = 10 ** 12
+
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    with open(path, 'rb') as image_file:
+        image_file.image_header = read_header(image_file)[0]
+        image_file.seek(0)
+        start = time.perf_counter()
+        result = analyze_image(image_file)
+        seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'ms': seconds * 1000,
+        'peak_mb': (peak - baseline) / 1024,
+        'brightness': result['brightness']['average'],
+        'colors': ['#%02x%02x%02x' % tuple(color['rgb']) for color in result['colors']['dominant_colors'][:3]],
+    }))
+
+
+def run_child(path, mode):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', path, '--mode', mode],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--megapixels', default='10,50,100,200')
+    parser.add_argument('--formats', default='PNG')
+    parser.add_argument('--skip-full-above', type=int, default=0, help='이 MP 보다 큰 이미지는 full 을 건너뜀 (0 이면 모두 실행)')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.mode)
+        return
+
+    writers = {'PNG': write_png, 'BMP': write_bmp}
+    print(f"{'format':<6} {'MP':>5} {'size':>12} {'file MB':>8} {'path':<10} {'ms':>9} {'peak MB':>8} {'brightness':>11} colors")
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in args.formats.split(','):
+            for megapixels in (int(value) for value in args.megapixels.split(',')):
+                width, height = fixture_size(megapixels)
+                path = os.path.join(directory, f'{megapixels}mp.{fmt.lower()}')
+                writers[fmt](path, width, height)
+                file_mb = os.path.getsize(path) / 1024 / 1024
+
+                modes = ['streaming']
+                if not args.skip_full_above or megapixels <= args.skip_full_above:
+                    modes.insert(0, 'full')
+                for mode in modes:
+                    stats = run_child(path, mode)
+                    print(
+                        f'{fmt:<6} {megapixels:>5} {f"{width}x{height}":>12} {file_mb:>8.1f} {mode:<10} '
+                        f'{stats["ms"]:>9.1f} {stats["peak_mb"]:>8.1f} {stats["brightness"]:>11.2f} '
+                        f'{",".join(stats["colors"])}'
+                    )
+                os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+업로드 핸들러 메모리/읽기량 벤치마크
+
+10MB 크기의 이미지 하나를
+    - default  : Django 기본 핸들러 (MemoryFileUpload + TemporaryFileUpload)
+    - streaming: StreamingImageUploadHandler (받으면서 해시/포맷 판별, 임시 파일 mmap, rename 저장)
+로 POST /api/images/ 에 업로드해 (요청 본문은 파일에서 WSGI 핸들러로 스트리밍) 응답 시간, tracemalloc 최대 할당량,
+업로드 한 건 처리 중 read() 시스템 콜로 읽은 바이트 수(요청 본문 읽기 포함)를 비교합니다.
+
+사용법:
+    python benchmarks/bench_upload_handler.py [--megabytes 10] [--repeat 3]
+"""
+import argparse
+import gc
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart  # noqa: E402
+from django.test.runner import DiscoverRunner  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from PIL import Image  # noqa: E402
+
+HANDLERS = {
+    'default': [
+        'django.core.files.uploadhandler.MemoryFileUploadHandler',
+        'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+    ],
+    'streaming': ['image_analysis.upload_handlers.StreamingImageUploadHandler'],
+}
+
+
+def make_image(megabytes):
+    """무작위 픽셀이라 압축되지 않는, 약 megabytes MB 크기의 PNG"""
+    edge = int((megabytes * 1024 * 1024 / 3) ** 0.5)
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', (edge, edge), os.urandom(edge * edge * 3)).save(buffer, 'PNG', compress_level=1)
+    return buffer.getvalue()
+
+
+def write_request_body(directory, data, index):
+    """multipart 요청 본문을 파일로 만들어 둠 (요청 본문을 메모리에 올리지 않고 스트리밍하도록)"""
+    body = io.BytesIO(data + index.to_bytes(4, 'big'))
+    body.name = f'image{index}.png'
+    path = os.path.join(directory, f'body{index}')
+    with open(path, 'wb') as f:
+        f.write(encode_multipart(BOUNDARY, {'image': body}))
+    return path
+
+
+def read_bytes():
+    """이 프로세스가 read() 계열 시스템 콜로 읽은 누적 바이트 수 (Linux /proc 기준, 없으면 0)"""
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                if line.startswith('rchar:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--megabytes', type=float, default=10)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    base_dir = tempfile.mkdtemp()
+    settings.MEDIA_ROOT = os.path.join(base_dir, 'media')
+    settings.FILE_UPLOAD_TEMP_DIR = os.path.join(base_dir, '.upload_tmp')
+    os.makedirs(settings.FILE_UPLOAD_TEMP_DIR)
+    settings.IMAGE_UPLOAD_MAX_SIZE = int((args.megabytes + 1) * 1024 * 1024)
+    settings.IMAGE_ANALYSIS_ASYNC = False
+    settings.IMAGE_THUMBNAIL_EAGER = False
+    setup_test_environment()
+    runner = DiscoverRunner(verbosity=0)
+    old_config = runner.setup_databases()
+
+    data = make_image(args.megabytes)
+    print(f'upload size: {len(data) / 1024 / 1024:.2f}MB')
+    handler = WSGIHandler()
+    bodies = tempfile.mkdtemp()
+
+    def upload(index):
+        # 중복 제거가 끼어들지 않도록 매번 파일 끝 바이트를 바꿈
+        path = write_request_body(bodies, data, index)
+        statuses = []
+        with open(path, 'rb') as body:
+            environ = {
+                'REQUEST_METHOD': 'POST',
+                'PATH_INFO': '/api/images/',
+                'SERVER_NAME': 'testserver',
+                'SERVER_PORT': '80',
+                'CONTENT_TYPE': MULTIPART_CONTENT,
+                'CONTENT_LENGTH': str(os.path.getsize(path)),
+                'wsgi.input': body,
+                'wsgi.url_scheme': 'http',
+            }
+            response = handler(environ, lambda status, headers: statuses.append(status))
+            content = b''.join(response)
+            response.close()
+        os.remove(path)
+        assert statuses[0].startswith('201'), content
+
+    print(f"{'handler':<10} {'ms':>8} {'peak MB':>9} {'read MB':>9}")
+    index = 0
+    for name, handlers in HANDLERS.items():
+        settings.FILE_UPLOAD_HANDLERS = handlers
+        upload(index)
+        index += 1
+
+        timings = []
+        for _ in range(args.repeat):
+            gc.collect()
+            start = time.perf_counter()
+            upload(index)
+            timings.append(time.perf_counter() - start)
+            index += 1
+
+        before = read_bytes()
+        tracemalloc.start()
+        upload(index)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        read = read_bytes() - before
+        index += 1
+
+        print(f'{name:<10} {statistics.median(timings) * 1000:>8.1f} '
+              f'{peak / 1024 / 1024:>9.2f} {read / 1024 / 1024:>9.2f}')
+
+    runner.teardown_databases(old_config)
+
+
+if __name__ == '__main__':
+    main()
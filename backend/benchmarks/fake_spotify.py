@@ -0,0 +1,161 @@
+"""
+벤치마크용 로컬 가짜 Spotify 서버
+
+토큰 발급(POST /api/token), 추천(GET /v1/recommendations), 검색(GET /v1/search)
+응답을 흉내 내며 HTTP/1.1 keep-alive 를 지원합니다.
+
+사용 예:
+    server = FakeSpotifyServer(latency=0.005)
+    server.start()
+    settings.SPOTIFY_TOKEN_URL = server.url + '/api/token'
+    settings.SPOTIFY_API_URL = server.url + '/v1'
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_track(index):
+    return {
+        'id': f'track{index}',
+        'name': f'Track {index}',
+        'artists': [{'name': 'Artist'}],
+        'album': {'name': 'Album', 'images': [{'url': 'https://example.com/cover.jpg'}]},
+        'preview_url': f'https://example.com/preview{index}.mp3',
+        'external_urls': {'spotify': f'https://open.spotify.com/track/track{index}'},
+        'duration_ms': 180000,
+    }
+
+
+class FakeSpotifyServer:
+    """백그라운드 스레드에서 동작하는 가짜 Spotify API 서버"""
+
+    def __init__(self, latency=0.0, track_count=20):
+        self.latency = latency
+        self.tracks = [fake_track(i) for i in range(track_count)]
+        self.counts = {'token': 0, 'recommendations': 0, 'search': 0, 'connections': 0}
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # 헤더와 본문을 따로 쓰므로 Nagle 지연(약 40ms)이 측정에 섞이지 않게 함
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                fake.counts['connections'] += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _send_json(self, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                fake.counts['token'] += 1
+                self._send_json({'access_token': 'fake-token', 'token_type': 'Bearer', 'expires_in': 3600})
+
+            def do_GET(self):
+                if fake.latency:
+                    time.sleep(fake.latency)
+                if self.path.startswith('/v1/recommendations'):
+                    fake.counts['recommendations'] += 1
+                    self._send_json({'tracks': fake.tracks})
+                else:
+                    fake.counts['search'] += 1
+                    self._send_json({'tracks': {'items': fake.tracks}})
+
+        return Handler
+
+
+async def serve_asyncio(latency=0.0, port=0, ready=None):
+    """
+    asyncio 기반 가짜 Spotify 서버 (수천 개의 동시 연결 부하 테스트용)
+
+    ThreadingHTTPServer 는 연결마다 스레드를 만들므로 동시 연결이 많으면 서버가 병목이 됩니다.
+    """
+    import asyncio
+
+    tracks = [fake_track(i) for i in range(20)]
+    bodies = {
+        'token': json.dumps({'access_token': 'fake-token', 'token_type': 'Bearer', 'expires_in': 3600}).encode(),
+        'recommendations': json.dumps({'tracks': tracks}).encode(),
+        'search': json.dumps({'tracks': {'items': tracks}}).encode(),
+    }
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = request_line.decode('latin-1').split()[:2]
+
+                content_length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'content-length':
+                        content_length = int(value)
+                if content_length:
+                    await reader.readexactly(content_length)
+
+                if method == 'POST':
+                    body = bodies['token']
+                else:
+                    if latency:
+                        await asyncio.sleep(latency)
+                    body = bodies['recommendations' if path.startswith('/v1/recommendations') else 'search']
+
+                writer.write(
+                    b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+                    b'Content-Length: ' + str(len(body)).encode() + b'\r\n\r\n' + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, '127.0.0.1', port, backlog=4096)
+    if ready is not None:
+        ready(f'http://127.0.0.1:{server.sockets[0].getsockname()[1]}')
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description='로컬 가짜 Spotify 서버 실행 (주소를 첫 줄에 출력)')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--port', type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(serve_asyncio(args.latency, args.port, ready=lambda url: print(url, flush=True)))
@@ -0,0 +1,113 @@
+"""
+비동기 Spotify 추천 엔드포인트 부하 테스트
+
+별도 프로세스로 asyncio 가짜 Spotify 서버(업스트림 지연 포함)를 띄우고 ASGI 애플리케이션의
+POST /api/spotify/recommend/ 에 동시 요청을 보내 처리량과 p50/p99 지연 시간을 잽니다.
+기본적으로 트랙 풀은 끄고 매 요청이 업스트림을 호출하도록 합니다. (--pool 로 켤 수 있음)
+
+기본값은 서버 없이 httpx.ASGITransport 로 config.asgi.application 을 직접 호출합니다.
+--url 을 주면 실행 중인 서버(uvicorn/daphne)에 요청합니다. 이 경우 서버도 같은
+SPOTIFY_TOKEN_URL / SPOTIFY_API_URL 로 가짜 서버를 바라보도록 환경 변수를 맞춰야 합니다.
+
+사용법:
+    python benchmarks/load_spotify_async.py [--requests 2000] [--concurrency 200] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
+import httpx  # noqa: E402
+
+
+async def load(client, total, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.post('/api/spotify/recommend/', json={'category': 'intense'})
+            timings.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start, sorted(timings), failures
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='가짜 업스트림 응답 지연(초)')
+    parser.add_argument('--url', help='실행 중인 ASGI 서버 주소 (예: http://127.0.0.1:8000)')
+    parser.add_argument('--pool', action='store_true', help='트랙 풀을 켜고 측정 (기본은 매 요청 업스트림 호출)')
+    args = parser.parse_args()
+
+    fake_server = subprocess.Popen(
+        [sys.executable, os.path.join(os.path.dirname(__file__), 'fake_spotify.py'),
+         '--latency', str(args.latency)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    upstream_url = fake_server.stdout.readline().strip()
+    os.environ['SPOTIFY_TOKEN_URL'] = upstream_url + '/api/token'
+    os.environ['SPOTIFY_API_URL'] = upstream_url + '/v1'
+
+    import django
+    django.setup()
+    from django.conf import settings
+
+    settings.SPOTIFY_CLIENT_ID = settings.SPOTIFY_CLIENT_ID or 'bench'
+    settings.SPOTIFY_CLIENT_SECRET = settings.SPOTIFY_CLIENT_SECRET or 'bench'
+    settings.SPOTIFY_TOKEN_URL = os.environ['SPOTIFY_TOKEN_URL']
+    settings.SPOTIFY_API_URL = os.environ['SPOTIFY_API_URL']
+    settings.SPOTIFY_TRACK_POOL_ENABLED = args.pool
+    settings.ALLOWED_HOSTS = ['*']
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+    else:
+        from config.asgi import application
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=application),
+            base_url='http://testserver',
+            timeout=60,
+        )
+
+    async def run():
+        if args.url:
+            async with client:
+                return await load(client, args.requests, args.concurrency)
+        # ASGITransport 는 lifespan 이벤트를 보내지 않으므로 서버 시작/종료 때처럼 공용 클라이언트를 직접 열고 닫음
+        from image_analysis.async_spotify import close_async_client, open_async_client
+
+        await open_async_client()
+        try:
+            async with client:
+                return await load(client, args.requests, args.concurrency)
+        finally:
+            await close_async_client()
+
+    try:
+        elapsed, timings, failures = asyncio.run(run())
+    finally:
+        fake_server.terminate()
+
+    print(f'requests={args.requests} concurrency={args.concurrency} upstream_latency={args.latency * 1000:.0f}ms')
+    print(f'throughput: {args.requests / elapsed:.1f} req/s  failures: {failures}')
+    print(f'p50: {timings[len(timings) // 2] * 1000:.1f}ms  '
+          f'p99: {timings[min(int(len(timings) * 0.99), len(timings) - 1)] * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
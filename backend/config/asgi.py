@@ -13,4 +13,27 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from image_analysis.async_spotify import close_async_client, open_async_client  # noqa: E402
+
+
+async def application(scope, receive, send):
+    """
+    Django ASGI 애플리케이션 + lifespan 처리
+
+    Django 는 lifespan 이벤트를 처리하지 않으므로 여기서 프로세스 공용 Spotify AsyncClient 를
+    서버 시작 시 열고 종료 시 닫습니다.
+    """
+    if scope['type'] != 'lifespan':
+        return await django_application(scope, receive, send)
+
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await open_async_client()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await close_async_client()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 단계별 처리 시간 기록, Server-Timing 헤더, X-Profile 헤더 프로파일링 (가장 바깥에서 전체 시간을 잼)
+    'image_analysis.middleware.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -134,6 +136,22 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# 업로드는 받는 즉시 해시/포맷 판별/크기 검사를 하며 임시 파일에 저장하고,
+# 임시 파일을 MEDIA_ROOT 와 같은 파일 시스템에 두어 저장 시 rename 으로 옮긴다
+# (MEDIA_ROOT 밖에 두어 검증 전 업로드 임시 파일이 /media/ 로 공개되지 않도록)
+FILE_UPLOAD_HANDLERS = ['image_analysis.upload_handlers.StreamingImageUploadHandler']
+FILE_UPLOAD_TEMP_DIR = BASE_DIR / '.upload_tmp'
+IMAGE_UPLOAD_MAX_SIZE = 10 * 1024 * 1024
+
+# 디코드 전에 헤더만 읽어 거절하는 기준 (image_analysis/header.py)
+IMAGE_UPLOAD_ALLOWED_FORMATS = ['JPEG', 'PNG', 'GIF', 'BMP', 'WEBP']
+# 인쇄용 큰 이미지(2억 픽셀)까지 허용. 큰 PNG/BMP 는 스트립 단위로 디코드하므로 분석 메모리는 늘지 않음
+# Pillow 의 압축 폭탄 기준(Image.MAX_IMAGE_PIXELS)도 앱 시작 시와 분석 워커에서 이 값으로 맞춤
+IMAGE_UPLOAD_MAX_PIXELS = 200 * 1000 * 1000
+IMAGE_UPLOAD_MAX_FRAMES = 500
+# 디코드할 프레임(최대 IMAGE_ANIMATION_FRAME_BUDGET 개)의 픽셀 수 합 (큰 프레임이 많은 애니메이션 거절)
+IMAGE_UPLOAD_MAX_TOTAL_PIXELS = 400 * 1000 * 1000
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -164,3 +182,83 @@ REST_FRAMEWORK = {
 # Spotify API settings
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID', '')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET', '')
+# 테스트/개발 시 로컬 스텁 서버로 바꿀 수 있는 Spotify 엔드포인트
+SPOTIFY_TOKEN_URL = os.getenv('SPOTIFY_TOKEN_URL', 'https://accounts.spotify.com/api/token')
+SPOTIFY_API_URL = os.getenv('SPOTIFY_API_URL', 'https://api.spotify.com/v1')
+
+# Spotify HTTP 클라이언트 (keep-alive 커넥션 풀, 타임아웃, 재시도)
+SPOTIFY_POOL_SIZE = 10
+SPOTIFY_CONNECT_TIMEOUT = 3.05
+SPOTIFY_READ_TIMEOUT = 10
+SPOTIFY_MAX_RETRIES = 3
+SPOTIFY_BACKOFF_FACTOR = 0.3
+# 429/503 의 Retry-After 헤더를 따를 때 최대 대기 시간(초)
+SPOTIFY_MAX_RETRY_AFTER = 3
+# 비동기 추천 뷰(httpx.AsyncClient)의 동시 연결 수와 유지할 keep-alive 연결 수
+SPOTIFY_ASYNC_MAX_CONNECTIONS = 100
+SPOTIFY_ASYNC_MAX_KEEPALIVE = 100
+
+# 분위기별 트랙 풀 (Spotify 응답을 메모리에 보관해 요청마다 호출하지 않음)
+SPOTIFY_TRACK_POOL_ENABLED = True
+SPOTIFY_TRACK_POOL_SIZE = 60
+SPOTIFY_TRACK_POOL_TTL = 60 * 10
+SPOTIFY_TRACK_POOL_STALE_TTL = 60 * 5
+SPOTIFY_TRACK_POOL_LOW_WATERMARK = 5
+
+# 이미지 분석 비동기 처리 설정
+# True 이면 업로드 시 분석을 백그라운드 워커에 맡기고 202 를 즉시 반환
+IMAGE_ANALYSIS_ASYNC = os.getenv('IMAGE_ANALYSIS_ASYNC', 'False') == 'True'
+IMAGE_ANALYSIS_WORKERS = int(os.getenv('IMAGE_ANALYSIS_WORKERS', '2'))
+IMAGE_ANALYSIS_QUEUE_SIZE = int(os.getenv('IMAGE_ANALYSIS_QUEUE_SIZE', '100'))
+IMAGE_ANALYSIS_MAX_RETRIES = 2
+IMAGE_ANALYSIS_RETRY_DELAY = 1.0
+
+# 일괄 업로드 (POST /api/images/batch/) 설정
+# 분석 프로세스 수는 CPU 수가 아닌 작은 고정값 (웹 워커마다 풀이 생기므로 서버 CPU 를 모두 쓰지 않도록)
+IMAGE_ANALYSIS_BATCH_WORKERS = int(os.getenv('IMAGE_ANALYSIS_BATCH_WORKERS', '2'))
+IMAGE_ANALYSIS_BATCH_MAX_FILES = 50
+
+# 일괄 재분석 (manage.py reanalyze) 체크포인트 파일
+IMAGE_REANALYZE_CHECKPOINT = BASE_DIR / 'reanalyze_checkpoint.json'
+
+# 이미지 목록 페이지 크기 (GET /api/images/?page_size=)
+IMAGE_LIST_PAGE_SIZE = 50
+IMAGE_LIST_MAX_PAGE_SIZE = 200
+
+# 썸네일(파생 이미지) 설정: {이름: 긴 변 픽셀}, MEDIA_ROOT/derivatives/<내용 해시>/<이름>.<포맷> 으로 저장
+IMAGE_THUMBNAIL_SIZES = {'thumb': 256, 'card': 640}
+# 'avif' 는 AVIF 인코더가 있는 Pillow 에서만 추가 (저장할 수 없는 포맷은 경고 후 제외)
+IMAGE_THUMBNAIL_FORMATS = ['webp', 'jpeg']
+IMAGE_THUMBNAIL_QUALITY = 80
+IMAGE_THUMBNAIL_EAGER = True
+IMAGE_THUMBNAIL_MAX_AGE = 60 * 60 * 24 * 30
+
+# 유사 이미지 검색 (지각 해시 해밍 거리, 64비트 중)
+IMAGE_SIMILARITY_DEFAULT_DISTANCE = 8
+IMAGE_SIMILARITY_MAX_DISTANCE = 10
+IMAGE_SIMILARITY_LIMIT = 20
+
+# 색상 검색 (LAB 거리 ΔE, 색상이 차지하는 비율 0-1)
+IMAGE_COLOR_SEARCH_DEFAULT_TOLERANCE = 20
+IMAGE_COLOR_SEARCH_MAX_TOLERANCE = 40
+IMAGE_COLOR_SEARCH_DEFAULT_SHARE = 0.2
+IMAGE_COLOR_SEARCH_LIMIT = 20
+
+# 애니메이션(GIF/WEBP/APNG) 분석: 고를 프레임 수, 이미지 1장 분석에서 디코드할 최대 프레임 수
+IMAGE_ANIMATION_SAMPLE_FRAMES = 8
+IMAGE_ANIMATION_FRAME_BUDGET = 64
+
+# 아주 큰 PNG/BMP 의 스트립 단위 축소 디코드: 적용할 최소 픽셀 수, 스트립 하나에 쓸 메모리
+IMAGE_STREAMING_MIN_PIXELS = 16 * 1000 * 1000
+IMAGE_STREAMING_STRIP_BYTES = 8 * 1024 * 1024
+
+# 계측: Server-Timing 응답 헤더, X-Profile 요청 헤더로 켜는 프로파일러 (운영 환경에서는 끔), 결과 저장 위치
+IMAGE_SERVER_TIMING = os.getenv('IMAGE_SERVER_TIMING', 'False') == 'True'
+IMAGE_PROFILING_ENABLED = DEBUG
+IMAGE_PROFILE_DIR = BASE_DIR / 'profiles'
+# /api/metrics/, /api/spotify/stats/ 공개 여부 (끄면 staff 사용자만 볼 수 있고 나머지는 404)
+IMAGE_METRICS_ENABLED = os.getenv('IMAGE_METRICS_ENABLED', str(DEBUG)) == 'True'
+
+# 분석 결과 캐시 설정 (내용 해시 기준, 프로세스 내 LRU + Django 캐시)
+IMAGE_ANALYSIS_CACHE_SIZE = 256
+IMAGE_ANALYSIS_CACHE_TIMEOUT = 60 * 60 * 24
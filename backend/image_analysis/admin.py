@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import UploadedImage
+from .features import format_rgb
 
 
 @admin.register(UploadedImage)
@@ -13,16 +14,39 @@ class UploadedImageAdmin(admin.ModelAdmin):
         'image_height',
         'file_size_display',
         'analysis_completed',
+        'mood',
+        'brightness_average',
+        'aspect_ratio',
+        'dominant_color_display',
         'uploaded_at'
     ]
-    list_filter = ['analysis_completed', 'uploaded_at']
+    list_filter = [
+        'analysis_completed', 'mood', 'brightness_level', 'is_grayscale', 'has_transparency', 'uploaded_at'
+    ]
     search_fields = ['file_name']
     readonly_fields = [
         'uploaded_at',
         'file_size',
         'image_width',
         'image_height',
-        'analysis_result'
+        'analysis_result',
+        'mood',
+        'feature_red',
+        'feature_green',
+        'feature_blue',
+        'feature_warmth',
+        'feature_coolness',
+        'feature_saturation',
+        'feature_brightness',
+        'feature_contrast',
+        'perceptual_hash',
+        'brightness_average',
+        'brightness_level',
+        'aspect_ratio',
+        'is_grayscale',
+        'has_transparency',
+        'unique_colors',
+        'dominant_color_display'
     ]
 
     fieldsets = (
@@ -35,8 +59,30 @@ class UploadedImageAdmin(admin.ModelAdmin):
         ('분석 결과', {
             'fields': ('analysis_completed', 'analysis_result')
         }),
+        ('분위기', {
+            'fields': (
+                'mood', 'feature_red', 'feature_green', 'feature_blue', 'feature_warmth',
+                'feature_coolness', 'feature_saturation', 'feature_brightness', 'feature_contrast'
+            )
+        }),
+        ('유사 이미지 검색', {
+            'fields': ('perceptual_hash',)
+        }),
+        ('분석 요약', {
+            'fields': (
+                'brightness_average', 'brightness_level', 'aspect_ratio', 'is_grayscale',
+                'has_transparency', 'unique_colors', 'dominant_color_display'
+            )
+        }),
     )
 
+    def get_queryset(self, request):
+        """목록 화면은 요약 컬럼만 쓰므로 analysis_result(JSON) 를 읽지 않음"""
+        queryset = super().get_queryset(request)
+        if request.resolver_match and request.resolver_match.url_name.endswith('_changelist'):
+            queryset = queryset.defer('analysis_result')
+        return queryset
+
     def file_size_display(self, obj):
         """파일 크기를 읽기 쉬운 형식으로 표시"""
         if obj.file_size:
@@ -48,3 +94,10 @@ class UploadedImageAdmin(admin.ModelAdmin):
         return "-"
 
     file_size_display.short_description = '파일 크기'
+
+    def dominant_color_display(self, obj):
+        """대표 색상을 #rrggbb 로 표시"""
+        return format_rgb(obj.dominant_color) or "-"
+
+    dominant_color_display.short_description = '대표 색상'
+    dominant_color_display.admin_order_field = 'dominant_color'
@@ -0,0 +1,158 @@
+"""
+애니메이션 이미지(GIF, WEBP, APNG) 프레임 샘플링
+
+첫 프레임만 보는 대신 고르게 떨어진 프레임 N개를 골라 작업용 사본을 만들고,
+색상/밝기/색상 구간 분석기가 고른 프레임 전체를 합쳐 계산합니다. (ImageAnalysisContext.frame_samples)
+지각 해시는 유사 검색이 같은 기준으로 비교하도록 첫 프레임만 사용합니다.
+
+GIF/WEBP/APNG 프레임은 이전 프레임 위에 그려지므로 Pillow 의 seek 는 목표 프레임까지의 프레임을
+차례로 디코드합니다. 그래서 프레임 예산은 이미지 1장 분석에서 디코드할 최대 프레임 수(= 도달할 수 있는
+마지막 프레임)를 제한하고, 예산보다 긴 애니메이션은 앞쪽 예산 범위 안에서 고릅니다. (truncated)
+프레임 수는 업로드 검증 때 읽은 헤더, 재생 시간은 GIF 블록/WEBP ANMF/APNG fcTL 청크 헤더에서 읽습니다. (디코드 없음)
+
+일괄 분석 워커에서도 import 하므로 Django 에 의존하지 않습니다. (설정은 있을 때만 읽음)
+
+설정 (settings.py):
+    IMAGE_ANIMATION_SAMPLE_FRAMES: 고를 프레임 수 (기본 8)
+    IMAGE_ANIMATION_FRAME_BUDGET: 이미지 1장 분석에서 디코드할 최대 프레임 수 (기본 64)
+"""
+import struct
+
+
+def _get_setting(name, default):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+def get_sample_frames():
+    return _get_setting('IMAGE_ANIMATION_SAMPLE_FRAMES', 8)
+
+
+def get_frame_budget():
+    return _get_setting('IMAGE_ANIMATION_FRAME_BUDGET', 64)
+
+
+def sample_indices(frame_count, samples=None, budget=None):
+    """
+    고르게 떨어진 프레임 번호 (첫 프레임 포함, 오름차순)
+
+    Returns:
+        tuple: (프레임 번호 목록, 예산 때문에 뒤쪽 프레임을 보지 못했는지)
+    """
+    samples = max(1, get_sample_frames() if samples is None else samples)
+    budget = max(1, get_frame_budget() if budget is None else budget)
+    reachable = min(frame_count, budget)
+    count = min(samples, reachable)
+    if count == 1:
+        return [0], reachable < frame_count
+    step = (reachable - 1) / (count - 1)
+    indices = sorted({round(position * step) for position in range(count)})
+    return indices, reachable < frame_count
+
+
+def _skip_gif_sub_blocks(image_file):
+    while True:
+        size = image_file.read(1)
+        if not size or size[0] == 0:
+            return
+        image_file.seek(size[0], 1)
+
+
+def _gif_durations(image_file):
+    """GIF 프레임별 표시 시간(ms), 그래픽 제어 확장 블록만 읽고 이미지 데이터는 건너뜀"""
+    image_file.seek(6)
+    flags = image_file.read(7)[4]
+    if flags & 0x80:
+        image_file.seek(3 << ((flags & 0x07) + 1), 1)
+
+    durations = []
+    delay = 0
+    while True:
+        block = image_file.read(1)
+        if block == b'\x21':
+            label = image_file.read(1)
+            if label == b'\xf9':
+                size = image_file.read(1)[0]
+                data = image_file.read(size)
+                delay = struct.unpack('<H', data[1:3])[0] * 10
+            _skip_gif_sub_blocks(image_file)
+        elif block == b'\x2c':
+            flags = image_file.read(9)[8]
+            if flags & 0x80:
+                image_file.seek(3 << ((flags & 0x07) + 1), 1)
+            image_file.seek(1, 1)
+            _skip_gif_sub_blocks(image_file)
+            durations.append(delay)
+            delay = 0
+        else:
+            # 트레일러(0x3B) 또는 잘린 파일
+            return durations
+
+
+def _webp_durations(image_file):
+    """애니메이션 WEBP 프레임별 표시 시간(ms), ANMF 청크 헤더만 읽음"""
+    image_file.seek(12)
+    durations = []
+    while True:
+        header = image_file.read(8)
+        if len(header) < 8:
+            return durations
+        chunk_type, length = struct.unpack('<4sI', header)
+        skip = length + (length & 1)
+        if chunk_type == b'ANMF':
+            data = image_file.read(16)
+            if len(data) < 16:
+                return durations
+            durations.append(int.from_bytes(data[12:15], 'little'))
+            skip -= 16
+        image_file.seek(skip, 1)
+
+
+def _png_durations(image_file):
+    """APNG 프레임별 표시 시간(ms), fcTL 청크만 읽고 이미지 데이터 청크는 건너뜀 (APNG 가 아니면 None)"""
+    image_file.seek(8)
+    durations = []
+    while True:
+        header = image_file.read(8)
+        if len(header) < 8:
+            break
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type == b'IEND':
+            break
+        if chunk_type == b'fcTL':
+            data = image_file.read(length)
+            delay_num, delay_den = struct.unpack('>HH', data[20:24])
+            # 분모가 0 이면 1/100 초 단위
+            durations.append(round(delay_num * 1000 / (delay_den or 100)))
+            image_file.seek(4, 1)
+        else:
+            image_file.seek(length + 4, 1)
+    return durations or None
+
+
+TIMELINE_READERS = {
+    'GIF': _gif_durations,
+    'WEBP': _webp_durations,
+    'PNG': _png_durations,
+}
+
+
+def read_durations(image_file, image_format):
+    """
+    프레임별 표시 시간(ms) 목록 (읽을 수 없는 포맷이면 None)
+
+    파일 위치를 되돌려 두므로 Pillow 가 같은 파일을 읽는 중에도 호출할 수 있습니다.
+    """
+    reader = TIMELINE_READERS.get(image_format)
+    if reader is None:
+        return None
+    position = image_file.tell()
+    try:
+        return reader(image_file)
+    except (struct.error, IndexError, OSError, ValueError):
+        return None
+    finally:
+        image_file.seek(position)
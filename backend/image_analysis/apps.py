@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class ImageAnalysisConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'image_analysis'
+
+    def ready(self):
+        from .header import get_max_pixels
+        from .utils import set_max_image_pixels
+
+        # Pillow 의 압축 폭탄 기준을 업로드 픽셀 제한에 맞춤
+        set_max_image_pixels(get_max_pixels())
@@ -0,0 +1,212 @@
+"""
+비동기 Spotify 클라이언트 (ASGI 용)
+
+spotify_service 싱글톤의 토큰, 요청 파라미터, 트랙 풀을 그대로 사용하고
+업스트림 호출만 httpx.AsyncClient 로 보냅니다. 추천 API 와 검색 API 를 동시에 요청해
+먼저 성공한 결과를 사용하고 나머지 요청은 취소합니다.
+
+같은 카테고리의 동시 요청은 진행 중인 업스트림 조회 하나를 함께 기다려 결과를 나눠 씁니다.
+(트랙 풀이 비어 있을 때 몰린 요청이 모두 업스트림을 호출하지 않도록)
+
+AsyncClient 는 프로세스에 하나만 두고 ASGI lifespan 에서 열고 닫습니다. (config/asgi.py)
+lifespan 이 없는 경우(WSGI 에서 async_to_sync 로 실행 등)는 요청마다 루프가 새로 만들어지므로
+그 호출에서만 쓸 클라이언트를 열고 끝나면 닫습니다.
+"""
+import asyncio
+import random
+from contextlib import asynccontextmanager
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .instrumentation import stage
+from .spotify_service import spotify_service, format_track, RETRY_STATUS_CODES
+
+
+# 프로세스 공용 AsyncClient 와 그 클라이언트를 연 이벤트 루프 (커넥션은 만든 루프에서만 재사용할 수 있음)
+_client = None
+_client_loop = None
+# (이벤트 루프, 카테고리) 별로 진행 중인 업스트림 조회
+_inflight = {}
+
+
+def _new_client():
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(
+            getattr(settings, 'SPOTIFY_READ_TIMEOUT', 10),
+            connect=getattr(settings, 'SPOTIFY_CONNECT_TIMEOUT', 3.05),
+        ),
+        limits=httpx.Limits(
+            max_connections=getattr(settings, 'SPOTIFY_ASYNC_MAX_CONNECTIONS', 100),
+            max_keepalive_connections=getattr(settings, 'SPOTIFY_ASYNC_MAX_KEEPALIVE', 100),
+        ),
+    )
+
+
+async def open_async_client():
+    """프로세스 공용 AsyncClient 를 현재 이벤트 루프에서 엽니다. (ASGI lifespan.startup)"""
+    global _client, _client_loop
+    if _client is None:
+        _client = _new_client()
+        _client_loop = asyncio.get_running_loop()
+    return _client
+
+
+async def close_async_client():
+    """프로세스 공용 AsyncClient 의 커넥션을 닫습니다. (ASGI lifespan.shutdown)"""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def async_client():
+    """
+    업스트림 호출에 쓸 AsyncClient
+
+    공용 클라이언트가 현재 루프에서 열려 있으면 그대로 쓰고,
+    아니면 이번 호출에서만 쓸 클라이언트를 열고 끝나면 닫습니다.
+    """
+    if _client is not None and _client_loop is asyncio.get_running_loop():
+        yield _client
+        return
+    async with _new_client() as client:
+        yield client
+
+
+async def aget_access_token():
+    """유효한 토큰은 바로 반환하고, 갱신이 필요할 때만 스레드에서 동기 갱신을 실행합니다."""
+    if spotify_service.token_is_valid():
+        return spotify_service.access_token
+    return await sync_to_async(spotify_service.get_access_token, thread_sensitive=False)()
+
+
+def _retry_delay(response, attempt):
+    """
+    Retry-After 헤더가 있으면 그 값, 없으면 지수 백오프
+
+    헤더 값은 SPOTIFY_MAX_RETRY_AFTER 초까지만 기다립니다. (Retry-After: 3600 이 요청을 한 시간 붙잡지 않도록)
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), getattr(settings, 'SPOTIFY_MAX_RETRY_AFTER', 3))
+    return getattr(settings, 'SPOTIFY_BACKOFF_FACTOR', 0.3) * (2 ** attempt)
+
+
+async def _aget(client, url, params):
+    """
+    토큰을 붙여 GET 요청을 보냅니다.
+    429/5xx 는 백오프 후 재시도하고, 401 이면 토큰을 버리고 새 토큰으로 한 번 더 요청합니다.
+    """
+    max_retries = getattr(settings, 'SPOTIFY_MAX_RETRIES', 3)
+    for refreshed in (False, True):
+        token = await aget_access_token()
+        headers = {
+            'Authorization': f'Bearer {token}'
+        }
+
+        with stage('spotify'):
+            for attempt in range(max_retries + 1):
+                response = await client.get(url, headers=headers, params=params)
+                if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                    break
+                await asyncio.sleep(_retry_delay(response, attempt))
+
+        if response.status_code != 401:
+            break
+        # 만료되었거나 폐기된 토큰 (다른 요청도 새 토큰을 받도록 캐시에서도 버림)
+        spotify_service.invalidate_token()
+    return response
+
+
+async def arecommend_tracks(client, category):
+    """Recommendations API 로 미리듣기가 가능한 트랙 목록을 가져옵니다."""
+    url, params = spotify_service.build_recommendation_request(category)
+    response = await _aget(client, url, params)
+
+    if response.status_code == 200:
+        tracks = response.json()['tracks']
+        return [format_track(t) for t in tracks if t.get('preview_url')]
+
+    return []
+
+
+async def asearch_tracks(client, category):
+    """검색 API 로 미리듣기가 가능한 트랙 목록을 가져옵니다."""
+    url, params = spotify_service.build_search_request(category)
+    response = await _aget(client, url, params)
+
+    if response.status_code == 200:
+        tracks = response.json()['tracks']['items']
+        tracks_with_preview = [format_track(t) for t in tracks if t.get('preview_url')]
+        if not tracks_with_preview:
+            raise Exception('미리듣기가 가능한 곡을 찾을 수 없습니다.')
+        return tracks_with_preview
+
+    raise Exception(f'음악 검색 실패: {response.text}')
+
+
+async def afetch_tracks(category):
+    """추천과 검색을 동시에 요청해 먼저 트랙을 돌려준 쪽을 사용하고 나머지는 취소합니다."""
+    async with async_client() as client:
+        return await _race(client, category)
+
+
+async def _race(client, category):
+    pending = {
+        asyncio.create_task(arecommend_tracks(client, category)),
+        asyncio.create_task(asearch_tracks(client, category)),
+    }
+    error = None
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = task.exception()
+                elif task.result():
+                    return task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+    raise error or Exception('미리듣기가 가능한 곡을 찾을 수 없습니다.')
+
+
+async def afetch_tracks_shared(category):
+    """
+    같은 카테고리의 조회가 진행 중이면 새로 요청하지 않고 그 결과를 함께 기다립니다.
+    (한 요청이 취소되어도 조회는 계속되도록 shield)
+    """
+    key = (asyncio.get_running_loop(), category)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(afetch_tracks(category))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task)
+
+
+async def aget_recommendation(category):
+    """분위기에 맞는 트랙 하나를 반환합니다. (트랙 풀이 있으면 풀에서 먼저 꺼냄)"""
+    use_pool = getattr(settings, 'SPOTIFY_TRACK_POOL_ENABLED', True)
+    pool = spotify_service.track_pool
+
+    if use_pool:
+        track = pool.take(category)
+        if track is not None:
+            return track
+
+    tracks = await afetch_tracks_shared(category)
+    if use_pool:
+        # 같은 조회를 함께 기다린 요청이 먼저 풀을 채웠으면 거기서 꺼냄 (같은 곡을 여러 요청에 주지 않도록)
+        track = pool.take(category)
+        if track is not None:
+            return track
+    track = random.choice(tracks)
+    if use_pool:
+        pool.store(category, [t for t in tracks if t is not track])
+    return track
@@ -0,0 +1,294 @@
+"""
+여러 이미지 일괄 업로드/분석
+
+Pillow 디코드는 CPU 작업이라 스레드로는 GIL 때문에 병렬화되지 않으므로
+프로세스 풀에서 분석하고, 부모 프로세스는 검증, 파일 저장, DB 기록만 담당합니다.
+같은 풀을 비동기 분석 큐(tasks.AnalysisQueue)도 사용합니다.
+모든 행은 하나의 트랜잭션에서 bulk_create 로 기록합니다.
+
+설정 (settings.py):
+    IMAGE_ANALYSIS_BATCH_WORKERS: 분석 프로세스 수 (기본 2, 0 이면 요청 프로세스에서 분석)
+    IMAGE_ANALYSIS_BATCH_MAX_FILES: 한 요청에 받을 최대 파일 수 (기본 50)
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import transaction
+
+from .cache import analysis_cache
+from .models import ImageColor, ImageExif, UploadedImage, get_analysis_fields
+from .mood import get_mood_fields
+from .thumbnails import generate_derivatives_safely
+from .header import get_max_pixels
+from .utils import analyze_source, get_analysis_context, set_max_image_pixels, stale_sections
+
+
+class BatchAnalyzer:
+    """요청 간에 재사용하는 분석 프로세스 풀"""
+
+    def __init__(self, workers=None):
+        self._workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self):
+        """프로세스 수 (지정하지 않으면 IMAGE_ANALYSIS_BATCH_WORKERS)"""
+        if self._workers is not None:
+            return self._workers
+        return getattr(settings, 'IMAGE_ANALYSIS_BATCH_WORKERS', 2)
+
+    def _get_executor(self):
+        """
+        첫 일괄 요청에서 풀을 만듭니다.
+        스레드가 있는 서버 프로세스에서 fork 하지 않도록 spawn 을 사용하며,
+        워커는 Django 설정 없이 utils.analyze_source 만 import 합니다.
+        (Pillow 픽셀 제한처럼 설정에서 오는 값은 initializer 로 넘김)
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=set_max_image_pixels,
+                    initargs=(get_max_pixels(),),
+                )
+            return self._executor
+
+    def analyze(self, sources, previous=None):
+        """
+        {키: 경로 또는 바이트} 를 분석하고 끝나는 순서대로 (키, 결과) 를 돌려줍니다.
+        previous 에 키의 이전 결과가 있으면 버전이 바뀐 분석기만 다시 실행합니다.
+        분석 중 예외가 나면 결과 대신 오류 딕셔너리를 돌려줍니다.
+        """
+        if not sources:
+            return
+        previous = previous or {}
+
+        if self.workers <= 0:
+            for key, source in sources.items():
+                yield key, self._safe_analyze(source, previous.get(key))
+            return
+
+        def submit_all(executor):
+            return {
+                executor.submit(analyze_source, source, previous.get(key)): key
+                for key, source in sources.items()
+            }
+
+        try:
+            futures = submit_all(self._get_executor())
+        except BrokenProcessPool:
+            # 이전 요청에서 워커가 비정상 종료된 풀은 버리고 새로 만든다
+            self.shutdown()
+            futures = submit_all(self._get_executor())
+
+        broken = False
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                broken = broken or isinstance(e, BrokenProcessPool)
+                result = {'error': str(e), 'message': '이미지 분석 중 오류가 발생했습니다.'}
+            yield futures[future], result
+
+        if broken:
+            self.shutdown()
+
+    def run(self, source, previous_result=None):
+        """
+        원본 하나를 분석하고 끝날 때까지 기다립니다. (비동기 분석 큐의 워커 스레드에서 호출)
+
+        Returns:
+            dict: 분석 결과 (실패하면 오류 딕셔너리)
+        """
+        previous = {0: previous_result} if previous_result is not None else None
+        return dict(self.analyze({0: source}, previous))[0]
+
+    def _safe_analyze(self, source, previous_result=None):
+        try:
+            return analyze_source(source, previous_result)
+        except Exception as e:
+            return {'error': str(e), 'message': '이미지 분석 중 오류가 발생했습니다.'}
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def _source_for(image_file):
+    """워커에 넘길 원본: 디스크 임시 파일은 경로, 메모리 파일은 바이트 (큰 파일을 피클링하지 않도록)"""
+    if hasattr(image_file, 'temporary_file_path'):
+        return image_file.temporary_file_path()
+    image_file.seek(0)
+    return image_file.read()
+
+
+def stored_source(instance):
+    """저장된 이미지의 워커에 넘길 원본 (로컬 파일이면 경로, 아니면 바이트), 파일이 없으면 None"""
+    try:
+        path = instance.image.path
+    except NotImplementedError:
+        # 경로가 없는 저장소(S3 등)는 내용을 읽어 넘김
+        if not instance.image.storage.exists(instance.image.name):
+            return None
+        with instance.image.open('rb') as image_file:
+            return image_file.read()
+    return path if os.path.exists(path) else None
+
+
+def process_batch(items):
+    """
+    검증된 업로드 파일들을 분석하고 저장합니다.
+
+    Args:
+        items: [(index, image_file, content_hash), ...]
+
+    Yields:
+        dict: 분석이 끝나는 순서대로 항목별 결과, 마지막에 저장된 행 id 를 담은 요약.
+              파일 저장이나 DB 기록에 실패한 항목은 같은 index 의 'error' 줄을 한 번 더 보내고,
+              DB 기록 자체가 실패하면 요약의 created 는 비고 'error' 를 담습니다.
+    """
+    results = {}
+    cache_hits = set()
+
+    # 이미 분석된 같은 내용의 이미지가 있으면 디코드 생략 (DB 조회는 한 번)
+    hashes = {content_hash for _, _, content_hash in items}
+    completed = {}
+    stored_names = {}
+    duplicates = UploadedImage.objects.filter(
+        content_hash__in=hashes, analysis_completed=True
+    ).values_list('content_hash', 'image', 'analysis_result')
+    for content_hash, image_name, analysis_result in duplicates:
+        completed.setdefault(content_hash, analysis_result)
+        stored_names.setdefault(content_hash, image_name)
+
+    sources = {}
+    previous = {}
+    for index, image_file, content_hash in items:
+        if content_hash in results or content_hash in sources:
+            continue
+        cached = completed.get(content_hash)
+        if cached is not None:
+            analysis_cache.record_db_hit()
+        else:
+            cached = analysis_cache.get(content_hash)
+        if cached is not None and stale_sections(cached) != set():
+            # 이전 버전 분석기로 만든 결과는 바뀐 분석기만 워커에서 다시 실행
+            previous[content_hash] = cached
+            cached = None
+        if cached is not None:
+            results[content_hash] = cached
+            cache_hits.add(content_hash)
+        else:
+            sources[content_hash] = _source_for(image_file)
+
+    by_hash = {}
+    for index, image_file, content_hash in items:
+        by_hash.setdefault(content_hash, []).append((index, image_file))
+
+    def item_line(index, image_file, analysis_result, cached):
+        line = {
+            'index': index,
+            'file_name': image_file.name,
+            'status': 'error' if 'error' in analysis_result else 'analyzed',
+            'cached': cached,
+        }
+        if 'error' in analysis_result:
+            line['error'] = analysis_result['error']
+        else:
+            line['mood'] = get_mood_fields(analysis_result)['mood']
+            line['analysis_result'] = analysis_result
+        return line
+
+    for content_hash in cache_hits:
+        for index, image_file in by_hash[content_hash]:
+            yield item_line(index, image_file, results[content_hash], True)
+
+    for content_hash, analysis_result in batch_analyzer.analyze(sources, previous):
+        results[content_hash] = analysis_result
+        analysis_cache.set(content_hash, analysis_result)
+        for index, image_file in by_hash[content_hash]:
+            yield item_line(index, image_file, analysis_result, False)
+
+    # 파일 저장 후 모든 행을 한 번에 기록
+    # 응답(200)은 이미 나갔으므로 저장/기록 실패도 항목별 오류 줄로 보내고 나머지는 계속 처리
+    instances = []
+    exif = []
+    saved_names = []
+    for index, image_file, content_hash in items:
+        analysis_result = results[content_hash]
+        failed = 'error' in analysis_result
+        ctx = get_analysis_context(image_file)
+        instance = UploadedImage(
+            file_name=image_file.name,
+            file_size=image_file.size,
+            image_width=ctx.width,
+            image_height=ctx.height,
+            content_hash=content_hash,
+            analysis_result=analysis_result,
+            analysis_completed=not failed,
+            analysis_status=(
+                UploadedImage.AnalysisStatus.FAILED if failed else UploadedImage.AnalysisStatus.COMPLETED
+            ),
+            **get_analysis_fields(analysis_result)
+        )
+        # 같은 내용의 파일은 한 번만 저장하고 공유 (이미 저장된 파일이 있으면 그 파일 사용)
+        if content_hash in stored_names:
+            instance.image.name = stored_names[content_hash]
+        else:
+            try:
+                image_file.seek(0)
+                instance.image.save(image_file.name, image_file, save=False)
+            except Exception as e:
+                yield _save_error(index, image_file, e)
+                continue
+            stored_names[content_hash] = instance.image.name
+            saved_names.append((instance.image.name, content_hash, failed))
+        instances.append((index, instance))
+        exif.append((instance, ctx.raw_exif))
+
+    try:
+        with transaction.atomic():
+            UploadedImage.objects.bulk_create([instance for _, instance in instances])
+            ImageColor.replace_for([instance for _, instance in instances])
+            ImageExif.store(exif)
+    except Exception as e:
+        # 기록되지 않은 행이 가리킬 파일은 남기지 않음 (이전 요청에서 저장된 공유 파일은 그대로)
+        for name, _, _ in saved_names:
+            UploadedImage._meta.get_field('image').storage.delete(name)
+        for index, instance in instances:
+            yield _save_error(index, instance, e)
+        yield {'summary': True, 'created': [], 'error': str(e)}
+        return
+
+    # 썸네일은 행이 기록된 새 파일만 만듦
+    for name, content_hash, failed in saved_names:
+        if not failed:
+            generate_derivatives_safely(name, content_hash)
+
+    yield {
+        'summary': True,
+        'created': [{'index': index, 'id': instance.pk} for index, instance in instances],
+    }
+
+
+def _save_error(index, item, error):
+    """저장 단계에서 실패한 항목의 결과 줄 (분석 결과 줄 뒤에 같은 index 로 보냄)"""
+    return {
+        'index': index,
+        'file_name': getattr(item, 'file_name', None) or item.name,
+        'status': 'error',
+        'error': str(error),
+        'message': '이미지를 저장하지 못했습니다.',
+    }
+
+
+# 싱글톤 인스턴스
+batch_analyzer = BatchAnalyzer()
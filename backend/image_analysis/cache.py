@@ -0,0 +1,94 @@
+"""
+내용 해시 기반 분석 결과 캐시
+
+1단계: 프로세스 내 LRU (가장 빠름, 프로세스마다 따로 유지)
+2단계: Django 캐시 백엔드 (settings.CACHES, 여러 프로세스가 공유)
+
+설정 (settings.py):
+    IMAGE_ANALYSIS_CACHE_SIZE: 프로세스 내 LRU 최대 항목 수 (기본 256)
+    IMAGE_ANALYSIS_CACHE_TIMEOUT: Django 캐시 보관 시간(초) (기본 86400)
+"""
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class AnalysisCache:
+    """내용 해시 -> analysis_result 2단계 캐시"""
+
+    key_prefix = 'image_analysis:result:'
+
+    def __init__(self):
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'local_hits': 0,
+            'shared_hits': 0,
+            'db_hits': 0,
+            'misses': 0,
+        }
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'IMAGE_ANALYSIS_CACHE_SIZE', 256)
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'IMAGE_ANALYSIS_CACHE_TIMEOUT', 60 * 60 * 24)
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _remember(self, content_hash, result):
+        with self._lock:
+            self._local[content_hash] = result
+            self._local.move_to_end(content_hash)
+            while len(self._local) > self.max_size:
+                self._local.popitem(last=False)
+
+    def get(self, content_hash):
+        """캐시된 분석 결과를 반환합니다. 없으면 None"""
+        with self._lock:
+            result = self._local.get(content_hash)
+            if result is not None:
+                self._local.move_to_end(content_hash)
+                self.stats['local_hits'] += 1
+                return result
+
+        result = cache.get(self.key_prefix + content_hash)
+        if result is not None:
+            self._count('shared_hits')
+            self._remember(content_hash, result)
+            return result
+
+        self._count('misses')
+        return None
+
+    def set(self, content_hash, result):
+        """오류 없는 분석 결과만 저장합니다."""
+        if not content_hash or not result or 'error' in result:
+            return
+        self._remember(content_hash, result)
+        cache.set(self.key_prefix + content_hash, result, self.timeout)
+
+    def record_db_hit(self):
+        """DB 에 저장된 동일 이미지로 분석을 건너뛴 경우"""
+        self._count('db_hits')
+
+    def get_stats(self):
+        """적중/실패 카운터와 현재 크기"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['local_size'] = len(self._local)
+        stats['max_size'] = self.max_size
+        lookups = stats['local_hits'] + stats['shared_hits'] + stats['db_hits'] + stats['misses']
+        hits = lookups - stats['misses']
+        stats['hit_rate'] = round(hits / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# 싱글톤 인스턴스
+analysis_cache = AnalysisCache()
@@ -0,0 +1,136 @@
+"""
+색상 검색 인덱스
+
+분석 결과의 color_bins (작업용 사본 픽셀의 LAB 색상 구간별 비율)를 ImageColor 테이블에
+(이미지, 구간, 비율) 행으로 저장하고, (구간, 비율, 이미지) 인덱스로 색상 검색에 답합니다.
+JSON 을 읽거나 테이블 전체를 훑지 않으며 SQLite 와 PostgreSQL 에서 같은 쿼리를 사용합니다.
+
+검색: 기준 색에서 LAB 거리(ΔE) tolerance 이내에 걸치는 구간들의 비율 합이 min_share 이상인 이미지.
+(구간, 비율, 이미지) 커버링 인덱스에서 그 구간들의 행만 읽어 이미지별로 합산하므로
+읽는 행 수는 전체 행 수가 아니라 기준 색 근처 구간의 행 수에 비례합니다.
+
+설정 (settings.py):
+    IMAGE_COLOR_SEARCH_DEFAULT_TOLERANCE: 기본 LAB 거리 (기본 20)
+    IMAGE_COLOR_SEARCH_MAX_TOLERANCE: 최대 LAB 거리 (기본 40)
+    IMAGE_COLOR_SEARCH_DEFAULT_SHARE: 기본 최소 비율 (기본 0.2)
+    IMAGE_COLOR_SEARCH_LIMIT: 최대 결과 수 (기본 20)
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Sum
+from PIL import Image
+
+from .utils import LAB_AB_BANDS, LAB_L_BANDS, WORKING_SIZE, lab_bin, to_lab
+
+
+def get_default_tolerance():
+    return getattr(settings, 'IMAGE_COLOR_SEARCH_DEFAULT_TOLERANCE', 20)
+
+
+def get_max_tolerance():
+    return getattr(settings, 'IMAGE_COLOR_SEARCH_MAX_TOLERANCE', 40)
+
+
+def get_default_share():
+    return getattr(settings, 'IMAGE_COLOR_SEARCH_DEFAULT_SHARE', 0.2)
+
+
+def get_limit():
+    return getattr(settings, 'IMAGE_COLOR_SEARCH_LIMIT', 20)
+
+
+def parse_color(value):
+    """'1e40af' 또는 '#1e40af' 를 (r, g, b) 로 변환 (형식이 잘못되면 ValueError)"""
+    value = value.strip().lstrip('#')
+    if len(value) != 6:
+        raise ValueError(value)
+    return tuple(int(value[index:index + 2], 16) for index in (0, 2, 4))
+
+
+def _pillow_lab(rgb):
+    return to_lab(Image.new('RGB', (1, 1), tuple(rgb))).getpixel((0, 0))
+
+
+def rgb_bin(rgb):
+    """RGB 색이 속한 색상 구간 번호"""
+    return lab_bin(*_pillow_lab(rgb))
+
+
+def get_color_rows(analysis_result):
+    """
+    분석 결과에서 ImageColor 행으로 저장할 (구간, 비율) 목록을 만듭니다.
+
+    color_bins 가 없는 이전 분석 결과는 주요 색상(상위 5개)의 픽셀 수로 대신 계산합니다. (디코드 없음)
+    """
+    if not analysis_result or 'error' in analysis_result:
+        return []
+
+    color_bins = analysis_result.get('color_bins')
+    if color_bins is not None:
+        return [(color_bin, share) for color_bin, share in color_bins]
+
+    dominant_colors = (analysis_result.get('colors') or {}).get('dominant_colors') or []
+    pixel_count = WORKING_SIZE[0] * WORKING_SIZE[1]
+    shares = {}
+    for color in dominant_colors:
+        color_bin = rgb_bin(color['rgb'])
+        shares[color_bin] = shares.get(color_bin, 0) + color['count'] / pixel_count
+    return sorted(((color_bin, round(share, 4)) for color_bin, share in shares.items()),
+                  key=lambda row: row[1], reverse=True)
+
+
+def _band_distance(value, low, high):
+    """value 에서 구간 [low, high) 까지의 거리 (구간 안이면 0)"""
+    return max(low - value, 0, value - high)
+
+
+def bins_within(rgb, tolerance):
+    """기준 색에서 LAB 거리 tolerance 이내에 걸치는 색상 구간 번호 목록"""
+    l_value, a_value, b_value = _pillow_lab(rgb)
+    # Pillow LAB 값을 실제 단위로 (L 0-100, a/b -128-127)
+    lightness = l_value * 100 / 255
+    a_value -= 128
+    b_value -= 128
+
+    l_step = 256 / LAB_L_BANDS
+    ab_step = 256 / LAB_AB_BANDS
+    bins = []
+    for l_index in range(LAB_L_BANDS):
+        l_distance = _band_distance(
+            lightness, l_index * l_step * 100 / 255, (l_index + 1) * l_step * 100 / 255
+        )
+        if l_distance > tolerance:
+            continue
+        for a_index in range(LAB_AB_BANDS):
+            a_distance = _band_distance(a_value, a_index * ab_step - 128, (a_index + 1) * ab_step - 128)
+            for b_index in range(LAB_AB_BANDS):
+                b_distance = _band_distance(b_value, b_index * ab_step - 128, (b_index + 1) * ab_step - 128)
+                if math.sqrt(l_distance ** 2 + a_distance ** 2 + b_distance ** 2) <= tolerance:
+                    bins.append((l_index * LAB_AB_BANDS + a_index) * LAB_AB_BANDS + b_index)
+    return bins
+
+
+def find_by_color(color_queryset, rgb, tolerance, min_share, limit):
+    """
+    기준 색에 가까운 색의 비율이 min_share 이상인 이미지를 비율이 큰 순서로 찾습니다.
+
+    Args:
+        color_queryset: ImageColor 쿼리셋
+
+    Returns:
+        list: [(이미지 id, 비율 합), ...] 최대 limit 개
+    """
+    bins = bins_within(rgb, tolerance)
+    if not bins:
+        return []
+
+    # (구간, 비율, 이미지) 인덱스만 읽어 기준 색 근처 구간의 행을 이미지별로 합산
+    totals = (
+        color_queryset.filter(bin__in=bins)
+        .values('image_id')
+        .annotate(total=Sum('share'))
+        .filter(total__gte=min_share)
+        .order_by('-total', '-image_id')[:limit]
+    )
+    return [(row['image_id'], round(row['total'], 4)) for row in totals]
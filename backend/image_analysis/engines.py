@@ -0,0 +1,62 @@
+"""
+색상/밝기 분석 엔진
+
+분석기(analyze_colors, analyze_brightness)는 엔진이 계산한 평균, 히스토그램,
+고유 색상 수만 사용하므로 엔진을 바꿔도 결과는 동일합니다.
+(대표 색상 팔레트는 엔진과 관계없이 Pillow 양자화로 계산, utils.extract_palette)
+NumPy가 설치되어 있으면 NumpyEngine, 없으면 PillowEngine 을 사용합니다.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PillowEngine:
+    """Pillow 내장 함수와 순수 파이썬으로 계산하는 기본 엔진"""
+
+    name = 'pillow'
+
+    def mean(self, gray):
+        """그레이스케일 이미지의 평균 픽셀 값 (0-255)"""
+        pixels = list(gray.getdata())
+        return sum(pixels) / len(pixels)
+
+    def histogram(self, gray):
+        """그레이스케일 이미지의 256 구간 히스토그램"""
+        return gray.histogram()
+
+    def unique_colors(self, rgb):
+        """RGB 이미지의 고유 색상 수"""
+        width, height = rgb.size
+        colors = rgb.getcolors(width * height)
+        return len(colors) if colors else 0
+
+
+class NumpyEngine:
+    """Pillow 버퍼를 NumPy 배열로 받아 픽셀 단위 파이썬 객체 없이 계산하는 엔진"""
+
+    name = 'numpy'
+
+    def mean(self, gray):
+        return float(np.asarray(gray).mean())
+
+    def histogram(self, gray):
+        counts = np.bincount(np.asarray(gray).ravel(), minlength=256)
+        return counts.tolist()
+
+    def unique_colors(self, rgb):
+        pixels = np.asarray(rgb).reshape(-1, 3).astype(np.uint32)
+        if pixels.size == 0:
+            return 0
+
+        # RGB 를 24비트 정수로 묶어서 고유 값 개수 계산
+        packed = (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+        return len(np.unique(packed))
+
+
+def get_engine():
+    """사용 가능한 가장 빠른 분석 엔진을 반환합니다."""
+    if np is not None:
+        return NumpyEngine()
+    return PillowEngine()
@@ -0,0 +1,213 @@
+"""
+EXIF 추출
+
+분석 결과('metadata')에는 허용 목록의 태그만 숫자/문자열 타입 그대로 넣고,
+MakerNote, 썸네일 같은 바이너리 값은 넣지 않습니다. (목록/상세 응답과 행 크기를 작게 유지)
+촬영 정보(Exif IFD)와 위치 정보(GPS IFD)는 허용 목록에 그 IFD 의 태그가 있을 때만 파싱합니다.
+
+파일의 EXIF 원본 바이트는 ImageExif 테이블에 따로 저장하고,
+GET /api/images/{id}/exif/ 를 요청할 때만 읽어 전체 태그로 풀어 돌려줍니다. (exif_to_dict)
+
+일괄 분석 워커에서도 import 하므로 Django 에 의존하지 않습니다. (설정은 있을 때만 읽음)
+
+설정 (settings.py):
+    IMAGE_EXIF_TAGS: 분석 결과에 넣을 태그 이름 목록 (PIL.ExifTags.Base / GPS 이름, 기본 DEFAULT_EXIF_TAGS)
+"""
+import base64
+import math
+
+from PIL import ExifTags, Image
+from PIL.TiffImagePlugin import IFDRational
+
+# 기본 허용 태그 (위치 정보는 기본으로 저장하지 않음, GPSLatitude 등을 추가하면 GPS IFD 도 읽음)
+DEFAULT_EXIF_TAGS = [
+    'Make',
+    'Model',
+    'Orientation',
+    'Software',
+    'DateTime',
+    'DateTimeOriginal',
+    'OffsetTimeOriginal',
+    'ExposureTime',
+    'FNumber',
+    'ISOSpeedRatings',
+    'ExposureBiasValue',
+    'FocalLength',
+    'FocalLengthIn35mmFilm',
+    'Flash',
+    'WhiteBalance',
+    'LensModel',
+]
+
+# 허용 목록의 문자열 값 최대 길이 (조작된 파일의 긴 문자열이 결과에 들어가지 않도록)
+MAX_STRING_LENGTH = 256
+
+# 전체 EXIF 에서 풀어 볼 하위 IFD
+SUB_IFDS = [ExifTags.IFD.Exif, ExifTags.IFD.GPSInfo, ExifTags.IFD.Interop, ExifTags.IFD.IFD1]
+
+# 도/분/초를 십진 도로 바꾸는 GPS 태그와 방향 태그
+GPS_COORDINATES = {'GPSLatitude': 'GPSLatitudeRef', 'GPSLongitude': 'GPSLongitudeRef'}
+
+
+def get_exif_tags():
+    """분석 결과에 넣을 EXIF 태그 이름 목록 (Django 설정이 없는 환경에서는 기본값)"""
+    try:
+        from django.conf import settings
+        return getattr(settings, 'IMAGE_EXIF_TAGS', DEFAULT_EXIF_TAGS)
+    except Exception:
+        return DEFAULT_EXIF_TAGS
+
+
+def load_exif(raw):
+    """EXIF 원본 바이트를 PIL.Image.Exif 로 (IFD0 만 읽고 하위 IFD 는 get_ifd 할 때 파싱)"""
+    exif = Image.Exif()
+    if raw:
+        exif.load(raw)
+    return exif
+
+
+def exif_value(value, keep_binary=False):
+    """
+    EXIF 값을 JSON 타입으로 변환합니다.
+
+    유리수는 float (분모가 0 이면 None), 정수는 int, 문자열은 끝의 NUL 을 뗀 str, 값이 하나인 튜플은 그 값으로 바꿉니다.
+    바이너리 값은 keep_binary 이면 base64 문자열, 아니면 None (저장하지 않음)
+    """
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode('ascii') if keep_binary else None
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return value
+    if isinstance(value, (IFDRational, float)):
+        try:
+            number = float(value)
+        except ZeroDivisionError:
+            # 분모가 0 인 유리수 (손상되거나 조작된 파일)
+            return None
+        return round(number, 6) if math.isfinite(number) else None
+    if isinstance(value, str):
+        value = value.strip('\x00').strip()
+        if not keep_binary:
+            value = value[:MAX_STRING_LENGTH]
+        return value or None
+    if isinstance(value, (tuple, list)):
+        items = [exif_value(item, keep_binary) for item in value]
+        if not items or any(item is None for item in items):
+            return None
+        return items[0] if len(items) == 1 else items
+    return None
+
+
+def _gps_degrees(dms, ref):
+    """도/분/초 유리수 튜플과 방향(N/S/E/W)을 부호 있는 십진 도로"""
+    try:
+        degrees, minutes, seconds = (float(part) for part in dms)
+    except (TypeError, ValueError, ZeroDivisionError):
+        return None
+    value = degrees + minutes / 60 + seconds / 3600
+    if not math.isfinite(value):
+        return None
+    if isinstance(ref, bytes):
+        ref = ref.decode('ascii', 'ignore')
+    if ref and ref.strip('\x00').upper() in ('S', 'W'):
+        value = -value
+    return round(value, 6)
+
+
+def extract_exif(exif, tags=None):
+    """
+    허용 목록의 태그만 타입을 살려 꺼냅니다.
+
+    Args:
+        exif: PIL.Image.Exif
+        tags: 태그 이름 목록 (기본 get_exif_tags())
+
+    Returns:
+        dict: {태그 이름: 값} (값이 없거나 바이너리인 태그는 제외)
+    """
+    tags = get_exif_tags() if tags is None else tags
+    base_tags = {}
+    gps_tags = []
+    for name in tags:
+        if name in ExifTags.GPS.__members__:
+            gps_tags.append(name)
+        elif name in ExifTags.Base.__members__:
+            base_tags[ExifTags.Base[name].value] = name
+
+    metadata = {}
+
+    def put(name, value):
+        value = exif_value(value)
+        if value is not None:
+            metadata[name] = value
+
+    # IFD0 (제조사, 모델, 방향 등)
+    missing = {}
+    for tag_id, name in base_tags.items():
+        if tag_id in exif:
+            put(name, exif[tag_id])
+        else:
+            missing[tag_id] = name
+
+    # 촬영 정보는 Exif IFD 에 있으므로 IFD0 에 없는 태그를 요청했을 때만 파싱
+    if missing and ExifTags.IFD.Exif in exif:
+        exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+        for tag_id, name in missing.items():
+            if tag_id in exif_ifd:
+                put(name, exif_ifd[tag_id])
+
+    if gps_tags and ExifTags.IFD.GPSInfo in exif:
+        gps_ifd = exif.get_ifd(ExifTags.IFD.GPSInfo)
+        for name in gps_tags:
+            tag_id = ExifTags.GPS[name].value
+            if tag_id not in gps_ifd:
+                continue
+            if name in GPS_COORDINATES:
+                ref = gps_ifd.get(ExifTags.GPS[GPS_COORDINATES[name]].value)
+                degrees = _gps_degrees(gps_ifd[tag_id], ref)
+                if degrees is not None:
+                    metadata[name] = degrees
+            else:
+                put(name, gps_ifd[tag_id])
+
+    return metadata
+
+
+def _tag_name(tag_id, names):
+    try:
+        return names(tag_id).name
+    except ValueError:
+        return f'0x{tag_id:04x}'
+
+
+def exif_to_dict(raw):
+    """
+    EXIF 원본 바이트의 모든 태그 (IFD0 태그와 하위 IFD 별 태그, 바이너리 값은 base64)
+
+    Returns:
+        dict: {태그 이름: 값, ..., 'Exif': {...}, 'GPSInfo': {...}, 'Interop': {...}, 'IFD1': {...}}
+    """
+    exif = load_exif(raw)
+    sub_ifd_ids = {ifd.value for ifd in SUB_IFDS}
+    result = {}
+    for tag_id, value in exif.items():
+        if tag_id in sub_ifd_ids:
+            continue
+        result[_tag_name(tag_id, ExifTags.Base)] = exif_value(value, keep_binary=True)
+
+    for ifd in SUB_IFDS:
+        try:
+            values = exif.get_ifd(ifd)
+        except KeyError:
+            # Pillow 는 Exif IFD 에 Interop 포인터가 없으면 KeyError 를 냄
+            continue
+        if not values:
+            continue
+        names = ExifTags.GPS if ifd == ExifTags.IFD.GPSInfo else ExifTags.Base
+        result[ifd.name] = {
+            _tag_name(tag_id, names): exif_value(value, keep_binary=True)
+            for tag_id, value in values.items()
+            if tag_id not in sub_ifd_ids and not isinstance(value, dict)
+        }
+    return result
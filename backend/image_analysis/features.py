@@ -0,0 +1,136 @@
+"""
+분석 결과 요약 컬럼
+
+밝기, 가로세로 비율, 그레이스케일/투명도 여부, 고유 색상 수, 대표 색상, 분석 버전처럼 자주 읽는 값을
+analysis_result JSON 에서 꺼내 타입이 있는 인덱스 컬럼에 저장합니다.
+목록 필터와 정렬, 관리자 페이지가 JSON 을 읽지 않고 SQL 로 처리합니다.
+
+분석 결과 딕셔너리만 사용하므로 저장된 결과에서 이미지를 다시 디코드하지 않고 컬럼을 채울 수 있습니다.
+"""
+from rest_framework.exceptions import ValidationError
+
+from .mood import MOOD_CHOICES
+
+BRIGHTNESS_LEVEL_CHOICES = [
+    ('dark', '어두움'),
+    ('medium', '보통'),
+    ('bright', '밝음'),
+]
+
+# 분석 결과를 저장할 때 함께 갱신할 컬럼 (save(update_fields=...) 용)
+SCALAR_FIELDS = [
+    'brightness_average',
+    'brightness_level',
+    'aspect_ratio',
+    'is_grayscale',
+    'has_transparency',
+    'unique_colors',
+    'dominant_color',
+    'analysis_version',
+]
+
+# 목록 범위 필터: 쿼리 파라미터 접미사 없는 이름 -> (컬럼, 변환 함수)
+RANGE_FILTERS = {
+    'brightness': ('brightness_average', float),
+    'aspect_ratio': ('aspect_ratio', float),
+    'unique_colors': ('unique_colors', int),
+}
+
+# 목록 참/거짓 필터
+BOOLEAN_FILTERS = ['is_grayscale', 'has_transparency']
+
+BOOLEAN_VALUES = {'true': True, '1': True, 'false': False, '0': False}
+
+
+def pack_rgb(rgb):
+    """(r, g, b) 를 0xRRGGBB 정수로"""
+    red, green, blue = rgb
+    return (red << 16) | (green << 8) | blue
+
+
+def format_rgb(value):
+    """0xRRGGBB 정수를 '#rrggbb' 로 (None 이면 None)"""
+    if value is None:
+        return None
+    return f'#{value:06x}'
+
+
+def get_scalar_fields(analysis_result):
+    """분석 결과로 채울 UploadedImage 의 요약 컬럼 값 (값이 없으면 None, 밝기 레벨은 빈 문자열)"""
+    fields = {field: None for field in SCALAR_FIELDS}
+    fields['brightness_level'] = ''
+    if not analysis_result or 'error' in analysis_result:
+        return fields
+
+    brightness = analysis_result.get('brightness') or {}
+    colors = analysis_result.get('colors') or {}
+    dominant_colors = colors.get('dominant_colors') or []
+
+    fields.update({
+        'brightness_average': brightness.get('average'),
+        'brightness_level': brightness.get('level') or '',
+        'aspect_ratio': (analysis_result.get('dimensions') or {}).get('aspect_ratio'),
+        'is_grayscale': analysis_result.get('is_grayscale'),
+        'has_transparency': analysis_result.get('has_transparency'),
+        'unique_colors': colors.get('unique_colors_count'),
+        'dominant_color': pack_rgb(dominant_colors[0]['rgb']) if dominant_colors else None,
+        'analysis_version': analysis_result.get('analysis_version'),
+    })
+    return fields
+
+
+def _parse(value, convert, name):
+    try:
+        return convert(value)
+    except ValueError:
+        raise ValidationError({name: '숫자여야 합니다.'})
+
+
+def filter_images(queryset, params):
+    """
+    목록 쿼리 파라미터로 요약 컬럼 조건을 겁니다. (잘못된 값이면 ValidationError)
+
+        ?brightness_level=dark  ?is_grayscale=true  ?has_transparency=false  ?mood=intense
+        ?min_brightness=20&max_brightness=60  ?min_aspect_ratio=1.5  ?max_unique_colors=100
+        ?dominant_color=1e40af
+    """
+    level = params.get('brightness_level')
+    if level:
+        if level not in dict(BRIGHTNESS_LEVEL_CHOICES):
+            raise ValidationError({'brightness_level': f'{", ".join(dict(BRIGHTNESS_LEVEL_CHOICES))} 중 하나여야 합니다.'})
+        queryset = queryset.filter(brightness_level=level)
+
+    mood = params.get('mood')
+    if mood:
+        if mood not in dict(MOOD_CHOICES):
+            raise ValidationError({'mood': f'{", ".join(dict(MOOD_CHOICES))} 중 하나여야 합니다.'})
+        queryset = queryset.filter(mood=mood)
+
+    for name in BOOLEAN_FILTERS:
+        value = params.get(name)
+        if value is None:
+            continue
+        if value.lower() not in BOOLEAN_VALUES:
+            raise ValidationError({name: 'true 또는 false 여야 합니다.'})
+        queryset = queryset.filter(**{name: BOOLEAN_VALUES[value.lower()]})
+
+    for name, (column, convert) in RANGE_FILTERS.items():
+        low = params.get(f'min_{name}')
+        if low:
+            queryset = queryset.filter(**{f'{column}__gte': _parse(low, convert, f'min_{name}')})
+        high = params.get(f'max_{name}')
+        if high:
+            queryset = queryset.filter(**{f'{column}__lte': _parse(high, convert, f'max_{name}')})
+
+    dominant_color = params.get('dominant_color')
+    if dominant_color:
+        value = dominant_color.strip().lstrip('#')
+        try:
+            if len(value) != 6:
+                raise ValueError(value)
+            packed = int(value, 16)
+        except ValueError:
+            raise ValidationError({'dominant_color': '16진수 RGB 값이어야 합니다. (예: 1e40af)'})
+        queryset = queryset.filter(dominant_color=packed)
+
+    return queryset
@@ -0,0 +1,360 @@
+"""
+디코드 없이 이미지 헤더 읽기
+
+파일 앞부분과 청크/세그먼트 헤더만 읽어 포맷, 크기, 프레임 수를 구합니다.
+큰 블록은 읽지 않고 seek 로 건너뛰므로 보통 수 KB 만 읽습니다.
+(GIF 는 프레임 수를 세기 위해 하위 블록의 길이 바이트만 읽음)
+업로드 검증(UploadImageField)이 이 값으로 허용 포맷과 픽셀 예산을 먼저 검사하고,
+통과한 헤더는 업로드 파일의 image_header 로 넘겨 분석 단계가 다시 파싱하지 않게 합니다.
+
+설정 (settings.py):
+    IMAGE_UPLOAD_ALLOWED_FORMATS: 허용 포맷 (기본 ['JPEG', 'PNG', 'GIF', 'BMP', 'WEBP'])
+    IMAGE_UPLOAD_MAX_PIXELS: 프레임당 최대 픽셀 수 (기본 2억, Pillow 의 Image.MAX_IMAGE_PIXELS 도 이 값으로 맞춤)
+    IMAGE_UPLOAD_MAX_FRAMES: 최대 프레임 수 (기본 500)
+    IMAGE_UPLOAD_MAX_TOTAL_PIXELS: 분석할 때 디코드하는 전체 프레임의 픽셀 수 합의 최대값 (기본 4억)
+        애니메이션은 고른 프레임까지 앞 프레임을 모두 디코드하므로
+        프레임당 픽셀 수 x min(프레임 수, IMAGE_ANIMATION_FRAME_BUDGET) 로 계산합니다.
+"""
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from .animation import get_frame_budget
+from .utils import SNIFF_BYTES, sniff_format
+
+# frames 는 헤더 읽기 한도 안에서 셀 수 없으면 None
+ImageHeader = namedtuple('ImageHeader', ['format', 'width', 'height', 'frames'])
+
+DEFAULT_ALLOWED_FORMATS = ['JPEG', 'PNG', 'GIF', 'BMP', 'WEBP']
+
+# 헤더를 읽으며 실제로 read() 할 최대 바이트 수 (건너뛰는 부분은 제외)
+MAX_HEADER_READ = 64 * 1024
+
+# 길이 필드가 없는 JPEG 마커 (SOI, TEM, RST0-7)
+JPEG_STANDALONE_MARKERS = {0xD8, 0x01, *range(0xD0, 0xD8)}
+# 크기가 들어 있는 JPEG SOF 마커 (DHT, JPG, DAC 제외)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+class HeaderError(ValueError):
+    """헤더를 읽을 수 없거나 잘린 파일"""
+
+
+class UnknownFormatError(HeaderError):
+    """매직 넘버로 포맷을 판별할 수 없는 파일"""
+
+
+class _HeaderReader:
+    """읽은 바이트 수를 세고 한도를 넘으면 멈추는 읽기 도우미"""
+
+    def __init__(self, image_file):
+        self.file = image_file
+        self.bytes_read = 0
+
+    def read(self, size):
+        if self.bytes_read + size > MAX_HEADER_READ:
+            raise HeaderError('헤더가 너무 깁니다.')
+        data = self.file.read(size)
+        self.bytes_read += len(data)
+        if len(data) < size:
+            raise HeaderError('파일이 잘렸습니다.')
+        return data
+
+    def skip(self, size):
+        self.file.seek(size, 1)
+
+
+def _read_jpeg(reader):
+    reader.skip(2)
+    while True:
+        if reader.read(1) != b'\xff':
+            raise HeaderError('JPEG 마커가 없습니다.')
+        marker = reader.read(1)[0]
+        while marker == 0xFF:
+            marker = reader.read(1)[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker == 0xD9:
+            raise HeaderError('JPEG 프레임 헤더가 없습니다.')
+        length = struct.unpack('>H', reader.read(2))[0]
+        if length < 2:
+            raise HeaderError('잘못된 JPEG 세그먼트입니다.')
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack('>xHH', reader.read(5))
+            return width, height, 1
+        reader.skip(length - 2)
+
+
+def _read_png(reader):
+    reader.skip(8)
+    length, chunk_type = struct.unpack('>I4s', reader.read(8))
+    if chunk_type != b'IHDR':
+        raise HeaderError('PNG IHDR 청크가 없습니다.')
+    width, height = struct.unpack('>II', reader.read(8))
+    reader.skip(length - 8 + 4)
+
+    # APNG 는 첫 IDAT 앞의 acTL 청크에 프레임 수가 있음
+    while True:
+        length, chunk_type = struct.unpack('>I4s', reader.read(8))
+        if chunk_type == b'acTL':
+            frames = struct.unpack('>I', reader.read(4))[0]
+            return width, height, frames
+        if chunk_type in (b'IDAT', b'IEND'):
+            return width, height, 1
+        reader.skip(length + 4)
+
+
+def _skip_gif_sub_blocks(reader):
+    while True:
+        size = reader.read(1)[0]
+        if size == 0:
+            return
+        reader.skip(size)
+
+
+def _read_gif(reader):
+    reader.skip(6)
+    width, height, flags = struct.unpack('<HHB', reader.read(5))
+    reader.skip(2)
+    if flags & 0x80:
+        reader.skip(3 << ((flags & 0x07) + 1))
+
+    # 이미지 블록 수 세기 (LZW 데이터 하위 블록은 길이만 읽고 건너뜀)
+    frames = 0
+    try:
+        while True:
+            block = reader.read(1)
+            if block == b'\x2c':
+                frames += 1
+                flags = reader.read(9)[8]
+                if flags & 0x80:
+                    reader.skip(3 << ((flags & 0x07) + 1))
+                reader.skip(1)
+                _skip_gif_sub_blocks(reader)
+            elif block == b'\x21':
+                reader.skip(1)
+                _skip_gif_sub_blocks(reader)
+            elif block == b'\x3b':
+                break
+            else:
+                raise HeaderError('잘못된 GIF 블록입니다.')
+    except HeaderError:
+        # 첫 프레임까지 읽었으면 프레임 수만 모르는 것으로 처리
+        if frames == 0:
+            raise
+        return width, height, None
+    if frames == 0:
+        raise HeaderError('GIF 프레임이 없습니다.')
+    return width, height, frames
+
+
+def _read_webp(reader):
+    reader.skip(12)
+    chunk_type, length = struct.unpack('<4sI', reader.read(8))
+    if chunk_type == b'VP8 ':
+        data = reader.read(10)
+        if data[3:6] != b'\x9d\x01\x2a':
+            raise HeaderError('잘못된 VP8 프레임입니다.')
+        width, height = struct.unpack('<HH', data[6:10])
+        return width & 0x3FFF, height & 0x3FFF, 1
+    if chunk_type == b'VP8L':
+        data = reader.read(5)
+        if data[0] != 0x2F:
+            raise HeaderError('잘못된 VP8L 프레임입니다.')
+        bits = int.from_bytes(data[1:5], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1, 1
+    if chunk_type == b'VP8X':
+        data = reader.read(10)
+        width = int.from_bytes(data[4:7], 'little') + 1
+        height = int.from_bytes(data[7:10], 'little') + 1
+        if not data[0] & 0x02:
+            return width, height, 1
+        reader.skip(length - 10 + (length & 1))
+
+        # 애니메이션: ANMF 청크 헤더만 읽어 프레임 수 세기
+        frames = 0
+        while True:
+            try:
+                chunk_type, length = struct.unpack('<4sI', reader.read(8))
+            except HeaderError:
+                return width, height, frames or None
+            if chunk_type == b'ANMF':
+                frames += 1
+            reader.skip(length + (length & 1))
+    raise HeaderError('알 수 없는 WEBP 청크입니다.')
+
+
+def _read_bmp(reader):
+    reader.skip(14)
+    header_size = struct.unpack('<I', reader.read(4))[0]
+    if header_size == 12:
+        width, height = struct.unpack('<HH', reader.read(4))
+    elif header_size >= 40:
+        width, height = struct.unpack('<ii', reader.read(8))
+    else:
+        raise HeaderError('알 수 없는 BMP 헤더입니다.')
+    # 높이가 음수면 위에서 아래로 저장된 이미지
+    return width, abs(height), 1
+
+
+HEADER_READERS = {
+    'JPEG': _read_jpeg,
+    'PNG': _read_png,
+    'GIF': _read_gif,
+    'WEBP': _read_webp,
+    'BMP': _read_bmp,
+}
+
+
+def read_header(image_file, image_format=None):
+    """
+    이미지를 디코드하지 않고 헤더에서 포맷, 크기, 프레임 수를 읽습니다.
+
+    Args:
+        image_file: 업로드 파일 또는 이진 파일 객체
+        image_format: 업로드 핸들러가 판별한 포맷 (없으면 파일 앞부분으로 판별)
+
+    Returns:
+        tuple: (ImageHeader, 실제로 읽은 바이트 수)
+
+    Raises:
+        HeaderError: 알 수 없는 포맷이거나 헤더가 잘못된 경우
+    """
+    image_file.seek(0)
+    try:
+        if image_format is None:
+            image_format = sniff_format(image_file.read(SNIFF_BYTES))
+            image_file.seek(0)
+        if image_format not in HEADER_READERS:
+            raise UnknownFormatError('이미지 형식을 알 수 없습니다.')
+
+        reader = _HeaderReader(image_file)
+        try:
+            width, height, frames = HEADER_READERS[image_format](reader)
+        except struct.error:
+            raise HeaderError('파일이 잘렸습니다.')
+        if width <= 0 or height <= 0:
+            raise HeaderError('이미지 크기가 잘못되었습니다.')
+        return ImageHeader(image_format, width, height, frames), reader.bytes_read
+    finally:
+        image_file.seek(0)
+
+
+def get_allowed_formats():
+    return getattr(settings, 'IMAGE_UPLOAD_ALLOWED_FORMATS', DEFAULT_ALLOWED_FORMATS)
+
+
+def get_max_pixels():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_PIXELS', 200 * 1000 * 1000)
+
+
+def get_max_frames():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_FRAMES', 500)
+
+
+def get_max_total_pixels():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_TOTAL_PIXELS', 400 * 1000 * 1000)
+
+
+def decoded_frames(frames):
+    """분석할 때 디코드하는 프레임 수 (프레임 수를 모르면 프레임 예산 전체로 봄, animation.sample_indices)"""
+    budget = max(1, get_frame_budget())
+    return budget if frames is None else min(frames, budget)
+
+
+class RejectionStats:
+    """디코드 전에 거절한 업로드 통계 (현재 프로세스 기준)"""
+
+    reasons = ('size', 'format', 'header', 'pixels', 'frames')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.stats = {
+                'checked': 0,
+                'accepted': 0,
+                'rejected': {reason: 0 for reason in self.reasons},
+                # 거절해서 저장/디코드하지 않은 바이트와 픽셀
+                'rejected_bytes': 0,
+                'rejected_pixels': 0,
+                'header_bytes_read': 0,
+                'header_seconds': 0.0,
+            }
+
+    def record_check(self, bytes_read, seconds):
+        with self._lock:
+            self.stats['checked'] += 1
+            self.stats['header_bytes_read'] += bytes_read
+            self.stats['header_seconds'] += seconds
+
+    def record_accept(self):
+        with self._lock:
+            self.stats['accepted'] += 1
+
+    def record_reject(self, reason, size, pixels=0):
+        with self._lock:
+            self.stats['rejected'][reason] += 1
+            self.stats['rejected_bytes'] += size or 0
+            self.stats['rejected_pixels'] += pixels
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats, rejected=dict(self.stats['rejected']))
+        checked = stats['checked']
+        stats['avg_header_bytes'] = round(stats['header_bytes_read'] / checked) if checked else 0
+        stats['avg_header_ms'] = round(stats.pop('header_seconds') / checked * 1000, 3) if checked else 0.0
+        return stats
+
+
+# 싱글톤 인스턴스
+rejection_stats = RejectionStats()
+
+
+def check_header(image_file, image_format=None):
+    """
+    헤더를 읽어 허용 포맷, 프레임당 픽셀 수, 프레임 수, 디코드할 전체 픽셀 수를 검사합니다.
+
+    Returns:
+        tuple: (ImageHeader, None) 또는 거절 시 (None 또는 ImageHeader, (사유, 메시지))
+    """
+    start = time.perf_counter()
+    try:
+        header, bytes_read = read_header(image_file, image_format)
+    except HeaderError as e:
+        rejection_stats.record_check(0, time.perf_counter() - start)
+        reason = 'format' if isinstance(e, UnknownFormatError) else 'header'
+        return None, (reason, f'유효하지 않은 이미지 파일입니다: {e}')
+    rejection_stats.record_check(bytes_read, time.perf_counter() - start)
+
+    allowed = get_allowed_formats()
+    if header.format not in allowed:
+        return header, ('format', f"지원되지 않는 이미지 포맷입니다. 지원 포맷: {', '.join(allowed)}")
+
+    max_pixels = get_max_pixels()
+    if header.width * header.height > max_pixels:
+        return header, (
+            'pixels',
+            f'이미지 해상도가 너무 큽니다. (최대 {max_pixels:,} 픽셀, 현재: {header.width}x{header.height})'
+        )
+
+    max_frames = get_max_frames()
+    if header.frames is not None and header.frames > max_frames:
+        return header, ('frames', f'프레임이 너무 많습니다. (최대 {max_frames}개, 현재: {header.frames}개)')
+
+    # 프레임마다는 제한 이내여도 디코드할 프레임을 모두 합치면 너무 큰 애니메이션
+    frames = decoded_frames(header.frames)
+    max_total_pixels = get_max_total_pixels()
+    if header.width * header.height * frames > max_total_pixels:
+        return header, (
+            'pixels',
+            f'애니메이션의 전체 해상도가 너무 큽니다. (최대 {max_total_pixels:,} 픽셀, '
+            f'현재: {header.width}x{header.height} x {frames}프레임)'
+        )
+
+    return header, None
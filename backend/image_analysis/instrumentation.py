@@ -0,0 +1,150 @@
+"""
+단계별 처리 시간 계측
+
+요청 처리의 단계(업로드 파싱, 검증, 디코드, 분석기별, EXIF, DB 쿼리, 썸네일, Spotify 호출)를
+with stage('decode'): 블록으로 감싸 시간을 재고 두 곳에 기록합니다.
+    - 프로세스 누적: 단계별 Prometheus 히스토그램 (GET /api/metrics/, render_metrics)
+    - 요청별: 처리 중인 요청의 단계별 합계 (Server-Timing 헤더, middleware.InstrumentationMiddleware)
+
+단계가 중첩되면 안쪽 단계의 시간을 바깥 단계에서 빼고 기록하므로(자기 시간)
+한 요청의 단계 시간을 더하면 계측한 구간의 전체 시간이 됩니다.
+(예: colors 분석기가 처음 작업용 사본을 만들며 디코드한 시간은 decode 로만 집계)
+
+요청 밖(비동기 분석 워커 스레드, 관리 명령)의 단계도 누적 히스토그램에는 기록됩니다.
+분석 프로세스 풀(비동기 분석, 일괄 업로드/재분석) 워커 안의 단계는 그 프로세스에만 남으므로 집계되지 않습니다.
+
+일괄 분석 워커에서도 import 하므로 Django 에 의존하지 않습니다.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# 히스토그램 구간 상한 (초)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 처리 중인 요청의 {단계: [합계 초, 횟수]} (요청 밖이면 None)
+_request_timings = contextvars.ContextVar('request_timings', default=None)
+# 실행 중인 바깥 단계가 안쪽 단계 시간을 더해 두는 [초] (자기 시간 계산용)
+_parent_stage = contextvars.ContextVar('parent_stage', default=None)
+
+
+class Histogram:
+    """레이블 값 조합별 누적 히스토그램 (Prometheus 텍스트 형식으로 출력)"""
+
+    def __init__(self, name, description, labels, buckets=BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, label_values, seconds):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # 구간별 개수 (마지막 칸은 +Inf), 합계, 개수
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            index = 0
+            while index < len(self.buckets) and seconds > self.buckets[index]:
+                index += 1
+            series[0][index] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def render(self):
+        with self._lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self._series.items()}
+
+        lines = [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} histogram']
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = ','.join(f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, None), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound is None else repr(bound)
+                lines.append(f'{self.name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total:.6f}')
+            lines.append(f'{self.name}_count{{{labels}}} {count}')
+        return '\n'.join(lines)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# 싱글톤 인스턴스
+stage_metrics = Histogram(
+    'image_analysis_stage_duration_seconds', '단계별 처리 시간 (안쪽 단계를 뺀 자기 시간)', ('stage',)
+)
+request_metrics = Histogram(
+    'image_analysis_request_duration_seconds', '뷰별 요청 처리 시간', ('view', 'method', 'status')
+)
+
+
+def record(name, seconds):
+    """단계 시간을 누적 히스토그램과 처리 중인 요청의 합계에 기록합니다."""
+    stage_metrics.observe((name,), seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        entry = timings.get(name)
+        if entry is None:
+            timings[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+
+@contextmanager
+def stage(name):
+    """
+    블록의 실행 시간을 name 단계로 기록합니다. (안쪽 단계 시간은 빼고)
+
+        with stage('decode'):
+            ...
+    """
+    parent = _parent_stage.get()
+    children = [0.0]
+    token = _parent_stage.set(children)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _parent_stage.reset(token)
+        if parent is not None:
+            parent[0] += elapsed
+        # 동시에 실행한 안쪽 단계(asyncio.gather)의 합이 더 길 수 있으므로 0 아래로 내려가지 않게 함
+        record(name, max(elapsed - children[0], 0.0))
+
+
+def in_request():
+    """요청을 처리하는 중인지 (begin_request 와 end_request 사이, sync_to_async 스레드 포함)"""
+    return _request_timings.get() is not None
+
+
+def begin_request():
+    """요청별 단계 기록을 시작합니다. (end_request 에 돌려줄 토큰 반환)"""
+    return _request_timings.set({})
+
+
+def end_request(token):
+    """
+    요청별 단계 기록을 끝냅니다.
+
+    Returns:
+        dict: {단계: [합계 초, 횟수]} (기록한 순서)
+    """
+    timings = _request_timings.get()
+    _request_timings.reset(token)
+    return timings or {}
+
+
+def render_metrics():
+    """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+    return '\n'.join((stage_metrics.render(), request_metrics.render())) + '\n'
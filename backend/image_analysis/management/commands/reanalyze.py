@@ -0,0 +1,235 @@
+"""
+저장된 이미지 일괄 재분석
+
+    python manage.py reanalyze [--outdated | --analysis-version N] [--failed-only] [--since 2024-01-01] [--until 2024-12-31]
+                               [--full] [--workers 4] [--chunk-size 200] [--resume] [--dry-run]
+
+id 순서로 chunk-size 개씩 읽어 프로세스 풀(batch.BatchAnalyzer)에서 분석하고,
+청크마다 한 트랜잭션에서 bulk_update 로 기록한 뒤 체크포인트(마지막 id)를 저장합니다.
+중단되면 --resume 으로 같은 조건의 마지막 체크포인트부터 이어서 처리합니다.
+
+저장된 결과의 analyzer_versions 를 보고 버전이 바뀐 분석기만 다시 실행하며,
+모든 분석기가 현재 버전인 이미지는 파일을 열지 않고 건너뜁니다. (--full 이면 전체 분석)
+
+분석에 실패한 이미지와 원본 파일이 없는 이미지는 기존 결과를 그대로 두고 id 를 보고합니다.
+
+설정 (settings.py):
+    IMAGE_REANALYZE_CHECKPOINT: 체크포인트 파일 경로 (기본 BASE_DIR/reanalyze_checkpoint.json)
+"""
+import json
+import os
+import time
+from datetime import datetime, time as datetime_time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from image_analysis.batch import BatchAnalyzer, stored_source
+from image_analysis.cache import analysis_cache
+from image_analysis.models import ANALYSIS_FIELDS, ImageColor, UploadedImage
+from image_analysis.utils import ANALYSIS_VERSION, stale_sections
+
+# bulk_update 로 기록하는 컬럼
+UPDATE_FIELDS = ['analysis_result', 'analysis_completed', 'analysis_status', *ANALYSIS_FIELDS]
+
+
+def get_checkpoint_path():
+    return getattr(settings, 'IMAGE_REANALYZE_CHECKPOINT', os.path.join(settings.BASE_DIR, 'reanalyze_checkpoint.json'))
+
+
+def parse_date(value, end_of_day=False):
+    """'2024-05-01' 을 그날 0시 (end_of_day 이면 다음 날 0시 직전) 의 aware datetime 으로"""
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'날짜 형식이 잘못되었습니다: {value} (예: 2024-05-01)')
+    moment = datetime.combine(day, datetime_time.max if end_of_day else datetime_time.min)
+    return timezone.make_aware(moment) if settings.USE_TZ else moment
+
+
+class Command(BaseCommand):
+    help = '저장된 이미지를 프로세스 풀에서 다시 분석합니다. (청크 단위 기록, 체크포인트로 이어서 실행)'
+
+    def add_arguments(self, parser):
+        version = parser.add_mutually_exclusive_group()
+        version.add_argument(
+            '--outdated', action='store_true',
+            help=f'현재 분석 버전({ANALYSIS_VERSION})보다 낮은 버전의 결과만 (버전 기록이 없는 결과 포함)'
+        )
+        version.add_argument('--analysis-version', type=int, help='이 분석 버전의 결과만 (0 이면 버전 기록이 없는 결과)')
+        parser.add_argument('--failed-only', action='store_true', help='분석이 끝나지 않은 이미지만 (analysis_completed=False)')
+        parser.add_argument('--full', action='store_true', help='버전과 관계없이 모든 분석기를 다시 실행')
+        parser.add_argument('--since', help='이 날짜 이후 업로드 (YYYY-MM-DD)')
+        parser.add_argument('--until', help='이 날짜까지 업로드 (YYYY-MM-DD, 그날 포함)')
+        parser.add_argument(
+            '--workers', type=int,
+            help='분석 프로세스 수 (기본 IMAGE_ANALYSIS_BATCH_WORKERS, 0 이면 현재 프로세스에서 분석)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=200, help='한 번에 분석하고 기록할 이미지 수 (기본 200)')
+        parser.add_argument('--checkpoint', default=None, help='체크포인트 파일 경로 (기본 IMAGE_REANALYZE_CHECKPOINT)')
+        parser.add_argument('--resume', action='store_true', help='체크포인트의 마지막 id 다음부터 이어서 처리')
+        parser.add_argument('--dry-run', action='store_true', help='대상 이미지 수만 출력')
+
+    def get_queryset(self, options):
+        queryset = UploadedImage.objects.all()
+        if options['outdated']:
+            # 더 새 버전의 코드가 기록한 결과(배포 롤백 등)는 되돌리지 않음
+            queryset = queryset.filter(Q(analysis_version__lt=ANALYSIS_VERSION) | Q(analysis_version__isnull=True))
+        elif options['analysis_version'] is not None:
+            if options['analysis_version'] == 0:
+                queryset = queryset.filter(analysis_version__isnull=True)
+            else:
+                queryset = queryset.filter(analysis_version=options['analysis_version'])
+        if options['failed_only']:
+            queryset = queryset.filter(analysis_completed=False)
+        if options['since']:
+            queryset = queryset.filter(uploaded_at__gte=parse_date(options['since']))
+        if options['until']:
+            queryset = queryset.filter(uploaded_at__lte=parse_date(options['until'], end_of_day=True))
+        return queryset
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size 는 1 이상이어야 합니다.')
+
+        checkpoint_path = options['checkpoint'] or get_checkpoint_path()
+        filters = {
+            key: options[key] for key in ('outdated', 'analysis_version', 'failed_only', 'since', 'until', 'full')
+        }
+        queryset = self.get_queryset(options)
+
+        if options['resume']:
+            checkpoint = self.load_checkpoint(checkpoint_path, filters)
+        else:
+            if os.path.exists(checkpoint_path):
+                self.stdout.write(f'이전 체크포인트를 무시하고 처음부터 실행합니다: {checkpoint_path} (이어서 하려면 --resume)')
+            # 시작 시점의 마지막 id 까지만 처리 (실행 중 새로 올라온 이미지는 이미 현재 버전으로 분석됨)
+            last = queryset.order_by('-pk').values_list('pk', flat=True).first()
+            checkpoint = {
+                'filters': filters, 'last_id': 0, 'max_id': last or 0,
+                'processed': 0, 'updated': 0, 'current': 0, 'errors': [], 'missing': [],
+            }
+
+        queryset = queryset.filter(pk__gt=checkpoint['last_id'], pk__lte=checkpoint['max_id'])
+        total = queryset.count()
+        if options['dry_run']:
+            self.stdout.write(f'대상 이미지 {total}개 (분석 버전 {ANALYSIS_VERSION})')
+            return
+        if not total:
+            self.stdout.write('다시 분석할 이미지가 없습니다.')
+            self.remove_checkpoint(checkpoint_path)
+            return
+
+        analyzer = BatchAnalyzer(workers=options['workers'])
+        self.stdout.write(
+            f'이미지 {total}개 재분석 시작 (분석 버전 {ANALYSIS_VERSION}, 프로세스 {analyzer.workers}개, '
+            f'청크 {options["chunk_size"]}개, id {checkpoint["last_id"]} 다음부터)'
+        )
+
+        started = time.perf_counter()
+        done = 0
+        try:
+            while True:
+                chunk = list(
+                    queryset.filter(pk__gt=checkpoint['last_id'])
+                    .order_by('pk')
+                    .only('id', 'image', 'content_hash', 'analysis_result')[:options['chunk_size']]
+                )
+                if not chunk:
+                    break
+
+                updated = self.process_chunk(analyzer, chunk, checkpoint, options['full'])
+                checkpoint['last_id'] = chunk[-1].pk
+                checkpoint['processed'] += len(chunk)
+                checkpoint['updated'] += updated
+                self.save_checkpoint(checkpoint_path, checkpoint)
+
+                done += len(chunk)
+                elapsed = time.perf_counter() - started
+                rate = done / elapsed if elapsed else 0.0
+                remaining = (total - done) / rate if rate else 0.0
+                self.stdout.write(
+                    f'  {done}/{total} ({done / total:.1%}) 오류 {len(checkpoint["errors"])}, '
+                    f'파일 없음 {len(checkpoint["missing"])}, {rate:.1f}개/초, 남은 시간 약 {remaining:.0f}초'
+                )
+        finally:
+            analyzer.shutdown()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'완료: {checkpoint["processed"]}개 처리, {checkpoint["updated"]}개 갱신, '
+            f'{checkpoint.get("current", 0)}개 이미 최신 '
+            f'(이번 실행 {done}개, {elapsed:.1f}초, {done / elapsed:.1f}개/초)'
+        ))
+        if checkpoint['errors']:
+            self.stderr.write(f'분석 실패 (기존 결과 유지): id {", ".join(str(pk) for pk, _ in checkpoint["errors"])}')
+        if checkpoint['missing']:
+            self.stderr.write(f'원본 파일 없음: id {", ".join(str(pk) for pk in checkpoint["missing"])}')
+        self.remove_checkpoint(checkpoint_path)
+
+    def process_chunk(self, analyzer, chunk, checkpoint, full=False):
+        """청크를 분석하고 성공한 행을 한 트랜잭션에서 기록합니다. (갱신한 행 수 반환)"""
+        instances = {instance.pk: instance for instance in chunk}
+        sources = {}
+        previous = {}
+        for instance in chunk:
+            if not full:
+                # 모든 분석기가 현재 버전이면 파일을 열지 않음
+                if stale_sections(instance.analysis_result) == set():
+                    checkpoint['current'] = checkpoint.get('current', 0) + 1
+                    continue
+                previous[instance.pk] = instance.analysis_result
+            source = stored_source(instance)
+            if source is None:
+                checkpoint['missing'].append(instance.pk)
+            else:
+                sources[instance.pk] = source
+
+        updated = []
+        for pk, analysis_result in analyzer.analyze(sources, previous):
+            if 'error' in analysis_result:
+                checkpoint['errors'].append((pk, analysis_result['error']))
+                continue
+            instance = instances[pk]
+            instance.analysis_result = analysis_result
+            instance.analysis_completed = True
+            instance.analysis_status = UploadedImage.AnalysisStatus.COMPLETED
+            instance.apply_analysis(analysis_result)
+            updated.append(instance)
+
+        with transaction.atomic():
+            UploadedImage.objects.bulk_update(updated, UPDATE_FIELDS, batch_size=500)
+            ImageColor.replace_for(updated)
+
+        # 같은 내용의 새 업로드가 이전 결과를 재사용하지 않도록 캐시도 갱신
+        for instance in updated:
+            if instance.content_hash:
+                analysis_cache.set(instance.content_hash, instance.analysis_result)
+        return len(updated)
+
+    def load_checkpoint(self, path, filters):
+        try:
+            with open(path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            raise CommandError(f'체크포인트가 없습니다: {path}')
+        if checkpoint.get('filters') != filters:
+            raise CommandError(
+                f'체크포인트의 조건({checkpoint.get("filters")})이 지금 조건({filters})과 다릅니다. '
+                '같은 옵션으로 실행하거나 --resume 없이 처음부터 실행하세요.'
+            )
+        return checkpoint
+
+    def save_checkpoint(self, path, checkpoint):
+        # 임시 파일에 쓰고 rename 해서 중단되어도 이전 체크포인트가 깨지지 않게 함
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, path)
+
+    def remove_checkpoint(self, path):
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,102 @@
+"""
+중단된 비동기 분석 작업 다시 처리
+
+    python manage.py resume_analysis [--pending-only] [--workers 4] [--chunk-size 50] [--dry-run]
+
+비동기 분석 대기열(tasks.AnalysisQueue)은 서버 프로세스 메모리에 있으므로 프로세스가 재시작되면
+대기 중이던 작업을 잃습니다. 작업 상태는 analysis_status 에 남아 있으므로, 서버를 시작할 때(배포 후 등)
+이 명령으로 'pending'/'processing' 으로 남은 이미지를 프로세스 풀에서 분석하고 기록합니다.
+
+    - 'processing' 행은 중단된 작업으로 보고 'pending' 으로 되돌린 뒤 처리합니다.
+      서버가 분석 중일 때 실행하려면 --pending-only 로 'pending' 행만 처리하세요.
+    - 행마다 tasks.claim 으로 가져간 뒤 분석하므로 서버의 워커와 같은 작업을 두 번 처리하지 않습니다.
+    - 분석에 실패하거나 원본 파일이 없는 이미지는 'failed' 로 기록합니다.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from image_analysis.batch import BatchAnalyzer, stored_source
+from image_analysis.models import UploadedImage
+from image_analysis.tasks import claim, mark_failed, save_result
+
+UNFINISHED = (UploadedImage.AnalysisStatus.PENDING, UploadedImage.AnalysisStatus.PROCESSING)
+
+
+class Command(BaseCommand):
+    help = "분석이 끝나지 않은('pending'/'processing') 이미지를 프로세스 풀에서 다시 분석합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pending-only', action='store_true',
+            help="'processing' 행은 건드리지 않음 (서버가 분석 중일 때 실행하는 경우)"
+        )
+        parser.add_argument(
+            '--workers', type=int,
+            help='분석 프로세스 수 (기본 IMAGE_ANALYSIS_BATCH_WORKERS, 0 이면 현재 프로세스에서 분석)'
+        )
+        parser.add_argument('--chunk-size', type=int, default=50, help='한 번에 가져가 분석할 이미지 수 (기본 50)')
+        parser.add_argument('--dry-run', action='store_true', help='대상 이미지 수만 출력')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size 는 1 이상이어야 합니다.')
+
+        statuses = UNFINISHED[:1] if options['pending_only'] else UNFINISHED
+        queryset = UploadedImage.objects.filter(analysis_status__in=statuses)
+        total = queryset.count()
+        if options['dry_run']:
+            self.stdout.write(f'대상 이미지 {total}개')
+            return
+        if not total:
+            self.stdout.write('다시 처리할 분석 작업이 없습니다.')
+            return
+
+        if not options['pending_only']:
+            UploadedImage.objects.filter(analysis_status=UploadedImage.AnalysisStatus.PROCESSING).update(
+                analysis_status=UploadedImage.AnalysisStatus.PENDING
+            )
+
+        analyzer = BatchAnalyzer(workers=options['workers'])
+        self.stdout.write(f'분석 작업 {total}개 처리 시작 (프로세스 {analyzer.workers}개)')
+
+        completed = 0
+        failed = []
+        last_id = 0
+        try:
+            while True:
+                chunk = list(
+                    UploadedImage.objects.filter(
+                        pk__gt=last_id, analysis_status=UploadedImage.AnalysisStatus.PENDING
+                    ).order_by('pk')[:options['chunk_size']]
+                )
+                if not chunk:
+                    break
+                last_id = chunk[-1].pk
+
+                instances = {}
+                sources = {}
+                for instance in chunk:
+                    # 서버의 워커가 먼저 가져간 작업은 건너뜀
+                    if not claim(instance.pk):
+                        continue
+                    source = stored_source(instance)
+                    if source is None:
+                        mark_failed(instance.pk, '원본 이미지 파일을 찾을 수 없습니다.')
+                        failed.append(instance.pk)
+                        continue
+                    instances[instance.pk] = instance
+                    sources[instance.pk] = source
+
+                for pk, analysis_result in analyzer.analyze(sources):
+                    if 'error' in analysis_result:
+                        mark_failed(pk, analysis_result['error'])
+                        failed.append(pk)
+                    else:
+                        save_result(instances[pk], analysis_result)
+                        completed += 1
+                self.stdout.write(f'  완료 {completed}, 실패 {len(failed)}')
+        finally:
+            analyzer.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(f'완료: {completed}개 분석, {len(failed)}개 실패'))
+        if failed:
+            self.stderr.write(f'분석 실패: id {", ".join(str(pk) for pk in failed)}')
@@ -0,0 +1,188 @@
+"""
+요청 계측 미들웨어
+
+WSGI 와 ASGI 모두에서 동작합니다. (ASGI 에서는 async 로 실행되어 async 뷰를 스레드로 감싸지 않음)
+
+    - 요청마다 단계 기록을 시작하고(instrumentation.begin_request) 모든 DB 쿼리를 'db' 단계로 잽니다.
+      ASGI 에서 sync 뷰는 다른 스레드(다른 DB 연결)에서 실행되므로, 쿼리 타이머는 요청마다가 아니라
+      DB 연결이 만들어질 때 걸어 두고 요청을 처리하는 중에만 기록합니다.
+    - 뷰별 요청 처리 시간을 누적 히스토그램(request_metrics)에 기록합니다.
+    - IMAGE_SERVER_TIMING 이면 단계별 합계를 Server-Timing 응답 헤더로 보냅니다.
+      (브라우저 개발자 도구의 Network > Timing 탭에 표시)
+    - IMAGE_PROFILING_ENABLED 이고 요청에 X-Profile 헤더가 있으면 그 요청만 프로파일링해
+      IMAGE_PROFILE_DIR 에 저장하고 파일 이름을 X-Profile-Output 응답 헤더로 알려 줍니다.
+        X-Profile: cprofile     -> .prof (python -m pstats, snakeviz 로 열기)
+        X-Profile: pyinstrument -> .html (샘플링 프로파일러, pyinstrument 가 설치되어 있을 때만)
+
+설정 (settings.py):
+    IMAGE_SERVER_TIMING: Server-Timing 헤더 추가 여부 (기본 False)
+    IMAGE_PROFILING_ENABLED: X-Profile 헤더로 프로파일링 허용 여부 (기본 DEBUG, 운영 환경에서는 켜지 말 것)
+    IMAGE_PROFILE_DIR: 프로파일 결과 저장 디렉토리 (기본 BASE_DIR/profiles)
+"""
+import cProfile
+import functools
+import logging
+import os
+import re
+import time
+import uuid
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .instrumentation import begin_request, end_request, in_request, request_metrics, stage
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+logger = logging.getLogger(__name__)
+
+
+def get_server_timing_enabled():
+    return getattr(settings, 'IMAGE_SERVER_TIMING', False)
+
+
+def get_profiling_enabled():
+    return getattr(settings, 'IMAGE_PROFILING_ENABLED', settings.DEBUG)
+
+
+def get_profile_dir():
+    return getattr(settings, 'IMAGE_PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles'))
+
+
+def _time_query(execute, sql, params, many, context):
+    if not in_request():
+        return execute(sql, params, many, context)
+    with stage('db'):
+        return execute(sql, params, many, context)
+
+
+def _install_query_timer(connection, **kwargs):
+    # 맨 앞에 넣어 다른 코드의 execute_wrapper() 가 끝날 때 pop() 으로 빠지지 않게 함
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _time_query)
+
+
+def install_query_timer():
+    """이 스레드의 열린 DB 연결과 앞으로 만들어질 모든 DB 연결에 쿼리 타이머를 겁니다."""
+    connection_created.connect(_install_query_timer, dispatch_uid='image_analysis.query_timer')
+    for connection in connections.all(initialized_only=True):
+        _install_query_timer(connection)
+
+
+def server_timing(timings, total):
+    """{단계: [합계 초, 횟수]} 를 Server-Timing 헤더 값으로 (단계 이름에 쓸 수 없는 문자는 '_')"""
+    entries = [
+        f'{re.sub(r"[^A-Za-z0-9_.-]", "_", name)};dur={seconds * 1000:.2f};desc="x{count}"'
+        for name, (seconds, count) in timings.items()
+    ]
+    entries.append(f'total;dur={total * 1000:.2f}')
+    return ', '.join(entries)
+
+
+class InstrumentationMiddleware:
+    """요청별 단계 시간 기록, Server-Timing 헤더, 헤더로 켜는 프로파일러"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install_query_timer()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        token = begin_request()
+        start = time.perf_counter()
+        try:
+            profiler = self.requested_profiler(request)
+            if profiler:
+                response = self.profile(request, profiler, self.get_response)
+            else:
+                response = self.get_response(request)
+        finally:
+            timings = end_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        token = begin_request()
+        start = time.perf_counter()
+        try:
+            profiler = self.requested_profiler(request)
+            if profiler:
+                # 프로파일러는 시작한 스레드만 기록하므로 요청 전체를 한 스레드에서 처리
+                # (그 안에서 sync 뷰를 감싼 sync_to_async 도 이 스레드에서 실행됨)
+                response = await sync_to_async(self.profile, thread_sensitive=False)(
+                    request, profiler, async_to_sync(self.get_response)
+                )
+            else:
+                response = await self.get_response(request)
+        finally:
+            timings = end_request(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    @staticmethod
+    def requested_profiler(request):
+        """X-Profile 헤더로 요청한 프로파일러 (허용되지 않았거나 요청하지 않았으면 None)"""
+        return request.headers.get('X-Profile') if get_profiling_enabled() else None
+
+    def finish(self, request, response, timings, total):
+        """요청 처리 시간을 히스토그램에 기록하고 Server-Timing 헤더를 붙입니다."""
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unmatched'
+        request_metrics.observe((view, request.method, str(response.status_code)), total)
+
+        if get_server_timing_enabled():
+            response['Server-Timing'] = server_timing(timings, total)
+        return response
+
+    def profile(self, request, profiler, get_response):
+        """요청 하나를 프로파일링해 저장합니다. (저장에 실패해도 응답은 그대로)"""
+        directory = get_profile_dir()
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        name = f'{time.strftime("%Y%m%d-%H%M%S")}-{request.method.lower()}-{slug}-{uuid.uuid4().hex[:8]}'
+
+        if profiler.lower() == 'pyinstrument' and SamplingProfiler is not None:
+            sampler = SamplingProfiler()
+            sampler.start()
+            try:
+                response = get_response(request)
+            finally:
+                sampler.stop()
+            name += '.html'
+            save = functools.partial(_write_text, text=sampler.output_html())
+        else:
+            tracer = cProfile.Profile()
+            try:
+                tracer.enable()
+            except ValueError:
+                # 다른 프로파일러가 이미 실행 중이면 프로파일링 없이 처리
+                return get_response(request)
+            try:
+                response = get_response(request)
+            finally:
+                tracer.disable()
+            name += '.prof'
+            save = tracer.dump_stats
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            save(os.path.join(directory, name))
+            response['X-Profile-Output'] = name
+        except OSError as e:
+            logger.warning('프로파일 저장 실패 (%s): %s', name, e)
+        return response
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(text)
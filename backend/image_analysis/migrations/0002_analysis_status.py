@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:46
+
+from django.db import migrations, models
+
+
+def backfill_analysis_status(apps, schema_editor):
+    """기존 행의 analysis_completed 값으로 분석 상태를 채운다."""
+    UploadedImage = apps.get_model('image_analysis', 'UploadedImage')
+    UploadedImage.objects.filter(analysis_completed=True).update(analysis_status='completed')
+    UploadedImage.objects.filter(analysis_completed=False).update(analysis_status='failed')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='analysis_status',
+            field=models.CharField(choices=[('pending', '대기 중'), ('processing', '분석 중'), ('completed', '완료'), ('failed', '실패')], db_index=True, default='pending', max_length=20),
+        ),
+        migrations.RunPython(backfill_analysis_status, migrations.RunPython.noop),
+    ]
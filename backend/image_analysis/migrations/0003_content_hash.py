@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 19:47
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_hash(apps, schema_editor):
+    """저장된 파일이 남아 있는 기존 행의 내용 해시를 채운다."""
+    UploadedImage = apps.get_model('image_analysis', 'UploadedImage')
+    for instance in UploadedImage.objects.filter(content_hash='').iterator():
+        try:
+            digest = hashlib.sha256()
+            with instance.image.open('rb') as image_file:
+                for chunk in image_file.chunks():
+                    digest.update(chunk)
+            instance.content_hash = digest.hexdigest()
+        except (OSError, ValueError):
+            continue
+        instance.save(update_fields=['content_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0002_analysis_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
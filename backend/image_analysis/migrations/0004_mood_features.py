@@ -0,0 +1,147 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:01
+
+from django.db import migrations, models
+
+# 이 마이그레이션 시점의 image_analysis.mood 규칙 사본.
+# 앱 코드가 바뀌어도 이 백필은 작성 당시 스키마와 규칙 그대로 실행되어야 하므로 앱 모듈을 import 하지 않습니다.
+FEATURE_FIELDS = {
+    'red': 'feature_red',
+    'green': 'feature_green',
+    'blue': 'feature_blue',
+    'warmth': 'feature_warmth',
+    'coolness': 'feature_coolness',
+    'saturation': 'feature_saturation',
+    'brightness': 'feature_brightness',
+    'contrast': 'feature_contrast',
+}
+
+MOOD_FIELDS = ['mood', *FEATURE_FIELDS.values()]
+
+DEFAULT_BRIGHTNESS = 50
+
+
+def extract_mood_features(analysis_result):
+    if not analysis_result or 'error' in analysis_result:
+        return None
+
+    dominant_colors = (analysis_result.get('colors') or {}).get('dominant_colors') or []
+    if not dominant_colors:
+        return None
+
+    brightness = analysis_result.get('brightness') or {}
+    count = len(dominant_colors)
+    avg_r = sum(color['rgb'][0] for color in dominant_colors) / count
+    avg_g = sum(color['rgb'][1] for color in dominant_colors) / count
+    avg_b = sum(color['rgb'][2] for color in dominant_colors) / count
+    max_value = max(avg_r, avg_g, avg_b)
+    min_value = min(avg_r, avg_g, avg_b)
+
+    return {
+        'red': round(avg_r, 2),
+        'green': round(avg_g, 2),
+        'blue': round(avg_b, 2),
+        'warmth': round((avg_r + avg_g * 0.5) / 255, 4),
+        'coolness': round(avg_b / 255, 4),
+        'saturation': round((max_value - min_value) / max_value, 4) if max_value else 0.0,
+        'brightness': brightness.get('average') or DEFAULT_BRIGHTNESS,
+        'contrast': brightness.get('contrast'),
+    }
+
+
+def classify_mood(features):
+    brightness = features['brightness']
+    red, green, blue = features['red'], features['green'], features['blue']
+    intensity = (red + green + blue) / (255 * 3)
+
+    if brightness > 120 and features['warmth'] > 0.6:
+        return 'bright_warm'
+    if brightness < 80 and features['coolness'] > 0.5:
+        return 'dark_cool'
+    if intensity > 0.7 or red > 150:
+        return 'intense'
+    if brightness > 100 and features['saturation'] < 0.4:
+        return 'soft_pastel'
+    if green > 100 and green > red and green > blue:
+        return 'nature_green'
+    return 'balanced'
+
+
+def get_mood_fields(analysis_result):
+    features = extract_mood_features(analysis_result)
+    fields = {
+        column: features[key] if features else None
+        for key, column in FEATURE_FIELDS.items()
+    }
+    fields['mood'] = classify_mood(features) if features else ''
+    return fields
+
+
+def backfill_mood(apps, schema_editor):
+    """분석이 끝난 기존 행의 분위기 라벨과 특징 벡터를 저장된 분석 결과에서 채운다. (파일 디코드 없음)"""
+    UploadedImage = apps.get_model('image_analysis', 'UploadedImage')
+    batch = []
+    for instance in UploadedImage.objects.filter(analysis_completed=True).only('id', 'analysis_result').iterator(chunk_size=500):
+        for field, value in get_mood_fields(instance.analysis_result).items():
+            setattr(instance, field, value)
+        batch.append(instance)
+        if len(batch) >= 500:
+            UploadedImage.objects.bulk_update(batch, MOOD_FIELDS)
+            batch = []
+    if batch:
+        UploadedImage.objects.bulk_update(batch, MOOD_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0003_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_blue',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_brightness',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_contrast',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_coolness',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_green',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_red',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_saturation',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='feature_warmth',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='mood',
+            field=models.CharField(blank=True, choices=[('bright_warm', '밝고 따뜻한'), ('dark_cool', '어둡고 차가운'), ('intense', '강렬한'), ('soft_pastel', '부드러운 파스텔'), ('nature_green', '자연/초록'), ('balanced', '균형')], db_index=True, default='', max_length=20),
+        ),
+        migrations.RunPython(backfill_mood, migrations.RunPython.noop),
+    ]
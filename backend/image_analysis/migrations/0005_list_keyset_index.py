@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0004_mood_features'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='uploadedimage',
+            options={'ordering': ['-uploaded_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='uploadedimage',
+            index=models.Index(fields=['-uploaded_at', '-id'], name='image_uploaded_at_id_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.2.5 on 2026-10-18 20:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+from PIL import Image, ImageCms
+
+# 이 마이그레이션 시점의 image_analysis.color_index / utils 색상 구간 계산 사본.
+# 앱 코드가 바뀌어도 이 백필은 작성 당시 규칙 그대로 실행되어야 하므로 앱 모듈을 import 하지 않습니다.
+WORKING_SIZE = (100, 100)
+LAB_L_BANDS = 8
+LAB_AB_BANDS = 12
+
+
+def rgb_bin(rgb, transform):
+    l_value, a_value, b_value = ImageCms.applyTransform(
+        Image.new('RGB', (1, 1), tuple(rgb)), transform
+    ).getpixel((0, 0))
+    l_band = l_value * LAB_L_BANDS // 256
+    a_band = a_value * LAB_AB_BANDS // 256
+    b_band = b_value * LAB_AB_BANDS // 256
+    return (l_band * LAB_AB_BANDS + a_band) * LAB_AB_BANDS + b_band
+
+
+def get_color_rows(analysis_result, transform):
+    if not analysis_result or 'error' in analysis_result:
+        return []
+
+    color_bins = analysis_result.get('color_bins')
+    if color_bins is not None:
+        return [(color_bin, share) for color_bin, share in color_bins]
+
+    dominant_colors = (analysis_result.get('colors') or {}).get('dominant_colors') or []
+    pixel_count = WORKING_SIZE[0] * WORKING_SIZE[1]
+    shares = {}
+    for color in dominant_colors:
+        color_bin = rgb_bin(color['rgb'], transform)
+        shares[color_bin] = shares.get(color_bin, 0) + color['count'] / pixel_count
+    return sorted(((color_bin, round(share, 4)) for color_bin, share in shares.items()),
+                  key=lambda row: row[1], reverse=True)
+
+
+def backfill_colors(apps, schema_editor):
+    """분석이 끝난 기존 행의 색상 인덱스를 저장된 분석 결과(주요 색상)에서 채운다. (파일 디코드 없음)"""
+    UploadedImage = apps.get_model('image_analysis', 'UploadedImage')
+    ImageColor = apps.get_model('image_analysis', 'ImageColor')
+    transform = ImageCms.buildTransformFromOpenProfiles(
+        ImageCms.createProfile('sRGB'), ImageCms.createProfile('LAB'), 'RGB', 'LAB'
+    )
+    batch = []
+    for instance in UploadedImage.objects.filter(analysis_completed=True).only('id', 'analysis_result').iterator(chunk_size=500):
+        for color_bin, share in get_color_rows(instance.analysis_result, transform):
+            batch.append(ImageColor(image_id=instance.pk, bin=color_bin, share=share))
+        if len(batch) >= 1000:
+            ImageColor.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        ImageColor.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0006_perceptual_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageColor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bin', models.PositiveSmallIntegerField()),
+                ('share', models.FloatField()),
+                ('image', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='colors', to='image_analysis.uploadedimage')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bin', 'share', 'image'], name='image_color_bin_share_idx')],
+                'constraints': [models.UniqueConstraint(fields=('image', 'bin'), name='image_color_image_bin_uniq')],
+            },
+        ),
+        migrations.RunPython(backfill_colors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,107 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:07
+
+from django.db import migrations, models
+
+# 이 마이그레이션 시점의 image_analysis.features 요약 컬럼 사본.
+# 이후 마이그레이션에서 추가된 컬럼(analysis_version 등)은 이 시점에 아직 없으므로 앱 모듈을 import 하지 않습니다.
+SCALAR_FIELDS = [
+    'brightness_average',
+    'brightness_level',
+    'aspect_ratio',
+    'is_grayscale',
+    'has_transparency',
+    'unique_colors',
+    'dominant_color',
+]
+
+
+def get_scalar_fields(analysis_result):
+    fields = {field: None for field in SCALAR_FIELDS}
+    fields['brightness_level'] = ''
+    if not analysis_result or 'error' in analysis_result:
+        return fields
+
+    brightness = analysis_result.get('brightness') or {}
+    colors = analysis_result.get('colors') or {}
+    dominant_colors = colors.get('dominant_colors') or []
+    if dominant_colors:
+        red, green, blue = dominant_colors[0]['rgb']
+        dominant_color = (red << 16) | (green << 8) | blue
+    else:
+        dominant_color = None
+
+    fields.update({
+        'brightness_average': brightness.get('average'),
+        'brightness_level': brightness.get('level') or '',
+        'aspect_ratio': (analysis_result.get('dimensions') or {}).get('aspect_ratio'),
+        'is_grayscale': analysis_result.get('is_grayscale'),
+        'has_transparency': analysis_result.get('has_transparency'),
+        'unique_colors': colors.get('unique_colors_count'),
+        'dominant_color': dominant_color,
+    })
+    return fields
+
+
+def backfill_scalars(apps, schema_editor):
+    """분석이 끝난 기존 행의 요약 컬럼을 저장된 분석 결과에서 채운다. (파일 디코드 없음)"""
+    UploadedImage = apps.get_model('image_analysis', 'UploadedImage')
+    batch = []
+    for instance in UploadedImage.objects.filter(analysis_completed=True).only('id', 'analysis_result').iterator(chunk_size=500):
+        for field, value in get_scalar_fields(instance.analysis_result).items():
+            setattr(instance, field, value)
+        batch.append(instance)
+        if len(batch) >= 500:
+            UploadedImage.objects.bulk_update(batch, SCALAR_FIELDS)
+            batch = []
+    if batch:
+        UploadedImage.objects.bulk_update(batch, SCALAR_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0007_color_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='aspect_ratio',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='brightness_average',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='brightness_level',
+            field=models.CharField(blank=True, choices=[('dark', '어두움'), ('medium', '보통'), ('bright', '밝음')], db_index=True, default='', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='dominant_color',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='has_transparency',
+            field=models.BooleanField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='is_grayscale',
+            field=models.BooleanField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='uploadedimage',
+            name='unique_colors',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='uploadedimage',
+            index=models.Index(fields=['brightness_level', 'brightness_average'], name='image_brightness_level_avg_idx'),
+        ),
+        migrations.RunPython(backfill_scalars, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.5 on 2026-10-18 21:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('image_analysis', '0009_analysis_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageExif',
+            fields=[
+                ('image', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='exif', serialize=False, to='image_analysis.uploadedimage')),
+                ('data', models.BinaryField(blank=True, default=b'')),
+            ],
+        ),
+    ]
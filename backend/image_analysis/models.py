@@ -1,25 +1,166 @@
 from django.db import models
 from django.utils import timezone
 
+from .mood import MOOD_CHOICES, MOOD_FIELDS, get_mood_fields
+from .similarity import SIMILARITY_FIELDS, get_similarity_fields
+from .color_index import get_color_rows
+from .features import BRIGHTNESS_LEVEL_CHOICES, SCALAR_FIELDS, get_scalar_fields
+
+# 분석 결과에서 계산해 저장하는 컬럼 (save(update_fields=...) 용)
+ANALYSIS_FIELDS = [*MOOD_FIELDS, *SIMILARITY_FIELDS, *SCALAR_FIELDS]
+
+
+def get_analysis_fields(analysis_result):
+    """분석 결과에서 계산하는 컬럼 값 (분위기 라벨과 특징 벡터, 유사 검색용 지각 해시, 요약 컬럼)"""
+    return {
+        **get_mood_fields(analysis_result),
+        **get_similarity_fields(analysis_result),
+        **get_scalar_fields(analysis_result),
+    }
+
 
 class UploadedImage(models.Model):
     """업로드된 이미지와 분석 결과를 저장하는 모델"""
 
+    class AnalysisStatus(models.TextChoices):
+        PENDING = 'pending', '대기 중'
+        PROCESSING = 'processing', '분석 중'
+        COMPLETED = 'completed', '완료'
+        FAILED = 'failed', '실패'
+
     image = models.ImageField(upload_to='uploads/%Y/%m/%d/')
     uploaded_at = models.DateTimeField(default=timezone.now)
 
     # 분석 결과 필드
     analysis_completed = models.BooleanField(default=False)
     analysis_result = models.JSONField(null=True, blank=True)
+    analysis_status = models.CharField(
+        max_length=20,
+        choices=AnalysisStatus.choices,
+        default=AnalysisStatus.PENDING,
+        db_index=True,
+    )
 
     # 이미지 메타데이터
     file_name = models.CharField(max_length=255)
+    content_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
     file_size = models.IntegerField(null=True, blank=True)
     image_width = models.IntegerField(null=True, blank=True)
     image_height = models.IntegerField(null=True, blank=True)
 
+    # 분위기 분류 (분석 결과에서 계산, 카테고리별 조회/집계용)
+    mood = models.CharField(max_length=20, choices=MOOD_CHOICES, blank=True, default='', db_index=True)
+    feature_red = models.FloatField(null=True, blank=True)
+    feature_green = models.FloatField(null=True, blank=True)
+    feature_blue = models.FloatField(null=True, blank=True)
+    feature_warmth = models.FloatField(null=True, blank=True, db_index=True)
+    feature_coolness = models.FloatField(null=True, blank=True, db_index=True)
+    feature_saturation = models.FloatField(null=True, blank=True, db_index=True)
+    feature_brightness = models.FloatField(null=True, blank=True, db_index=True)
+    feature_contrast = models.FloatField(null=True, blank=True, db_index=True)
+
+    # 유사 이미지 검색 (지각 해시와 16비트 조각, similarity.py 참고)
+    perceptual_hash = models.CharField(max_length=16, blank=True, default='')
+    phash_0 = models.IntegerField(null=True, blank=True, db_index=True)
+    phash_1 = models.IntegerField(null=True, blank=True, db_index=True)
+    phash_2 = models.IntegerField(null=True, blank=True, db_index=True)
+    phash_3 = models.IntegerField(null=True, blank=True, db_index=True)
+
+    # 분석 결과 요약 (목록 필터/정렬용, features.py 참고)
+    brightness_average = models.FloatField(null=True, blank=True, db_index=True)
+    brightness_level = models.CharField(
+        max_length=10, choices=BRIGHTNESS_LEVEL_CHOICES, blank=True, default='', db_index=True
+    )
+    aspect_ratio = models.FloatField(null=True, blank=True, db_index=True)
+    is_grayscale = models.BooleanField(null=True, blank=True, db_index=True)
+    has_transparency = models.BooleanField(null=True, blank=True, db_index=True)
+    unique_colors = models.IntegerField(null=True, blank=True, db_index=True)
+    # 대표(가장 많은) 색상 0xRRGGBB
+    dominant_color = models.IntegerField(null=True, blank=True, db_index=True)
+    # 결과를 만든 분석 버전 (utils.ANALYSIS_VERSION, 일부 구역이 실패한 결과는 0, 버전 기록 이전 결과는 None)
+    analysis_version = models.PositiveSmallIntegerField(null=True, blank=True, db_index=True)
+
     class Meta:
-        ordering = ['-uploaded_at']
+        ordering = ['-uploaded_at', '-id']
+        indexes = [
+            # 목록 키셋 페이지네이션 (uploaded_at, id) < 커서
+            models.Index(fields=['-uploaded_at', '-id'], name='image_uploaded_at_id_idx'),
+            # 밝기 레벨 필터 + 밝기 정렬 (?brightness_level=dark&ordering=-brightness_average)
+            models.Index(fields=['brightness_level', 'brightness_average'], name='image_brightness_level_avg_idx'),
+        ]
+
+    def apply_analysis(self, analysis_result):
+        """분석 결과에서 분위기 라벨, 특징 벡터, 지각 해시, 요약 컬럼을 계산해 필드에 채웁니다. (저장은 하지 않음)"""
+        for field, value in get_analysis_fields(analysis_result).items():
+            setattr(self, field, value)
 
     def __str__(self):
         return f"{self.file_name} - {self.uploaded_at.strftime('%Y-%m-%d %H:%M')}"
+
+
+class ImageColor(models.Model):
+    """이미지별 LAB 색상 구간 비율 (색상 검색 인덱스, color_index.py 참고)"""
+
+    image = models.ForeignKey(UploadedImage, on_delete=models.CASCADE, related_name='colors')
+    bin = models.PositiveSmallIntegerField()
+    share = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['image', 'bin'], name='image_color_image_bin_uniq'),
+        ]
+        indexes = [
+            # 색상 검색: 구간별 행을 테이블을 읽지 않고 합산 (커버링 인덱스)
+            models.Index(fields=['bin', 'share', 'image'], name='image_color_bin_share_idx'),
+        ]
+
+    @classmethod
+    def replace_for(cls, instances):
+        """이미지들의 분석 결과로 색상 인덱스 행을 다시 씁니다."""
+        instances = [instance for instance in instances if instance.pk is not None]
+        cls.objects.filter(image__in=instances).delete()
+        cls.objects.bulk_create([
+            cls(image_id=instance.pk, bin=color_bin, share=share)
+            for instance in instances
+            for color_bin, share in get_color_rows(instance.analysis_result)
+        ], batch_size=1000)
+
+    def __str__(self):
+        return f'{self.image_id} - {self.bin} ({self.share:.2%})'
+
+
+class ImageExif(models.Model):
+    """
+    이미지 파일의 EXIF 원본 바이트 (exif.py 참고)
+
+    analysis_result 에는 허용 목록의 태그만 넣고 원본은 여기에 따로 두어
+    GET /api/images/{id}/exif/ 를 요청할 때만 읽습니다. EXIF 가 없는 이미지는 빈 값으로 저장합니다.
+    """
+
+    image = models.OneToOneField(UploadedImage, on_delete=models.CASCADE, primary_key=True, related_name='exif')
+    data = models.BinaryField(blank=True, default=b'')
+
+    @classmethod
+    def store(cls, items):
+        """[(이미지, EXIF 원본 바이트), ...] 를 저장합니다. (이미 있으면 그대로 둠)"""
+        cls.objects.bulk_create(
+            [cls(image_id=instance.pk, data=raw) for instance, raw in items if instance.pk is not None],
+            ignore_conflicts=True,
+        )
+
+    @classmethod
+    def load_for(cls, instance, read_raw):
+        """
+        이미지의 EXIF 원본 바이트
+
+        저장소 도입 이전 이미지는 read_raw(instance) 로 원본 파일 헤더에서 읽어 저장한 뒤 돌려줍니다.
+        """
+        data = cls.objects.filter(image=instance).values_list('data', flat=True).first()
+        if data is not None:
+            return bytes(data)
+        raw = read_raw(instance)
+        cls.store([(instance, raw)])
+        return raw
+
+    def __str__(self):
+        return f'{self.image_id} EXIF ({len(self.data)} bytes)'
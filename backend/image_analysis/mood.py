@@ -0,0 +1,122 @@
+"""
+이미지 분위기(mood) 분류
+
+분석 결과(주요 색상, 밝기)에서 간단한 수치 특징 벡터를 만들고 분위기 카테고리를 정합니다.
+분류 규칙은 프론트엔드 musicGenerator.classifyImageMood 와 같아서 브라우저와 서버가
+같은 이미지에 같은 카테고리를 붙입니다. 카테고리 이름은 spotify_service.MOOD_QUERIES 의 키입니다.
+
+분석 결과 딕셔너리만 사용하므로 이미 저장된 결과에서도 이미지를 다시 디코드하지 않고 계산할 수 있습니다.
+"""
+
+BALANCED = 'balanced'
+
+MOOD_CHOICES = [
+    ('bright_warm', '밝고 따뜻한'),
+    ('dark_cool', '어둡고 차가운'),
+    ('intense', '강렬한'),
+    ('soft_pastel', '부드러운 파스텔'),
+    ('nature_green', '자연/초록'),
+    (BALANCED, '균형'),
+]
+
+# 특징 벡터 키와 UploadedImage 컬럼 이름
+FEATURE_FIELDS = {
+    'red': 'feature_red',
+    'green': 'feature_green',
+    'blue': 'feature_blue',
+    'warmth': 'feature_warmth',
+    'coolness': 'feature_coolness',
+    'saturation': 'feature_saturation',
+    'brightness': 'feature_brightness',
+    'contrast': 'feature_contrast',
+}
+
+# 분석 결과를 저장할 때 함께 갱신할 컬럼 (save(update_fields=...) 용)
+MOOD_FIELDS = ['mood', *FEATURE_FIELDS.values()]
+
+# 프론트엔드에서 밝기 값이 없을 때 쓰는 기본값과 동일
+DEFAULT_BRIGHTNESS = 50
+
+
+def extract_mood_features(analysis_result):
+    """
+    분석 결과에서 분위기 특징 벡터를 계산합니다.
+
+    Returns:
+        dict: red/green/blue (주요 색상 평균, 0-255), warmth/coolness/saturation (0-1),
+              brightness/contrast (0-100). 주요 색상이 없으면 None
+    """
+    if not analysis_result or 'error' in analysis_result:
+        return None
+
+    dominant_colors = (analysis_result.get('colors') or {}).get('dominant_colors') or []
+    if not dominant_colors:
+        return None
+
+    brightness = analysis_result.get('brightness') or {}
+    count = len(dominant_colors)
+
+    # 주요 색상들의 RGB 평균 (픽셀 수 가중치 없이, 프론트엔드와 동일)
+    avg_r = sum(color['rgb'][0] for color in dominant_colors) / count
+    avg_g = sum(color['rgb'][1] for color in dominant_colors) / count
+    avg_b = sum(color['rgb'][2] for color in dominant_colors) / count
+
+    max_value = max(avg_r, avg_g, avg_b)
+    min_value = min(avg_r, avg_g, avg_b)
+
+    return {
+        'red': round(avg_r, 2),
+        'green': round(avg_g, 2),
+        'blue': round(avg_b, 2),
+        # 따뜻함: 빨강+노랑 계열
+        'warmth': round((avg_r + avg_g * 0.5) / 255, 4),
+        # 차가움: 파랑 계열
+        'coolness': round(avg_b / 255, 4),
+        'saturation': round((max_value - min_value) / max_value, 4) if max_value else 0.0,
+        'brightness': brightness.get('average') or DEFAULT_BRIGHTNESS,
+        'contrast': brightness.get('contrast'),
+    }
+
+
+def classify_mood(features):
+    """특징 벡터로 분위기 카테고리를 정합니다. (musicGenerator.classifyImageMood 와 같은 규칙)"""
+    if not features:
+        return BALANCED
+
+    # 프론트엔드와 같은 라벨을 내도록 임계값도 brightness.average(0-100)에 그대로 적용
+    brightness = features['brightness']
+    red, green, blue = features['red'], features['green'], features['blue']
+    intensity = (red + green + blue) / (255 * 3)
+
+    # 1. 밝고 따뜻한 사진 (노랑/주황 많음)
+    if brightness > 120 and features['warmth'] > 0.6:
+        return 'bright_warm'
+
+    # 2. 어둡고 차가운 사진 (파랑/보라 많음)
+    if brightness < 80 and features['coolness'] > 0.5:
+        return 'dark_cool'
+
+    # 3. 강렬한 사진 (빨강 많음/대비 높음)
+    if intensity > 0.7 or red > 150:
+        return 'intense'
+
+    # 4. 부드러운 사진 (파스텔톤)
+    if brightness > 100 and features['saturation'] < 0.4:
+        return 'soft_pastel'
+
+    # 5. 자연/초록 사진 (초록 많음)
+    if green > 100 and green > red and green > blue:
+        return 'nature_green'
+
+    return BALANCED
+
+
+def get_mood_fields(analysis_result):
+    """분석 결과로 채울 UploadedImage 의 분위기 관련 필드 값 (mood, feature_*)"""
+    features = extract_mood_features(analysis_result)
+    fields = {
+        column: features[key] if features else None
+        for key, column in FEATURE_FIELDS.items()
+    }
+    fields['mood'] = classify_mood(features) if features else ''
+    return fields
@@ -0,0 +1,139 @@
+"""
+이미지 목록 키셋(커서) 페이지네이션
+
+OFFSET 대신 마지막 행의 (uploaded_at, id) 를 커서로 넘겨 다음 페이지를
+WHERE (uploaded_at, id) < (커서) 조건과 (uploaded_at, id) 복합 인덱스로 가져옵니다.
+페이지가 깊어져도 앞 페이지의 행을 건너뛰며 읽지 않습니다.
+
+?ordering= 으로 인덱스가 걸린 요약 컬럼(밝기, 가로세로 비율 등) 순서로도 정렬할 수 있으며,
+이때는 (컬럼, id) 가 커서가 됩니다. 값이 없는(분석 전) 이미지는 이 정렬에서 제외됩니다.
+
+설정 (settings.py):
+    IMAGE_LIST_PAGE_SIZE: 기본 페이지 크기 (기본 50, ?page_size= 로 최대 IMAGE_LIST_MAX_PAGE_SIZE 까지)
+    IMAGE_LIST_MAX_PAGE_SIZE: 최대 페이지 크기 (기본 200)
+"""
+import base64
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .models import UploadedImage
+
+
+class KeysetPagination(BasePagination):
+    """(정렬 컬럼, id) 키셋 페이지네이션, 기본은 최신순 (다음 페이지 방향만 지원)"""
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering_query_param = 'ordering'
+    default_ordering = '-uploaded_at'
+    # ?ordering= 에 쓸 수 있는 컬럼 (모두 인덱스가 있어야 함)
+    ordering_fields = (
+        'uploaded_at', 'brightness_average', 'aspect_ratio', 'unique_colors', 'feature_contrast',
+        'feature_saturation',
+    )
+    invalid_cursor_message = '잘못된 커서입니다.'
+
+    def get_ordering(self, request):
+        """
+        ?ordering= 값 (예: '-brightness_average')
+
+        Returns:
+            tuple: (컬럼 이름, 내림차순 여부)
+        """
+        ordering = request.query_params.get(self.ordering_query_param) or self.default_ordering
+        field = ordering.lstrip('-')
+        if field not in self.ordering_fields:
+            raise ValidationError({
+                self.ordering_query_param: f'{", ".join(self.ordering_fields)} 중 하나여야 합니다. (내림차순은 앞에 -)'
+            })
+        return field, ordering.startswith('-')
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, 'IMAGE_LIST_PAGE_SIZE', 50)
+        max_page_size = getattr(settings, 'IMAGE_LIST_MAX_PAGE_SIZE', 200)
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        return max(1, min(requested, max_page_size))
+
+    def encode_cursor(self, instance, field):
+        value = getattr(instance, field)
+        value = value.isoformat() if field == 'uploaded_at' else repr(value)
+        position = f'{field}|{value}|{instance.pk}'
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, request, field):
+        """커서가 없으면 None, 형식이 잘못되었거나 다른 정렬의 커서면 NotFound"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor_field, value, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split('|')
+            if field == 'uploaded_at':
+                value = parse_datetime(value)
+            else:
+                value = UploadedImage._meta.get_field(field).to_python(value)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        if cursor_field != field or value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        field, descending = self.get_ordering(request)
+        if UploadedImage._meta.get_field(field).null:
+            queryset = queryset.filter(**{f'{field}__isnull': False})
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(f'{prefix}{field}', f'{prefix}id')
+
+        cursor = self.decode_cursor(request, field)
+        if cursor is not None:
+            value, pk = cursor
+            # (컬럼, id) < 커서 를 컬럼 <= 값 범위 조건과 함께 써서 인덱스를 범위 탐색하게 함
+            # (OR 조건만 있으면 SQLite 는 인덱스를 처음부터 훑음)
+            before, after = ('lt', 'lte') if descending else ('gt', 'gte')
+            queryset = queryset.filter(
+                Q(**{f'{field}__{after}': value}),
+                Q(**{f'{field}__{before}': value}) | Q(**{f'pk__{before}': pk}),
+            )
+
+        # 다음 페이지 존재 여부를 알기 위해 한 행 더 가져옴
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.next_cursor = self.encode_cursor(page[-1], field) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
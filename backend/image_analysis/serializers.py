@@ -1,11 +1,85 @@
+from django.urls import reverse
 from rest_framework import serializers
 from .models import UploadedImage
-from PIL import Image
+from .mood import FEATURE_FIELDS
+from .features import format_rgb
+from .thumbnails import get_sizes, get_formats
+from .upload_handlers import get_max_upload_size
+from .header import check_header, rejection_stats
+
+
+class UploadImageField(serializers.ImageField):
+    """
+    업로드 이미지 필드
+
+    업로드 핸들러가 스트리밍 중에 잰 크기로 먼저 거절하고, 헤더만 읽어 포맷, 해상도,
+    프레임 수를 검사합니다. 디코드는 하지 않으며, 읽은 헤더는 업로드 파일의
+    image_header 로 분석 단계에 넘깁니다.
+    """
+
+    def to_internal_value(self, data):
+        max_size = get_max_upload_size()
+        size = getattr(data, 'size', None)
+        if size is not None and size > max_size:
+            rejection_stats.record_reject('size', size)
+            raise serializers.ValidationError(
+                f"이미지 파일 크기는 {max_size // 1024 // 1024}MB를 초과할 수 없습니다. (현재: {size / 1024 / 1024:.2f}MB)"
+            )
+
+        # 파일 이름/빈 파일 검사만 하고 Pillow 전체 검증(verify)은 건너뜀
+        file_object = serializers.FileField.to_internal_value(self, data)
+
+        header, rejection = check_header(data, getattr(data, 'sniffed_format', None))
+        if rejection is not None:
+            reason, message = rejection
+            pixels = header.width * header.height * (header.frames or 1) if header else 0
+            rejection_stats.record_reject(reason, size, pixels)
+            raise serializers.ValidationError(message)
+
+        data.image_header = header
+        rejection_stats.record_accept()
+        return file_object
+
+
+class ThumbnailsField(serializers.Field):
+    """크기별, 포맷별 썸네일 URL ({'thumb': {'webp': url, 'jpeg': url}, ...})"""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, obj):
+        request = self.context.get('request')
+        formats = get_formats()
+        thumbnails = {}
+        for size in get_sizes():
+            thumbnails[size] = {}
+            for fmt in formats:
+                url = reverse('image-thumbnail', kwargs={'pk': obj.pk, 'size': size, 'fmt': fmt})
+                thumbnails[size][fmt] = request.build_absolute_uri(url) if request else url
+        return thumbnails
+
+
+class DominantColorField(serializers.Field):
+    """대표 색상 컬럼(0xRRGGBB 정수)을 '#rrggbb' 로"""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return format_rgb(value)
 
 
 class UploadedImageSerializer(serializers.ModelSerializer):
     """업로드된 이미지 시리얼라이저"""
 
+    image = UploadImageField()
+    mood_features = serializers.SerializerMethodField()
+    dominant_color = DominantColorField()
+    thumbnails = ThumbnailsField()
+
     class Meta:
         model = UploadedImage
         fields = [
@@ -13,57 +87,107 @@ class UploadedImageSerializer(serializers.ModelSerializer):
             'image',
             'uploaded_at',
             'analysis_completed',
+            'analysis_status',
             'analysis_result',
             'file_name',
             'file_size',
             'image_width',
             'image_height',
+            'mood',
+            'mood_features',
+            'perceptual_hash',
+            'brightness_average',
+            'brightness_level',
+            'aspect_ratio',
+            'is_grayscale',
+            'has_transparency',
+            'unique_colors',
+            'dominant_color',
+            'thumbnails',
         ]
         read_only_fields = [
             'id',
             'uploaded_at',
             'analysis_completed',
+            'analysis_status',
             'analysis_result',
             'file_name',
             'file_size',
             'image_width',
             'image_height',
+            'mood',
+            'perceptual_hash',
+            'brightness_average',
+            'brightness_level',
+            'aspect_ratio',
+            'is_grayscale',
+            'has_transparency',
+            'unique_colors',
         ]
 
-    def validate_image(self, value):
-        """이미지 파일 검증"""
-        # 파일 크기 제한 (10MB)
-        max_size = 10 * 1024 * 1024
-        if value.size > max_size:
-            raise serializers.ValidationError(
-                f"이미지 파일 크기는 10MB를 초과할 수 없습니다. (현재: {value.size / 1024 / 1024:.2f}MB)"
-            )
+    def get_mood_features(self, obj):
+        """분위기 특징 벡터 (분석 전이면 None)"""
+        if not obj.mood:
+            return None
+        return {key: getattr(obj, column) for key, column in FEATURE_FIELDS.items()}
+
+
+def get_requested_fields(request):
+    """?fields=id,file_name 쿼리 파라미터의 필드 이름 목록 (없으면 None)"""
+    if request is None:
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(',') if name.strip()]
 
-        # 이미지 포맷 검증
-        allowed_formats = ['JPEG', 'JPG', 'PNG', 'GIF', 'BMP', 'WEBP']
-        try:
-            img = Image.open(value)
-            if img.format.upper() not in allowed_formats:
-                raise serializers.ValidationError(
-                    f"지원되지 않는 이미지 포맷입니다. 지원 포맷: {', '.join(allowed_formats)}"
-                )
-            # 파일 포인터를 처음으로 되돌림
-            value.seek(0)
-        except Exception as e:
-            raise serializers.ValidationError(f"유효하지 않은 이미지 파일입니다: {str(e)}")
 
-        return value
+class SparseFieldsMixin:
+    """?fields= 로 요청한 필드만 응답에 포함합니다. (알 수 없는 이름은 무시)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = get_requested_fields(self.context.get('request'))
+        if requested:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+
+
+class UploadedImageListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    목록 조회용 가벼운 시리얼라이저
+
+    analysis_result(EXIF 문자열 포함) 를 제외하므로 목록 쿼리에서 해당 컬럼을 defer() 합니다.
+    """
+
+    dominant_color = DominantColorField()
+    thumbnails = ThumbnailsField()
+
+    class Meta:
+        model = UploadedImage
+        fields = [
+            'id',
+            'image',
+            'uploaded_at',
+            'analysis_completed',
+            'analysis_status',
+            'file_name',
+            'file_size',
+            'image_width',
+            'image_height',
+            'mood',
+            'brightness_average',
+            'brightness_level',
+            'aspect_ratio',
+            'is_grayscale',
+            'has_transparency',
+            'unique_colors',
+            'dominant_color',
+            'thumbnails',
+        ]
+        read_only_fields = fields
 
 
 class ImageAnalysisRequestSerializer(serializers.Serializer):
     """이미지 분석 요청 시리얼라이저"""
-    image = serializers.ImageField()
-
-    def validate_image(self, value):
-        """이미지 파일 검증"""
-        max_size = 10 * 1024 * 1024
-        if value.size > max_size:
-            raise serializers.ValidationError(
-                f"이미지 파일 크기는 10MB를 초과할 수 없습니다."
-            )
-        return value
+    image = UploadImageField()
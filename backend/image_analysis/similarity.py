@@ -0,0 +1,120 @@
+"""
+지각 해시(dHash) 기반 유사 이미지 검색
+
+분석 결과의 64비트 perceptual_hash 를 16비트씩 4조각으로 나눠 인덱스가 걸린 컬럼(phash_0..3)에 저장합니다.
+해밍 거리가 d 이하인 두 해시는 비둘기집 원리로 적어도 한 조각의 거리가 d // 4 이하이므로,
+각 조각에서 거리 d // 4 이내의 값들만 인덱스로 찾아 후보를 모은 뒤 실제 거리를 계산합니다. (multi-index hashing)
+테이블 전체를 훑지 않고, 후보 수는 행 수 / 65536 에 비례합니다.
+
+분석 결과 딕셔너리만 사용하므로 저장된 결과에서 이미지를 다시 디코드하지 않고 컬럼을 채울 수 있습니다.
+
+설정 (settings.py):
+    IMAGE_SIMILARITY_MAX_DISTANCE: 요청할 수 있는 최대 해밍 거리 (기본 10, 64비트 중)
+    IMAGE_SIMILARITY_DEFAULT_DISTANCE: 기본 해밍 거리 (기본 8)
+    IMAGE_SIMILARITY_LIMIT: 최대 결과 수 (기본 20)
+"""
+from functools import lru_cache
+from itertools import combinations
+
+from django.conf import settings
+from django.db.models import Q
+
+HASH_BITS = 64
+CHUNK_COUNT = 4
+CHUNK_BITS = HASH_BITS // CHUNK_COUNT
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+
+# 조각 번호와 UploadedImage 컬럼 이름
+CHUNK_FIELDS = [f'phash_{index}' for index in range(CHUNK_COUNT)]
+
+# 분석 결과를 저장할 때 함께 갱신할 컬럼 (save(update_fields=...) 용)
+SIMILARITY_FIELDS = ['perceptual_hash', *CHUNK_FIELDS]
+
+
+def get_max_distance():
+    return getattr(settings, 'IMAGE_SIMILARITY_MAX_DISTANCE', 10)
+
+
+def get_default_distance():
+    return getattr(settings, 'IMAGE_SIMILARITY_DEFAULT_DISTANCE', 8)
+
+
+def get_limit():
+    return getattr(settings, 'IMAGE_SIMILARITY_LIMIT', 20)
+
+
+def split_hash(value):
+    """64비트 정수 해시를 상위 비트부터 16비트 조각 4개로 나눕니다."""
+    return [
+        (value >> (CHUNK_BITS * (CHUNK_COUNT - 1 - index))) & CHUNK_MASK
+        for index in range(CHUNK_COUNT)
+    ]
+
+
+def hamming_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def get_similarity_fields(analysis_result):
+    """
+    분석 결과에서 UploadedImage 의 유사 검색 컬럼 값을 계산합니다.
+
+    Returns:
+        dict: perceptual_hash 와 phash_0..3 (해시가 없으면 빈 문자열과 None)
+    """
+    perceptual_hash = ''
+    if analysis_result and 'error' not in analysis_result:
+        perceptual_hash = analysis_result.get('perceptual_hash') or ''
+
+    if not perceptual_hash:
+        return {'perceptual_hash': '', **{field: None for field in CHUNK_FIELDS}}
+    chunks = split_hash(int(perceptual_hash, 16))
+    return {'perceptual_hash': perceptual_hash, **dict(zip(CHUNK_FIELDS, chunks))}
+
+
+@lru_cache(maxsize=CHUNK_BITS)
+def _flip_masks(radius):
+    """16비트 값에서 radius 개 이하의 비트를 뒤집는 XOR 마스크 목록"""
+    masks = []
+    for count in range(radius + 1):
+        for positions in combinations(range(CHUNK_BITS), count):
+            mask = 0
+            for position in positions:
+                mask |= 1 << position
+            masks.append(mask)
+    return masks
+
+
+def candidate_filter(value, max_distance):
+    """해밍 거리 max_distance 이내의 해시가 반드시 만족하는 조각 컬럼 조건 (OR)"""
+    masks = _flip_masks(max_distance // CHUNK_COUNT)
+    condition = Q()
+    for field, chunk in zip(CHUNK_FIELDS, split_hash(value)):
+        condition |= Q(**{f'{field}__in': [chunk ^ mask for mask in masks]})
+    return condition
+
+
+def find_similar(queryset, perceptual_hash, max_distance, limit, exclude_pk=None):
+    """
+    해밍 거리 max_distance 이내의 이미지를 가까운 순서로 찾습니다.
+
+    Args:
+        queryset: UploadedImage 쿼리셋
+        perceptual_hash: 기준 해시 (16진수 문자열)
+        exclude_pk: 결과에서 뺄 id (기준 이미지 자신)
+
+    Returns:
+        list: [(id, 거리), ...] 거리, 최신 id 순으로 최대 limit 개
+    """
+    value = int(perceptual_hash, 16)
+    candidates = queryset.filter(candidate_filter(value, max_distance))
+    if exclude_pk is not None:
+        candidates = candidates.exclude(pk=exclude_pk)
+
+    matches = []
+    for pk, candidate_hash in candidates.values_list('pk', 'perceptual_hash').iterator(chunk_size=2000):
+        distance = hamming_distance(value, int(candidate_hash, 16))
+        if distance <= max_distance:
+            matches.append((pk, distance))
+    matches.sort(key=lambda match: (match[1], -match[0]))
+    return matches[:limit]
@@ -1,17 +1,229 @@
 import requests
 import base64
 from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from django.core.cache import cache
+import logging
 import random
+import threading
+import time
+
+from .instrumentation import stage
+
+logger = logging.getLogger(__name__)
+
+
+# 만료 시각보다 이만큼(초) 먼저 토큰을 갱신
+TOKEN_EXPIRY_MARGIN = 60
+
+# 여러 프로세스가 공유하는 토큰 캐시 키와 갱신 잠금 키
+TOKEN_CACHE_KEY = 'spotify:access_token'
+TOKEN_LOCK_KEY = 'spotify:access_token:lock'
+TOKEN_LOCK_TIMEOUT = 10
+
+# 재시도할 응답 상태 코드 (Retry-After 헤더가 있으면 그 시간만큼 대기)
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+# 분위기별 검색어 및 파라미터
+MOOD_QUERIES = {
+    'bright_warm': {
+        'genre': 'k-pop',
+        'keywords': ['korean', 'k-pop', 'kpop', 'dance', 'idol', 'happy', 'upbeat'],
+        'energy': {'min': 0.6, 'max': 1.0},
+        'valence': {'min': 0.6, 'max': 1.0},
+    },
+    'dark_cool': {
+        'genre': 'k-ballad',
+        'keywords': ['korean', 'ballad', 'k-ballad', 'r&b', 'slow', 'emotional'],
+        'energy': {'min': 0.0, 'max': 0.4},
+        'valence': {'min': 0.0, 'max': 0.4},
+    },
+    'intense': {
+        'genre': 'k-hip-hop',
+        'keywords': ['korean', 'hip-hop', 'khiphop', 'rap', 'trap', 'intense'],
+        'energy': {'min': 0.7, 'max': 1.0},
+        'valence': {'min': 0.3, 'max': 0.7},
+    },
+    'soft_pastel': {
+        'genre': 'k-indie',
+        'keywords': ['korean', 'indie', 'k-indie', 'acoustic', 'soft', 'chill'],
+        'energy': {'min': 0.2, 'max': 0.6},
+        'valence': {'min': 0.4, 'max': 0.8},
+    },
+    'nature_green': {
+        'genre': 'k-acoustic',
+        'keywords': ['korean', 'acoustic', 'folk', 'calm', 'nature', 'relax'],
+        'energy': {'min': 0.3, 'max': 0.6},
+        'valence': {'min': 0.5, 'max': 0.8},
+    },
+    'balanced': {
+        'genre': 'k-pop',
+        'keywords': ['korean', 'pop', 'kpop', 'modern'],
+        'energy': {'min': 0.4, 'max': 0.7},
+        'valence': {'min': 0.4, 'max': 0.7},
+    },
+}
+
+
+class CappedRetry(Retry):
+    """
+    Retry-After 헤더의 대기 시간을 max_retry_after 초로 제한하는 재시도 정책
+
+    Retry(respect_retry_after_header=True) 는 헤더 값만큼 그대로 잠들므로
+    Retry-After: 3600 이면 동기 워커 스레드가 한 시간 동안 묶입니다.
+    """
+
+    def __init__(self, *args, max_retry_after=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_retry_after = max_retry_after
+
+    def new(self, **kwargs):
+        # 재시도할 때마다 새 인스턴스를 만들므로 제한값을 넘겨줌
+        kwargs.setdefault('max_retry_after', self.max_retry_after)
+        return super().new(**kwargs)
+
+    def get_retry_after(self, response):
+        retry_after = super().get_retry_after(response)
+        if retry_after is None or self.max_retry_after is None:
+            return retry_after
+        return min(retry_after, self.max_retry_after)
 
 
 class SpotifyService:
     def __init__(self):
         self.client_id = getattr(settings, 'SPOTIFY_CLIENT_ID', '')
         self.client_secret = getattr(settings, 'SPOTIFY_CLIENT_SECRET', '')
+        self.token_url = getattr(settings, 'SPOTIFY_TOKEN_URL', 'https://accounts.spotify.com/api/token')
+        self.api_url = getattr(settings, 'SPOTIFY_API_URL', 'https://api.spotify.com/v1')
         self.access_token = None
+        self.token_expires_at = 0
+        self._token_lock = threading.Lock()
+
+        # (connect, read) 타임아웃 (초)
+        self.timeout = (
+            getattr(settings, 'SPOTIFY_CONNECT_TIMEOUT', 3.05),
+            getattr(settings, 'SPOTIFY_READ_TIMEOUT', 10),
+        )
+        self.session = self._build_session()
+        self.track_pool = TrackPool(self.fetch_tracks)
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'errors': 0, 'total_time': 0.0}
+
+    def _build_session(self):
+        """커넥션 풀과 재시도 정책이 설정된 keep-alive 세션을 만듭니다."""
+        pool_size = getattr(settings, 'SPOTIFY_POOL_SIZE', 10)
+        retry = CappedRetry(
+            total=getattr(settings, 'SPOTIFY_MAX_RETRIES', 3),
+            backoff_factor=getattr(settings, 'SPOTIFY_BACKOFF_FACTOR', 0.3),
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            max_retry_after=getattr(settings, 'SPOTIFY_MAX_RETRY_AFTER', 3),
+        )
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _request(self, method, url, **kwargs):
+        """세션을 통해 요청을 보내고 지연 시간을 기록합니다."""
+        kwargs.setdefault('timeout', self.timeout)
+        start = time.perf_counter()
+        failed = False
+        try:
+            with stage('spotify'):
+                return self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._stats['requests'] += 1
+                self._stats['total_time'] += elapsed
+                if failed:
+                    self._stats['errors'] += 1
+
+    def get_http_stats(self):
+        """요청 수, 평균 지연 시간, 커넥션 재사용 통계"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        # urllib3 커넥션 풀별로 새로 연 커넥션 수와 보낸 요청 수 집계
+        connections = 0
+        pool_requests = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                connections += pool.num_connections
+                pool_requests += pool.num_requests
+
+        total_time = stats.pop('total_time')
+        stats['avg_latency_ms'] = round(total_time / stats['requests'] * 1000, 2) if stats['requests'] else 0.0
+        stats['new_connections'] = connections
+        stats['reused_connections'] = max(pool_requests - connections, 0)
+        stats['reuse_ratio'] = round(1 - connections / pool_requests, 4) if pool_requests else 0.0
+        return stats
+
+    def token_is_valid(self):
+        """캐시된 토큰을 아직 사용할 수 있는지 여부"""
+        return self.access_token is not None and time.time() < self.token_expires_at - TOKEN_EXPIRY_MARGIN
+
+    def _load_shared_token(self):
+        """다른 프로세스가 받아 둔 토큰을 Django 캐시에서 가져옵니다."""
+        shared = cache.get(TOKEN_CACHE_KEY)
+        if shared:
+            self.access_token = shared['access_token']
+            self.token_expires_at = shared['expires_at']
+        return self.token_is_valid()
 
     def get_access_token(self):
-        """Spotify Access Token 얻기"""
+        """
+        Spotify Access Token 얻기
+
+        만료 직전까지 토큰을 재사용합니다. 갱신은 프로세스 안에서는 스레드 잠금으로,
+        프로세스 사이에서는 캐시 잠금으로 한 번만 일어나도록 합니다.
+        """
+        if self.token_is_valid():
+            return self.access_token
+
+        with self._token_lock:
+            # 잠금을 기다리는 동안 다른 스레드/프로세스가 갱신했을 수 있음
+            if self.token_is_valid() or self._load_shared_token():
+                return self.access_token
+
+            # 다른 프로세스가 갱신 중이면 잠시 기다렸다가 그 결과를 사용
+            acquired = cache.add(TOKEN_LOCK_KEY, 1, TOKEN_LOCK_TIMEOUT)
+            if not acquired:
+                deadline = time.time() + TOKEN_LOCK_TIMEOUT
+                while time.time() < deadline:
+                    time.sleep(0.05)
+                    if self._load_shared_token():
+                        return self.access_token
+                # 잠금을 가진 프로세스가 갱신하지 못하고 만료됨: 다시 잡아 보고, 못 잡아도 직접 발급
+                acquired = cache.add(TOKEN_LOCK_KEY, 1, TOKEN_LOCK_TIMEOUT)
+
+            try:
+                return self._request_access_token()
+            finally:
+                # 이 프로세스가 잡은 잠금만 해제 (다른 프로세스의 잠금을 지우면 동시에 발급하게 됨)
+                if acquired:
+                    cache.delete(TOKEN_LOCK_KEY)
+
+    def invalidate_token(self):
+        """만료되었거나 거부된 토큰을 버립니다."""
+        self.access_token = None
+        self.token_expires_at = 0
+        cache.delete(TOKEN_CACHE_KEY)
+
+    def _request_access_token(self):
+        """accounts.spotify.com 에서 새 토큰을 발급받아 캐시에 저장합니다."""
         if not self.client_id or not self.client_secret:
             raise Exception('Spotify API 설정이 없습니다.')
 
@@ -19,7 +231,7 @@ class SpotifyService:
         auth_bytes = auth_string.encode('utf-8')
         auth_base64 = base64.b64encode(auth_bytes).decode('utf-8')
 
-        url = 'https://accounts.spotify.com/api/token'
+        url = self.token_url
         headers = {
             'Authorization': f'Basic {auth_base64}',
             'Content-Type': 'application/x-www-form-urlencoded'
@@ -28,161 +240,273 @@ class SpotifyService:
             'grant_type': 'client_credentials'
         }
 
-        response = requests.post(url, headers=headers, data=data)
+        response = self._request('POST', url, headers=headers, data=data)
 
         if response.status_code == 200:
-            self.access_token = response.json()['access_token']
+            token_data = response.json()
+            expires_in = token_data.get('expires_in', 3600)
+            self.access_token = token_data['access_token']
+            self.token_expires_at = time.time() + expires_in
+            cache.set(
+                TOKEN_CACHE_KEY,
+                {'access_token': self.access_token, 'expires_at': self.token_expires_at},
+                max(expires_in - TOKEN_EXPIRY_MARGIN, 1)
+            )
             return self.access_token
         else:
             raise Exception(f'Spotify 인증 실패: {response.text}')
 
     def get_music_query_by_mood(self, category):
         """분위기별 검색어 및 파라미터 반환"""
-        queries = {
-            'bright_warm': {
-                'genre': 'k-pop',
-                'keywords': ['korean', 'k-pop', 'kpop', 'dance', 'idol', 'happy', 'upbeat'],
-                'energy': {'min': 0.6, 'max': 1.0},
-                'valence': {'min': 0.6, 'max': 1.0},
-            },
-            'dark_cool': {
-                'genre': 'k-ballad',
-                'keywords': ['korean', 'ballad', 'k-ballad', 'r&b', 'slow', 'emotional'],
-                'energy': {'min': 0.0, 'max': 0.4},
-                'valence': {'min': 0.0, 'max': 0.4},
-            },
-            'intense': {
-                'genre': 'k-hip-hop',
-                'keywords': ['korean', 'hip-hop', 'khiphop', 'rap', 'trap', 'intense'],
-                'energy': {'min': 0.7, 'max': 1.0},
-                'valence': {'min': 0.3, 'max': 0.7},
-            },
-            'soft_pastel': {
-                'genre': 'k-indie',
-                'keywords': ['korean', 'indie', 'k-indie', 'acoustic', 'soft', 'chill'],
-                'energy': {'min': 0.2, 'max': 0.6},
-                'valence': {'min': 0.4, 'max': 0.8},
-            },
-            'nature_green': {
-                'genre': 'k-acoustic',
-                'keywords': ['korean', 'acoustic', 'folk', 'calm', 'nature', 'relax'],
-                'energy': {'min': 0.3, 'max': 0.6},
-                'valence': {'min': 0.5, 'max': 0.8},
-            },
-            'balanced': {
-                'genre': 'k-pop',
-                'keywords': ['korean', 'pop', 'kpop', 'modern'],
-                'energy': {'min': 0.4, 'max': 0.7},
-                'valence': {'min': 0.4, 'max': 0.7},
-            },
-        }
+        return MOOD_QUERIES.get(category, MOOD_QUERIES['balanced'])
 
-        return queries.get(category, queries['balanced'])
-
-    def search_music(self, category):
-        """Spotify에서 음악 검색"""
-        token = self.get_access_token()
+    def build_search_request(self, category):
+        """검색 API 요청 URL 과 파라미터 (동기/비동기 클라이언트 공용)"""
         query_info = self.get_music_query_by_mood(category)
 
         # 랜덤 키워드 선택
         keyword = random.choice(query_info['keywords'])
 
-        url = 'https://api.spotify.com/v1/search'
-        headers = {
-            'Authorization': f'Bearer {token}'
-        }
+        url = f'{self.api_url}/search'
         params = {
             'q': keyword,
             'type': 'track',
             'market': 'KR',
             'limit': 20
         }
+        return url, params
+
+    def build_recommendation_request(self, category):
+        """Recommendations API 요청 URL 과 파라미터 (동기/비동기 클라이언트 공용)"""
+        query_info = self.get_music_query_by_mood(category)
+
+        # 여러 시드 아티스트 시도
+        seed_artists = [
+            '3HqSLMAZ3g3d5poNaI7GOU',  # IU
+            '6HvZYsbFfjnjFrWF950C9d',  # NewJeans
+            '5Ri1uhN0kZhGQ0vs0sbphw',  # aespa
+            '2rtPHT2N6KuP5yyhFK1Ip0',  # BTS
+        ]
+
+        url = f'{self.api_url}/recommendations'
+
+        # 랜덤 시드 아티스트 선택
+        seed_artist = random.choice(seed_artists)
 
-        response = requests.get(url, headers=headers, params=params)
+        params = {
+            'seed_artists': seed_artist,
+            'market': 'KR',
+            'limit': 20,
+            'target_energy': (query_info['energy']['min'] + query_info['energy']['max']) / 2,
+            'target_valence': (query_info['valence']['min'] + query_info['valence']['max']) / 2,
+        }
+        return url, params
+
+    def search_tracks(self, category):
+        """Spotify 검색 API 로 미리듣기가 가능한 트랙 목록을 가져옵니다."""
+        token = self.get_access_token()
+        url, params = self.build_search_request(category)
+        headers = {
+            'Authorization': f'Bearer {token}'
+        }
+
+        response = self._request('GET', url, headers=headers, params=params)
+
+        if response.status_code == 401:
+            self.invalidate_token()
 
         if response.status_code == 200:
             tracks = response.json()['tracks']['items']
 
             # 프리뷰 URL이 있는 트랙만 필터링
-            tracks_with_preview = [t for t in tracks if t.get('preview_url')]
+            tracks_with_preview = [format_track(t) for t in tracks if t.get('preview_url')]
 
             if not tracks_with_preview:
                 raise Exception('미리듣기가 가능한 곡을 찾을 수 없습니다.')
 
-            # 랜덤으로 하나 선택
-            track = random.choice(tracks_with_preview)
-
-            return {
-                'id': track['id'],
-                'name': track['name'],
-                'artist': ', '.join([a['name'] for a in track['artists']]),
-                'album': track['album']['name'],
-                'albumCover': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                'previewUrl': track['preview_url'],
-                'spotifyUrl': track['external_urls']['spotify'],
-                'duration': track['duration_ms'] / 1000,
-            }
+            return tracks_with_preview
         else:
             raise Exception(f'음악 검색 실패: {response.text}')
 
-    def get_recommendations(self, category):
-        """Spotify Recommendations API 사용"""
-        try:
-            token = self.get_access_token()
-            query_info = self.get_music_query_by_mood(category)
-
-            # 여러 시드 아티스트 시도
-            seed_artists = [
-                '3HqSLMAZ3g3d5poNaI7GOU',  # IU
-                '6HvZYsbFfjnjFrWF950C9d',  # NewJeans
-                '5Ri1uhN0kZhGQ0vs0sbphw',  # aespa
-                '2rtPHT2N6KuP5yyhFK1Ip0',  # BTS
-            ]
-
-            url = 'https://api.spotify.com/v1/recommendations'
-            headers = {
-                'Authorization': f'Bearer {token}'
-            }
+    def search_music(self, category):
+        """Spotify에서 음악 검색"""
+        # 랜덤으로 하나 선택
+        return random.choice(self.search_tracks(category))
+
+    def recommend_tracks(self, category):
+        """Spotify Recommendations API 로 미리듣기가 가능한 트랙 목록을 가져옵니다."""
+        token = self.get_access_token()
+        url, params = self.build_recommendation_request(category)
+        headers = {
+            'Authorization': f'Bearer {token}'
+        }
 
-            # 랜덤 시드 아티스트 선택
-            seed_artist = random.choice(seed_artists)
+        response = self._request('GET', url, headers=headers, params=params)
 
-            params = {
-                'seed_artists': seed_artist,
-                'market': 'KR',
-                'limit': 20,
-                'target_energy': (query_info['energy']['min'] + query_info['energy']['max']) / 2,
-                'target_valence': (query_info['valence']['min'] + query_info['valence']['max']) / 2,
-            }
+        if response.status_code == 401:
+            self.invalidate_token()
+
+        if response.status_code == 200:
+            tracks = response.json()['tracks']
 
-            response = requests.get(url, headers=headers, params=params)
+            # 프리뷰 URL이 있는 트랙만 필터링
+            return [format_track(t) for t in tracks if t.get('preview_url')]
 
-            if response.status_code == 200:
-                tracks = response.json()['tracks']
+        return []
 
-                # 프리뷰 URL이 있는 트랙만 필터링
-                tracks_with_preview = [t for t in tracks if t.get('preview_url')]
+    def fetch_tracks(self, category):
+        """추천 API 로 트랙 목록을 가져오고, 실패하면 검색으로 대체합니다."""
+        try:
+            tracks = self.recommend_tracks(category)
+            if tracks:
+                return tracks
+        except Exception as e:
+            logger.warning('Recommendations 실패, 검색으로 대체: %s', e)
 
-                if tracks_with_preview:
-                    track = random.choice(tracks_with_preview)
+        # Recommendations 실패 시 검색으로 대체
+        return self.search_tracks(category)
 
-                    return {
-                        'id': track['id'],
-                        'name': track['name'],
-                        'artist': ', '.join([a['name'] for a in track['artists']]),
-                        'album': track['album']['name'],
-                        'albumCover': track['album']['images'][0]['url'] if track['album']['images'] else None,
-                        'previewUrl': track['preview_url'],
-                        'spotifyUrl': track['external_urls']['spotify'],
-                        'duration': track['duration_ms'] / 1000,
-                    }
+    def get_recommendations(self, category):
+        """분위기에 맞는 트랙 하나를 반환합니다. (트랙 풀 사용 시 메모리에서 응답)"""
+        if getattr(settings, 'SPOTIFY_TRACK_POOL_ENABLED', True):
+            return self.track_pool.get(category)
+
+        return random.choice(self.fetch_tracks(category))
+
+
+def format_track(track):
+    """Spotify 트랙 객체를 프론트엔드 응답 형식으로 변환합니다."""
+    return {
+        'id': track['id'],
+        'name': track['name'],
+        'artist': ', '.join([a['name'] for a in track['artists']]),
+        'album': track['album']['name'],
+        'albumCover': track['album']['images'][0]['url'] if track['album']['images'] else None,
+        'previewUrl': track['preview_url'],
+        'spotifyUrl': track['external_urls']['spotify'],
+        'duration': track['duration_ms'] / 1000,
+    }
+
+
+class TrackPool:
+    """
+    분위기(카테고리)별 트랙 풀
+
+    Spotify 응답으로 받은 트랙을 카테고리별로 보관하고, 요청마다 하나씩 꺼내 줍니다.
+    - TTL 이 지난 풀은 stale 기간 동안 그대로 응답하면서 백그라운드에서 다시 채웁니다.
+    - 남은 트랙이 최소 개수 아래로 내려가도 백그라운드에서 다시 채웁니다.
+    - 풀이 비었거나 stale 기간까지 지났으면 요청 안에서 바로 가져옵니다.
+
+    설정 (settings.py):
+        SPOTIFY_TRACK_POOL_SIZE: 카테고리별 최대 트랙 수 (기본 60)
+        SPOTIFY_TRACK_POOL_TTL: 풀이 신선한 시간(초) (기본 600)
+        SPOTIFY_TRACK_POOL_STALE_TTL: TTL 이후 갱신하면서 계속 응답하는 시간(초) (기본 300)
+        SPOTIFY_TRACK_POOL_LOW_WATERMARK: 이 개수 미만이면 백그라운드 갱신 (기본 5)
+    """
+
+    def __init__(self, fetch):
+        self._fetch = fetch
+        self._pools = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refills': 0, 'refill_errors': 0}
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'SPOTIFY_TRACK_POOL_SIZE', 60)
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'SPOTIFY_TRACK_POOL_TTL', 600)
+
+    @property
+    def stale_ttl(self):
+        return getattr(settings, 'SPOTIFY_TRACK_POOL_STALE_TTL', 300)
+
+    @property
+    def low_watermark(self):
+        return getattr(settings, 'SPOTIFY_TRACK_POOL_LOW_WATERMARK', 5)
+
+    @staticmethod
+    def normalize(category):
+        """알 수 없는 카테고리는 get_music_query_by_mood 와 같이 balanced 로 취급"""
+        return category if category in MOOD_QUERIES else 'balanced'
+
+    def get(self, category):
+        """카테고리에 맞는 트랙 하나를 꺼냅니다."""
+        track = self.take(category)
+        if track is not None:
+            return track
+
+        # 풀이 비었거나 너무 오래됨: 요청 안에서 가져와 채움
+        tracks = self._fetch(category)
+        track = random.choice(tracks)
+        self.store(category, [t for t in tracks if t is not track])
+        return track
+
+    def take(self, category):
+        """풀에 있는 트랙 하나를 꺼냅니다. 풀이 비었거나 너무 오래되었으면 None"""
+        category = self.normalize(category)
+
+        with self._lock:
+            entry = self._pools.get(category)
+            if entry and entry['tracks']:
+                age = time.monotonic() - entry['filled_at']
+                if age < self.ttl + self.stale_ttl:
+                    tracks = entry['tracks']
+                    track = tracks.pop(random.randrange(len(tracks)))
+
+                    stale = age >= self.ttl
+                    self.stats['stale_hits' if stale else 'hits'] += 1
+                    if stale or len(tracks) < self.low_watermark:
+                        self._refill_in_background(category)
+                    return track
+
+            self.stats['misses'] += 1
+            return None
+
+    def store(self, category, tracks):
+        """가져온 트랙을 풀에 채웁니다."""
+        category = self.normalize(category)
+
+        with self._lock:
+            entry = self._pools.get(category)
+            existing = entry['tracks'] if entry else []
+
+            # 새 트랙 우선, 남아 있던 트랙은 중복을 빼고 뒤에 유지
+            seen = {t['id'] for t in tracks}
+            merged = tracks + [t for t in existing if t['id'] not in seen]
+            self._pools[category] = {
+                'tracks': merged[:self.max_size],
+                'filled_at': time.monotonic(),
+            }
 
-            # Recommendations 실패 시 검색으로 대체
-            return self.search_music(category)
+    def _refill_in_background(self, category):
+        """카테고리당 동시에 하나의 갱신만 실행 (self._lock 을 잡은 상태에서 호출)"""
+        if category in self._refreshing:
+            return
+        self._refreshing.add(category)
+        threading.Thread(target=self._refill, args=(category,), daemon=True).start()
 
+    def _refill(self, category):
+        try:
+            self.store(category, self._fetch(category))
+            with self._lock:
+                self.stats['refills'] += 1
         except Exception as e:
-            print(f'Recommendations 실패, 검색으로 대체: {e}')
-            return self.search_music(category)
+            logger.warning('트랙 풀 갱신 실패 (%s): %s', category, e)
+            with self._lock:
+                self.stats['refill_errors'] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(category)
+
+    def get_stats(self):
+        """적중/실패 카운터와 카테고리별 남은 트랙 수"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['pools'] = {category: len(entry['tracks']) for category, entry in self._pools.items()}
+        return stats
 
 
 # 싱글톤 인스턴스
@@ -0,0 +1,210 @@
+"""
+아주 큰 이미지의 스트립 단위 축소 디코드
+
+PNG/BMP 는 Image.open 후 load() 하면 전체 픽셀을 한 번에 메모리에 올립니다. (200MP RGB 면 약 600MB)
+여기서는 위에서부터 가로 띠(스트립)만큼 디코드해 바로 reduce() 로 줄이고 결과 캔버스에 붙이므로,
+메모리에는 스트립 하나와 축소된 캔버스만 남아 픽셀 수와 관계없이 사용량이 일정합니다.
+
+스트립 높이는 reduce 배율의 배수로 맞추므로 결과는 전체를 디코드한 뒤 reduce(factor) 한 것과 같습니다.
+(분석기는 이 축소본에서 만든 작업용 사본으로 색상/밝기 히스토그램을 계산함, ImageAnalysisContext._decode_reduced)
+
+    - PNG (인터레이스 아님): IDAT 의 zlib 스트림을 스트립 크기만큼만 풀고, 앞 스트립의 마지막 행을
+      필터 없는(None) 행으로 앞에 붙여 Pillow 의 zip 디코더로 행 필터를 되돌립니다.
+    - BMP 등 무압축(raw 타일): 스트립에 해당하는 행 바이트만 파일에서 읽습니다.
+
+JPEG 는 draft() 로 DCT 단계에서 이미 축소 디코드하므로 대상이 아니고,
+인터레이스 PNG, 16비트 채널 PNG, 애니메이션, RLE BMP, GIF/WEBP 는 기존처럼 전체를 디코드합니다.
+
+일괄 분석 워커에서도 import 하므로 Django 에 의존하지 않습니다. (설정은 있을 때만 읽음)
+
+설정 (settings.py):
+    IMAGE_STREAMING_MIN_PIXELS: 이 픽셀 수 이상이면 스트립 단위로 디코드 (기본 16MP)
+    IMAGE_STREAMING_STRIP_BYTES: 스트립 하나를 디코드할 때 쓸 메모리 (기본 8MB)
+"""
+import struct
+import zlib
+
+from PIL import Image
+
+# reduce() 를 바로 적용할 수 있는 모드 (그 외 모드는 스트립마다 RGB/RGBA 로 변환)
+REDUCIBLE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'I', 'F')
+
+# PNG 색상 타입별 채널 수
+PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# IDAT 를 읽을 단위
+READ_SIZE = 256 * 1024
+
+
+def _get_setting(name, default):
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+def get_min_pixels():
+    return _get_setting('IMAGE_STREAMING_MIN_PIXELS', 16 * 1000 * 1000)
+
+
+def get_strip_bytes():
+    return _get_setting('IMAGE_STREAMING_STRIP_BYTES', 8 * 1024 * 1024)
+
+
+def _png_header(img):
+    """IHDR 의 (비트 깊이, 색상 타입, 인터레이스)"""
+    img.fp.seek(24)
+    depth, color_type, _, _, interlace = struct.unpack('>BBBBB', img.fp.read(5))
+    return depth, color_type, interlace
+
+
+def _round_trips(mode, rawmode):
+    """디코드한 행을 같은 rawmode 로 다시 묶을 수 있는지 (앞 스트립의 마지막 행을 넘겨야 함)"""
+    try:
+        Image.new(mode, (1, 1)).tobytes('raw', rawmode)
+    except (ValueError, OSError):
+        return False
+    return True
+
+
+def can_stream(img):
+    """
+    스트립 단위로 디코드할 수 있는 이미지인지 (아직 load() 하지 않은 Image.open 결과)
+    """
+    if img.fp is None or getattr(img, 'n_frames', 1) != 1 or len(img.tile) != 1:
+        return False
+    tile = img.tile[0]
+    if tile.extents != (0, 0, *img.size):
+        return False
+
+    if img.format == 'PNG' and tile.codec_name == 'zip':
+        try:
+            depth, color_type, interlace = _png_header(img)
+        except (OSError, struct.error):
+            return False
+        return (
+            not interlace and depth <= 8 and color_type in PNG_CHANNELS
+            and isinstance(tile.args, str) and _round_trips(img.mode, tile.args)
+        )
+
+    if tile.codec_name == 'raw':
+        args = tile.args
+        return isinstance(args, tuple) and len(args) == 3 and args[1] > 0 and args[2] in (1, -1)
+    return False
+
+
+def should_stream(img):
+    """픽셀 수가 기준 이상이고 스트립 단위로 디코드할 수 있으면 True"""
+    return img.width * img.height >= get_min_pixels() and can_stream(img)
+
+
+def _strip_rows(img, factor):
+    """스트립 높이 (reduce 배율의 배수, 디코드 후 RGBA 기준으로 IMAGE_STREAMING_STRIP_BYTES 이내)"""
+    rows = get_strip_bytes() // max(1, img.width * 4)
+    return max(factor, rows - rows % factor)
+
+
+def _idat_chunks(image_file, offset):
+    """첫 IDAT 데이터 위치(offset)부터 이어지는 IDAT 청크의 데이터"""
+    image_file.seek(offset - 8)
+    while True:
+        header = image_file.read(8)
+        if len(header) < 8:
+            return
+        length, chunk_type = struct.unpack('>I4s', header)
+        if chunk_type != b'IDAT':
+            return
+        while length:
+            data = image_file.read(min(length, READ_SIZE))
+            if not data:
+                return
+            length -= len(data)
+            yield data
+        # CRC
+        image_file.seek(4, 1)
+
+
+def _png_strips(img, rows):
+    """PNG 를 위에서부터 rows 행씩 디코드한 이미지"""
+    width, height = img.size
+    tile = img.tile[0]
+    rawmode = tile.args
+    depth, color_type, _ = _png_header(img)
+    row_bytes = (width * depth * PNG_CHANNELS[color_type] + 7) // 8
+    stride = row_bytes + 1
+
+    chunks = _idat_chunks(img.fp, tile.offset)
+    inflater = zlib.decompressobj()
+    previous = b''
+    for top in range(0, height, rows):
+        count = min(rows, height - top)
+        # 앞 스트립의 마지막 행을 필터 없는 행으로 붙여 첫 행의 Up/Average/Paeth 필터가 참조하게 함
+        parts = [previous]
+        remaining = count * stride
+        while remaining:
+            data = inflater.unconsumed_tail or next(chunks, None)
+            if data is None or inflater.eof:
+                raise OSError('PNG 이미지 데이터가 잘렸습니다.')
+            # max_length 를 넘게 풀지 않으므로 스트립마다 필요한 만큼만 메모리에 둠
+            part = inflater.decompress(data, remaining)
+            remaining -= len(part)
+            parts.append(part)
+
+        data = b''.join(parts)
+        del parts
+        decoded_rows = count + (1 if previous else 0)
+        strip = Image.frombytes(img.mode, (width, decoded_rows), zlib.compress(data, 0), 'zip', rawmode)
+        previous = b'\x00' + strip.crop((0, decoded_rows - 1, width, decoded_rows)).tobytes('raw', rawmode)
+        if decoded_rows > count:
+            strip = strip.crop((0, 1, width, decoded_rows))
+        yield strip
+
+
+def _raw_strips(img, rows):
+    """무압축 이미지(BMP 등)를 위에서부터 rows 행씩 읽은 이미지"""
+    width, height = img.size
+    tile = img.tile[0]
+    rawmode, stride, orientation = tile.args
+    for top in range(0, height, rows):
+        count = min(rows, height - top)
+        # 아래에서 위로 저장된 파일(orientation -1)은 아래쪽 행이 파일 앞에 있음
+        first = height - top - count if orientation < 0 else top
+        img.fp.seek(tile.offset + first * stride)
+        data = img.fp.read(count * stride)
+        if len(data) < count * stride:
+            raise OSError('이미지 데이터가 잘렸습니다.')
+        yield Image.frombuffer(img.mode, (width, count), data, 'raw', rawmode, stride, orientation)
+
+
+def stream_reduce(img, factor):
+    """
+    스트립 단위로 디코드하며 reduce(factor) 한 이미지 (can_stream(img) 인 이미지만)
+
+    팔레트 이미지는 스트립마다 RGB (투명색이 있으면 RGBA) 로 바꿔 줄입니다.
+    결과에는 원본 info (EXIF 등)를 복사해 두므로 ImageOps.exif_transpose 를 그대로 쓸 수 있습니다.
+    """
+    rows = _strip_rows(img, factor)
+    strips = _png_strips(img, rows) if img.tile[0].codec_name == 'zip' else _raw_strips(img, rows)
+    size = (-(-img.width // factor), -(-img.height // factor))
+
+    reduced = None
+    top = 0
+    for strip in strips:
+        if strip.mode == 'P':
+            rawmode, palette = img.palette.getdata()
+            strip.putpalette(palette, rawmode)
+        if strip.mode not in REDUCIBLE_MODES:
+            if 'transparency' in img.info:
+                strip.info['transparency'] = img.info['transparency']
+                strip = strip.convert('RGBA')
+            else:
+                strip = strip.convert('RGB')
+        small = strip.reduce(factor)
+        if reduced is None:
+            reduced = Image.new(small.mode, size)
+        reduced.paste(small, (0, top))
+        top += small.height
+
+    reduced.info = dict(img.info)
+    return reduced
@@ -0,0 +1,189 @@
+"""
+업로드 이미지의 백그라운드 분석 큐
+
+외부 브로커 없이 서버 프로세스 안에서 처리합니다. 워커 스레드는 대기열에서 작업을 꺼내
+분석을 프로세스 풀(batch.batch_analyzer, 일괄 업로드와 공유)에 맡기고 결과를 DB 에 기록하므로,
+CPU 작업인 디코드/분석은 GIL 에 묶이지 않고 서버의 요청 처리 스레드와 병렬로 실행됩니다.
+
+작업 상태는 UploadedImage.analysis_status 에 기록되므로 DB 가 작업 테이블 역할을 합니다.
+    - 워커는 'pending' 인 행을 'processing' 으로 바꾼 뒤에만 분석합니다. (claim, 같은 작업을 두 번 처리하지 않음)
+    - 재시도를 기다리는 작업은 'pending' 으로 되돌려 둡니다.
+    - 프로세스가 재시작되어 대기열의 작업을 잃으면 남은 'pending'/'processing' 행을
+      python manage.py resume_analysis 로 다시 처리합니다.
+클라이언트는 GET /api/images/{id}/status/ 로 진행 상황을 조회합니다.
+
+설정 (settings.py):
+    IMAGE_ANALYSIS_ASYNC: 비동기 분석 사용 여부 (기본 False)
+    IMAGE_ANALYSIS_WORKERS: 동시에 분석을 맡기는 워커 스레드 수 (기본 2)
+    IMAGE_ANALYSIS_QUEUE_SIZE: 대기열 최대 길이 (기본 100)
+    IMAGE_ANALYSIS_MAX_RETRIES: 실패 시 재시도 횟수 (기본 2)
+    IMAGE_ANALYSIS_RETRY_DELAY: 첫 재시도 대기 시간(초), 이후 2배씩 증가 (기본 1.0)
+    IMAGE_ANALYSIS_BATCH_WORKERS: 분석 프로세스 수 (batch.py)
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .batch import batch_analyzer, stored_source
+from .cache import analysis_cache
+from .models import ANALYSIS_FIELDS, ImageColor, UploadedImage
+from .thumbnails import generate_derivatives_safely
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisError(Exception):
+    """분석기가 오류 결과를 반환한 경우"""
+
+
+def claim(image_id):
+    """
+    대기 중인 작업을 '분석 중'으로 바꿉니다.
+
+    Returns:
+        bool: 다른 워커/프로세스가 이미 가져갔거나 끝난 작업이면 False
+    """
+    return UploadedImage.objects.filter(
+        pk=image_id, analysis_status=UploadedImage.AnalysisStatus.PENDING
+    ).update(analysis_status=UploadedImage.AnalysisStatus.PROCESSING) == 1
+
+
+def release(image_id):
+    """재시도를 기다리는 작업을 다시 '대기 중'으로 (재시작되어도 resume_analysis 로 이어서 처리)"""
+    UploadedImage.objects.filter(
+        pk=image_id, analysis_status=UploadedImage.AnalysisStatus.PROCESSING
+    ).update(analysis_status=UploadedImage.AnalysisStatus.PENDING)
+
+
+def save_result(instance, analysis_result):
+    """분석 결과를 기록하고 색상 인덱스, 캐시, 썸네일을 갱신합니다."""
+    instance.analysis_result = analysis_result
+    instance.analysis_completed = True
+    instance.analysis_status = UploadedImage.AnalysisStatus.COMPLETED
+    instance.apply_analysis(analysis_result)
+    # 'completed' 상태와 색상 인덱스 행이 함께 보이도록 한 트랜잭션에서 기록
+    with transaction.atomic():
+        instance.save(update_fields=['analysis_result', 'analysis_completed', 'analysis_status', *ANALYSIS_FIELDS])
+        ImageColor.replace_for([instance])
+    analysis_cache.set(instance.content_hash, analysis_result)
+    generate_derivatives_safely(instance.image.name, instance.content_hash)
+
+
+def run_analysis(image_id, analyzer=None):
+    """
+    저장된 이미지를 프로세스 풀에서 분석하고 결과를 DB 에 기록합니다.
+    (이미 다른 곳에서 가져간 작업이면 아무것도 하지 않음)
+    """
+    if not claim(image_id):
+        return
+    instance = UploadedImage.objects.get(pk=image_id)
+
+    source = stored_source(instance)
+    if source is None:
+        raise AnalysisError('원본 이미지 파일을 찾을 수 없습니다.')
+    analysis_result = (analyzer or batch_analyzer).run(source)
+    if 'error' in analysis_result:
+        raise AnalysisError(analysis_result['error'])
+
+    save_result(instance, analysis_result)
+
+
+def mark_failed(image_id, error):
+    """재시도를 모두 소진한 작업을 실패로 기록합니다."""
+    UploadedImage.objects.filter(pk=image_id).update(
+        analysis_completed=False,
+        analysis_status=UploadedImage.AnalysisStatus.FAILED,
+        analysis_result={
+            'error': str(error),
+            'message': '이미지 분석 중 오류가 발생했습니다.'
+        },
+    )
+
+
+class AnalysisQueue:
+    """크기가 제한된 대기열과 워커 스레드로 구성된 분석 큐 (분석 자체는 프로세스 풀에서)"""
+
+    def __init__(self):
+        self._queue = None
+        self._workers = []
+        self._lock = threading.Lock()
+
+    @property
+    def max_retries(self):
+        return getattr(settings, 'IMAGE_ANALYSIS_MAX_RETRIES', 2)
+
+    @property
+    def retry_delay(self):
+        return getattr(settings, 'IMAGE_ANALYSIS_RETRY_DELAY', 1.0)
+
+    def _start(self):
+        """첫 작업이 들어올 때 워커를 시작합니다. (manage.py 명령 등에서 스레드를 만들지 않도록)"""
+        with self._lock:
+            if self._queue is not None:
+                return
+            self._queue = queue.Queue(maxsize=getattr(settings, 'IMAGE_ANALYSIS_QUEUE_SIZE', 100))
+            for i in range(getattr(settings, 'IMAGE_ANALYSIS_WORKERS', 2)):
+                worker = threading.Thread(target=self._work, name=f'image-analysis-{i}', daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def is_full(self):
+        """대기열이 가득 찼는지 여부"""
+        return self._queue is not None and self._queue.full()
+
+    def depth(self):
+        """대기 중인 작업 수"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(self, image_id, attempt=0):
+        """
+        분석 작업을 대기열에 넣습니다.
+
+        Returns:
+            bool: 대기열이 가득 차서 넣지 못하면 False
+        """
+        self._start()
+        try:
+            self._queue.put_nowait((image_id, attempt))
+            return True
+        except queue.Full:
+            return False
+
+    def _work(self):
+        while True:
+            image_id, attempt = self._queue.get()
+            try:
+                close_old_connections()
+                run_analysis(image_id)
+            except UploadedImage.DoesNotExist:
+                pass
+            except Exception as e:
+                self._retry_or_fail(image_id, attempt, e)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def _retry_or_fail(self, image_id, attempt, error):
+        if attempt < self.max_retries:
+            logger.warning('이미지 %s 분석 실패 (시도 %d), 재시도합니다: %s', image_id, attempt + 1, error)
+            release(image_id)
+            # 지수 백오프 후 재등록 (워커를 막지 않도록 타이머 사용)
+            delay = self.retry_delay * (2 ** attempt)
+            timer = threading.Timer(delay, self._requeue, args=(image_id, attempt + 1, error))
+            timer.daemon = True
+            timer.start()
+        else:
+            logger.error('이미지 %s 분석 최종 실패: %s', image_id, error)
+            mark_failed(image_id, error)
+
+    def _requeue(self, image_id, attempt, error):
+        if not self.submit(image_id, attempt):
+            mark_failed(image_id, error)
+            close_old_connections()
+
+
+# 싱글톤 인스턴스
+analysis_queue = AnalysisQueue()
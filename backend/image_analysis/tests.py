@@ -1,3 +1,1929 @@
-from django.test import TestCase
+import asyncio
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+import httpx
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import ExifTags, Image
+from PIL.TiffImagePlugin import IFDRational
+
+from . import async_spotify, thumbnails, utils
+from .cache import analysis_cache
+from .color_index import bins_within, get_color_rows, rgb_bin
+from .animation import sample_indices
+from .exif import exif_value
+from .header import check_header, get_max_pixels, read_header, rejection_stats
+from .instrumentation import request_metrics
+from .management.commands.reanalyze import Command as ReanalyzeCommand
+from .models import ImageColor, ImageExif, UploadedImage
+from .mood import extract_mood_features, get_mood_fields
+from .similarity import find_similar, get_similarity_fields, hamming_distance
+from .spotify_service import TOKEN_CACHE_KEY, TOKEN_EXPIRY_MARGIN, SpotifyService
+from .streaming import REDUCIBLE_MODES, can_stream, should_stream, stream_reduce
+from .tasks import AnalysisQueue
+from .thumbnails import derivative_name, get_formats
+from .upload_handlers import StreamingImageUploadHandler
+from .utils import (
+    ANALYSIS_VERSION, ANALYZER_VERSIONS, INCOMPLETE_ANALYSIS_VERSION, PALETTE_MIN_DISTANCE, analyze_with_metadata,
+    compute_content_hash, extract_palette, lab_distance, refresh_analysis, stale_sections, to_lab,
+)
+
+
+def make_image(color=(200, 30, 30), size=(64, 48), fmt='PNG', name=None):
+    """테스트용 업로드 파일 (name 속성이 있는 BytesIO)"""
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, fmt)
+    buffer.seek(0)
+    buffer.name = name or f'test.{fmt.lower()}'
+    return buffer
+
+
+def make_split_image(left, right, size=(64, 48), name='split.png'):
+    """왼쪽 절반은 left, 오른쪽 절반은 right 색인 PNG"""
+    img = Image.new('RGB', size, left)
+    img.paste(right, (size[0] // 2, 0, size[0], size[1]))
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG')
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def make_gradient(size=(256, 192), fmt='PNG', name=None, quality=95):
+    """지각 해시가 0 이 아닌 그레이디언트 + 도형 이미지"""
+    img = Image.linear_gradient('L').resize(size).convert('RGB')
+    img.paste((220, 40, 40), (size[0] // 4, size[1] // 4, size[0] // 2, size[1] // 2))
+    img.paste((30, 30, 200), (size[0] * 5 // 8, size[1] // 8, size[0] * 7 // 8, size[1] * 3 // 4))
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, **({'quality': quality} if fmt == 'JPEG' else {}))
+    buffer.seek(0)
+    buffer.name = name or f'gradient.{fmt.lower()}'
+    return buffer
+
+
+def make_animation(frames=3, size=(32, 32), fmt='GIF', duration=100, loop=0):
+    """프레임마다 색이 다른 애니메이션 업로드 파일 (프레임 i 의 색은 (i * 60, 80, 160))"""
+    images = [Image.new('RGB', size, (index * 60 % 256, 80, 160)) for index in range(frames)]
+    buffer = io.BytesIO()
+    images[0].save(buffer, fmt, save_all=True, append_images=images[1:], duration=duration, loop=loop)
+    buffer.seek(0)
+    buffer.name = f'animation.{fmt.lower()}'
+    return buffer
+
+
+def make_exif_jpeg(name='exif.jpg', zero_rational=False):
+    """
+    EXIF 를 알고 있는 JPEG
+
+    IFD0: Make, Model(끝에 NUL), Orientation, Artist(허용 목록에 없음)
+    Exif IFD: ExposureTime 1/250, FNumber 28/10, ISOSpeedRatings 200, MakerNote(바이너리)
+    GPS IFD: 남위 37도 30분 36초
+    """
+    exif = Image.Exif()
+    exif[ExifTags.Base.Make] = 'TestCam'
+    exif[ExifTags.Base.Model] = 'Model 1\x00'
+    exif[ExifTags.Base.Orientation] = 6
+    exif[ExifTags.Base.Artist] = 'someone'
+    exif_ifd = exif.get_ifd(ExifTags.IFD.Exif)
+    exif_ifd[ExifTags.Base.ExposureTime] = IFDRational(1, 250)
+    exif_ifd[ExifTags.Base.FNumber] = IFDRational(0, 0) if zero_rational else IFDRational(28, 10)
+    exif_ifd[ExifTags.Base.ISOSpeedRatings] = 200
+    exif_ifd[ExifTags.Base.MakerNote] = b'\x01\x02binary'
+    gps_ifd = exif.get_ifd(ExifTags.IFD.GPSInfo)
+    gps_ifd[ExifTags.GPS.GPSLatitudeRef] = 'S'
+    gps_ifd[ExifTags.GPS.GPSLatitude] = (IFDRational(37, 1), IFDRational(30, 1), IFDRational(36, 1))
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 24), (10, 20, 30)).save(buffer, 'JPEG', exif=exif)
+    buffer.seek(0)
+    buffer.name = name
+    return buffer
+
+
+def png_chunk(chunk_type, data):
+    return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+
+def make_png_header_only(width, height, name='bomb.png'):
+    """헤더의 크기만 큰 PNG (IDAT 는 비어 있어 디코드할 수 없음, 압축 폭탄 흉내)"""
+    ihdr = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    buffer = io.BytesIO(
+        b'\x89PNG\r\n\x1a\n' + png_chunk(b'IHDR', ihdr) + png_chunk(b'IDAT', b'') + png_chunk(b'IEND', b'')
+    )
+    buffer.name = name
+    return buffer
+
+
+class MediaMixin:
+    """임시 MEDIA_ROOT/업로드 임시 디렉토리와 빈 분석 캐시에서 실행하는 테스트"""
+
+    def setUp(self):
+        base_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, base_dir, ignore_errors=True)
+        override = override_settings(
+            MEDIA_ROOT=os.path.join(base_dir, 'media'),
+            FILE_UPLOAD_TEMP_DIR=os.path.join(base_dir, '.upload_tmp'),
+            IMAGE_ANALYSIS_ASYNC=False,
+            IMAGE_ANALYSIS_BATCH_WORKERS=0,
+            IMAGE_THUMBNAIL_EAGER=False,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        self.media_root = os.path.join(base_dir, 'media')
+
+        cache.clear()
+        analysis_cache._local.clear()
+        # 적중/실패 카운터는 프로세스 단위로 누적되므로 테스트마다 0 에서 시작
+        stats = mock.patch.dict(analysis_cache.stats, dict.fromkeys(analysis_cache.stats, 0))
+        stats.start()
+        self.addCleanup(stats.stop)
+
+    def upload(self, image_file):
+        response = self.client.post('/api/images/', {'image': image_file})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+
+class MediaTestCase(MediaMixin, TestCase):
+    pass
+
+
+class ContentHashDeduplicationTests(MediaTestCase):
+    """내용 해시로 같은 이미지의 파일과 분석 결과를 재사용"""
+
+    def test_content_hash_is_sha256_of_upload(self):
+        image_file = make_image()
+        expected = hashlib.sha256(image_file.getvalue()).hexdigest()
+
+        data = self.upload(image_file)
+
+        self.assertEqual(UploadedImage.objects.get(pk=data['id']).content_hash, expected)
+        self.assertEqual(compute_content_hash(make_image()), expected)
+
+    def test_identical_upload_reuses_stored_file_and_result(self):
+        first = self.upload(make_image(name='first.png'))
+
+        with mock.patch('image_analysis.views.analyze_with_metadata', side_effect=AssertionError('재분석')):
+            second = self.upload(make_image(name='second.png'))
+
+        first_row = UploadedImage.objects.get(pk=first['id'])
+        second_row = UploadedImage.objects.get(pk=second['id'])
+        self.assertNotEqual(first_row.pk, second_row.pk)
+        self.assertEqual(second_row.file_name, 'second.png')
+        self.assertEqual(second_row.image.name, first_row.image.name)
+        self.assertEqual(second_row.analysis_result, first_row.analysis_result)
+        self.assertTrue(second_row.analysis_completed)
+        self.assertEqual(analysis_cache.get_stats()['db_hits'], 1)
+
+        stored = [name for _, _, names in os.walk(os.path.join(self.media_root, 'uploads')) for name in names]
+        self.assertEqual(len(stored), 1)
+
+    def test_different_content_is_analyzed_separately(self):
+        first = self.upload(make_image(color=(200, 30, 30)))
+        second = self.upload(make_image(color=(30, 30, 200)))
+
+        first_row = UploadedImage.objects.get(pk=first['id'])
+        second_row = UploadedImage.objects.get(pk=second['id'])
+        self.assertNotEqual(first_row.content_hash, second_row.content_hash)
+        self.assertNotEqual(first_row.image.name, second_row.image.name)
+        self.assertEqual(analysis_cache.get_stats()['db_hits'], 0)
+
+    def test_quick_analyze_reuses_cached_result(self):
+        first = self.client.post('/api/images/quick_analyze/', {'image': make_image()})
+        self.assertEqual(first.status_code, 200)
+
+        with mock.patch('image_analysis.views.analyze_with_metadata', side_effect=AssertionError('재분석')):
+            second = self.client.post('/api/images/quick_analyze/', {'image': make_image()})
+
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['analysis'], first.json()['analysis'])
+        self.assertEqual(analysis_cache.get_stats()['local_hits'], 1)
+        self.assertFalse(UploadedImage.objects.exists())
+
+
+class HeaderValidationTests(MediaTestCase):
+    """디코드 전에 헤더만 읽어 포맷, 해상도, 프레임 수로 거절"""
+
+    def setUp(self):
+        super().setUp()
+        rejection_stats.reset()
+
+    def test_reads_size_from_header_for_each_format(self):
+        for fmt in ('PNG', 'JPEG', 'GIF', 'BMP', 'WEBP'):
+            with self.subTest(fmt=fmt):
+                header, bytes_read = read_header(make_image(size=(123, 45), fmt=fmt))
+                self.assertEqual((header.format, header.width, header.height), (fmt, 123, 45))
+                self.assertLess(bytes_read, 4096)
+
+    def test_counts_animation_frames(self):
+        for fmt in ('GIF', 'PNG', 'WEBP'):
+            with self.subTest(fmt=fmt):
+                header, _ = read_header(make_animation(frames=4, fmt=fmt))
+                self.assertEqual(header.frames, 4)
+
+    def test_pixel_bomb_is_rejected_without_decoding(self):
+        bomb = make_png_header_only(100000, 100000)
+
+        with mock.patch('PIL.Image.open', side_effect=AssertionError('디코드')):
+            response = self.client.post('/api/images/', {'image': bomb})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('해상도가 너무 큽니다', response.json()['image'][0])
+        self.assertFalse(UploadedImage.objects.exists())
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, 'uploads')))
+        stats = rejection_stats.get_stats()
+        self.assertEqual(stats['rejected']['pixels'], 1)
+        self.assertEqual(stats['rejected_pixels'], 100000 * 100000)
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=64 * 48)
+    def test_pixel_limit_is_inclusive(self):
+        self.assertIsNone(check_header(make_image(size=(64, 48)))[1])
+        header, rejection = check_header(make_image(size=(65, 48)))
+        self.assertEqual(rejection[0], 'pixels')
+        self.assertEqual((header.width, header.height), (65, 48))
+
+    @override_settings(IMAGE_UPLOAD_MAX_FRAMES=2)
+    def test_too_many_frames_is_rejected(self):
+        response = self.client.post('/api/images/', {'image': make_animation(frames=3)})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('프레임이 너무 많습니다', response.json()['image'][0])
+        self.assertEqual(rejection_stats.get_stats()['rejected']['frames'], 1)
+
+    @override_settings(IMAGE_UPLOAD_MAX_TOTAL_PIXELS=32 * 32 * 3 - 1)
+    def test_total_pixels_of_decoded_frames_are_limited(self):
+        header, rejection = check_header(make_animation(frames=3, size=(32, 32)))
+        self.assertEqual(header.frames, 3)
+        self.assertEqual(rejection[0], 'pixels')
+        self.assertIsNone(check_header(make_animation(frames=2, size=(32, 32)))[1])
+        self.assertIsNone(check_header(make_image(size=(32, 32)))[1])
+
+        # 프레임 예산보다 뒤쪽 프레임은 디코드하지 않으므로 계산에서 제외
+        with override_settings(IMAGE_ANIMATION_FRAME_BUDGET=2):
+            self.assertIsNone(check_header(make_animation(frames=3, size=(32, 32)))[1])
+
+        response = self.client.post('/api/images/', {'image': make_animation(frames=3, size=(32, 32))})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('전체 해상도가 너무 큽니다', response.json()['image'][0])
+
+    @override_settings(IMAGE_UPLOAD_ALLOWED_FORMATS=['JPEG', 'PNG'])
+    def test_disallowed_format_is_rejected(self):
+        _, rejection = check_header(make_image(fmt='GIF'))
+        self.assertEqual(rejection[0], 'format')
+
+    def test_unknown_and_truncated_files_are_rejected(self):
+        text = io.BytesIO(b'not an image at all')
+        text.name = 'notes.png'
+        self.assertEqual(check_header(text)[1][0], 'format')
+
+        truncated = io.BytesIO(make_image().getvalue()[:20])
+        truncated.name = 'truncated.png'
+        self.assertEqual(check_header(truncated)[1][0], 'header')
+
+    def test_accepted_upload_reuses_header(self):
+        data = self.upload(make_image(size=(80, 60)))
+
+        self.assertEqual((data['image_width'], data['image_height']), (80, 60))
+        self.assertEqual(rejection_stats.get_stats()['accepted'], 1)
+
+    def test_pillow_limit_matches_upload_limit(self):
+        self.assertEqual(Image.MAX_IMAGE_PIXELS, get_max_pixels())
+
+
+@override_settings(IMAGE_LIST_PAGE_SIZE=3, IMAGE_LIST_MAX_PAGE_SIZE=4)
+class KeysetPaginationTests(TestCase):
+    """(정렬 컬럼, id) 커서로 목록을 끝까지 빠짐없이, 중복 없이 읽음"""
+
+    def setUp(self):
+        now = timezone.now()
+        # 같은 업로드 시각이 있어 id 로 순서를 정해야 하는 행 포함
+        uploaded = [now, now, now - timedelta(minutes=1), now - timedelta(minutes=2), now - timedelta(minutes=2),
+                    now - timedelta(minutes=3), now - timedelta(minutes=4)]
+        brightness = [40.0, None, 40.0, 10.0, 75.5, None, 40.0]
+        self.images = [
+            UploadedImage.objects.create(
+                image=f'uploads/{index}.png', file_name=f'{index}.png', uploaded_at=uploaded_at,
+                brightness_average=average,
+            )
+            for index, (uploaded_at, average) in enumerate(zip(uploaded, brightness))
+        ]
+
+    def walk(self, url):
+        """next 링크를 따라가며 모든 페이지의 id 를 모음"""
+        ids = []
+        pages = 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            data = response.json()
+            ids.extend(row['id'] for row in data['results'])
+            url = data['next']
+            pages += 1
+        return ids, pages
+
+    def test_default_order_is_newest_first_with_id_tiebreak(self):
+        ids, pages = self.walk('/api/images/')
+
+        expected = sorted(self.images, key=lambda image: (image.uploaded_at, image.pk), reverse=True)
+        self.assertEqual(ids, [image.pk for image in expected])
+        self.assertEqual(pages, 3)
+
+    def test_ordering_by_summary_column_skips_unanalyzed_rows(self):
+        ids, _ = self.walk('/api/images/?ordering=brightness_average')
+
+        analyzed = [image for image in self.images if image.brightness_average is not None]
+        expected = sorted(analyzed, key=lambda image: (image.brightness_average, image.pk))
+        self.assertEqual(ids, [image.pk for image in expected])
+
+        ids, _ = self.walk('/api/images/?ordering=-brightness_average')
+        self.assertEqual(ids, [image.pk for image in reversed(expected)])
+
+    def test_rows_added_while_paging_do_not_shift_pages(self):
+        first = self.client.get('/api/images/').json()
+        UploadedImage.objects.create(image='uploads/new.png', file_name='new.png')
+
+        rest, _ = self.walk(first['next'])
+
+        ids = [row['id'] for row in first['results']] + rest
+        self.assertEqual(sorted(ids), sorted(image.pk for image in self.images))
+
+    def test_invalid_or_mismatched_cursor_is_not_found(self):
+        self.assertEqual(self.client.get('/api/images/?cursor=not-base64!').status_code, 404)
+
+        brightness_cursor = parse_qs(urlparse(
+            self.client.get('/api/images/?ordering=brightness_average').json()['next']
+        ).query)['cursor'][0]
+        response = self.client.get(f'/api/images/?cursor={brightness_cursor}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_ordering_is_rejected(self):
+        response = self.client.get('/api/images/?ordering=file_name')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering', response.json())
+
+    def test_page_size_is_capped(self):
+        response = self.client.get('/api/images/?page_size=100')
+        self.assertEqual(len(response.json()['results']), 4)
+
+    def test_list_does_not_read_analysis_result(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/images/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('analysis_result', response.json()['results'][0])
+        self.assertFalse(any('"analysis_result"' in query['sql'] for query in queries.captured_queries))
+
+    def test_sparse_fields_select_only_requested_columns(self):
+        response = self.client.get('/api/images/?fields=id,file_name')
+
+        self.assertEqual(set(response.json()['results'][0]), {'id', 'file_name'})
+
+
+class SimilarImageTests(MediaTestCase):
+    """지각 해시 조각 인덱스로 해밍 거리 이내의 이미지를 빠짐없이 찾음"""
+
+    def create_with_hash(self, value):
+        perceptual_hash = f'{value:016x}'
+        return UploadedImage.objects.create(
+            image=f'uploads/{perceptual_hash}.png', file_name=f'{perceptual_hash}.png',
+            **get_similarity_fields({'perceptual_hash': perceptual_hash}),
+        )
+
+    def test_index_lookup_matches_brute_force(self):
+        generator = random.Random(16)
+        base = generator.getrandbits(64)
+        values = {base}
+        # 기준에서 비트 0~14개를 뒤집은 해시와 무관한 해시
+        for flips in range(15):
+            for _ in range(4):
+                value = base
+                for position in generator.sample(range(64), flips):
+                    value ^= 1 << position
+                values.add(value)
+        values.update(generator.getrandbits(64) for _ in range(40))
+        images = {self.create_with_hash(value).pk: value for value in values}
+
+        for max_distance in range(11):
+            with self.subTest(max_distance=max_distance):
+                matches = find_similar(UploadedImage.objects.all(), f'{base:016x}', max_distance, limit=1000)
+                expected = sorted(
+                    ((pk, hamming_distance(base, value)) for pk, value in images.items()
+                     if hamming_distance(base, value) <= max_distance),
+                    key=lambda match: (match[1], -match[0]),
+                )
+                self.assertEqual(matches, expected)
+
+    def test_endpoint_orders_by_distance_and_excludes_self(self):
+        source = self.create_with_hash(0x0123456789ABCDEF)
+        near = self.create_with_hash(0x0123456789ABCDEF ^ 0b1)
+        nearer_duplicate = self.create_with_hash(0x0123456789ABCDEF)
+        far = self.create_with_hash(0x0123456789ABCDEF ^ 0xFFFF)
+
+        response = self.client.get(f'/api/images/{source.pk}/similar/?max_distance=8')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([(row['id'], row['distance']) for row in results], [(nearer_duplicate.pk, 0), (near.pk, 1)])
+        self.assertNotIn(far.pk, [row['id'] for row in results])
+
+    @override_settings(IMAGE_SIMILARITY_MAX_DISTANCE=4)
+    def test_endpoint_clamps_distance_and_validates_parameters(self):
+        source = self.create_with_hash(0xFFFF0000FFFF0000)
+
+        response = self.client.get(f'/api/images/{source.pk}/similar/?max_distance=64')
+        self.assertEqual(response.json()['max_distance'], 4)
+        self.assertEqual(self.client.get(f'/api/images/{source.pk}/similar/?limit=x').status_code, 400)
+
+        unanalyzed = UploadedImage.objects.create(image='uploads/pending.png', file_name='pending.png')
+        self.assertEqual(self.client.get(f'/api/images/{unanalyzed.pk}/similar/').status_code, 400)
+
+    def test_reencoded_and_resized_upload_is_found(self):
+        original = self.upload(make_gradient(name='original.png'))
+        copy = self.upload(make_gradient(size=(128, 96), fmt='JPEG', quality=70, name='copy.jpg'))
+        unrelated = self.upload(make_image(color=(10, 200, 10), size=(128, 96)))
+
+        response = self.client.get(f"/api/images/{original['id']}/similar/")
+
+        ids = [row['id'] for row in response.json()['results']]
+        self.assertIn(copy['id'], ids)
+        self.assertNotIn(unrelated['id'], ids)
+
+
+class ColorSearchTests(MediaTestCase):
+    """업로드할 때 쓴 색상 구간 행으로 색상 검색"""
+
+    BLUE = (30, 64, 175)
+    RED = (200, 30, 30)
+
+    def search(self, **params):
+        response = self.client.get('/api/images/by_color/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(row['id'], row['color_share']) for row in response.json()['results']]
+
+    def test_upload_writes_color_rows(self):
+        created = self.upload(make_image(color=self.BLUE))
+
+        rows = list(ImageColor.objects.filter(image_id=created['id']).values_list('bin', 'share'))
+        self.assertEqual(rows, [(rgb_bin(self.BLUE), 1.0)])
+
+    def test_results_ordered_by_share_of_nearby_color(self):
+        blue = self.upload(make_image(color=self.BLUE, name='blue.png'))
+        half = self.upload(make_split_image(self.BLUE, self.RED))
+        red = self.upload(make_image(color=self.RED, name='red.png'))
+
+        matches = self.search(color='1e40af')
+        self.assertEqual([pk for pk, _ in matches], [blue['id'], half['id']])
+        self.assertAlmostEqual(matches[0][1], 1.0)
+        # 작업용 사본으로 줄일 때 경계 픽셀이 섞이므로 대략 절반
+        self.assertAlmostEqual(matches[1][1], 0.5, delta=0.05)
+
+        self.assertEqual([pk for pk, _ in self.search(color='#1E40AF', min_share=0.6)], [blue['id']])
+        self.assertEqual([pk for pk, _ in self.search(color='c81e1e', limit=1)], [red['id']])
+
+    def test_deleted_image_rows_are_removed(self):
+        created = self.upload(make_image(color=self.BLUE))
+
+        self.client.delete(f"/api/images/{created['id']}/")
+
+        self.assertFalse(ImageColor.objects.filter(image_id=created['id']).exists())
+        self.assertEqual(self.search(color='1e40af'), [])
+
+    def test_invalid_parameters(self):
+        for params in ({'color': 'blue'}, {'color': '1e40af', 'tolerance': 'x'}, {'color': '1e40af', 'limit': '1.5'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/images/by_color/', params).status_code, 400)
+
+    @override_settings(IMAGE_COLOR_SEARCH_MAX_TOLERANCE=5)
+    def test_tolerance_is_clamped(self):
+        response = self.client.get('/api/images/by_color/', {'color': '1e40af', 'tolerance': 100})
+
+        self.assertEqual(response.json()['tolerance'], 5)
+
+    def test_bins_within_contains_own_bin(self):
+        for rgb in (self.BLUE, self.RED, (0, 0, 0), (255, 255, 255), (128, 128, 128)):
+            with self.subTest(rgb=rgb):
+                self.assertIn(rgb_bin(rgb), bins_within(rgb, 0))
+                self.assertLessEqual(set(bins_within(rgb, 10)), set(bins_within(rgb, 30)))
+
+    def test_legacy_result_rows_from_dominant_colors(self):
+        # color_bins 가 없는 이전 분석 결과는 주요 색상 픽셀 수로 대신 계산
+        analysis_result = {'colors': {'dominant_colors': [
+            {'rgb': list(self.BLUE), 'count': 48 * 64 * 3 // 4},
+            {'rgb': list(self.RED), 'count': 48 * 64 // 4},
+        ]}}
+        rows = get_color_rows(analysis_result)
+
+        self.assertEqual([color_bin for color_bin, _ in rows], [rgb_bin(self.BLUE), rgb_bin(self.RED)])
+        self.assertEqual(get_color_rows({'error': 'x'}), [])
+
+
+class AnalysisVersioningTests(MediaTestCase):
+    """구역별 분석 버전으로 바뀐 분석기만 다시 실행"""
+
+    SENTINEL = {'sentinel': True}
+
+    def current_result(self, image_file=None):
+        return analyze_with_metadata(image_file or make_image())
+
+    def outdated(self, analysis_result, *keys, **versions):
+        """keys 구역의 기록 버전을 0 으로 (결과는 표시값으로) 바꾼 사본"""
+        previous = dict(analysis_result)
+        previous['analyzer_versions'] = {**analysis_result['analyzer_versions'], **versions}
+        for key in keys:
+            previous['analyzer_versions'][key] = 0
+            previous[key] = self.SENTINEL
+        return previous
+
+    # 전체 분석 버전별 구역 버전 (ANALYZER_VERSIONS 를 바꾸면 ANALYSIS_VERSION 을 올리고 여기에 추가)
+    KNOWN_ANALYSIS_VERSIONS = {
+        12: {
+            'base': 1, 'colors': 3, 'brightness': 2, 'perceptual_hash': 1, 'color_bins': 2, 'animation': 1,
+            'metadata': 2,
+        },
+    }
+
+    def test_analysis_version_is_bumped_with_section_versions(self):
+        self.assertEqual(
+            self.KNOWN_ANALYSIS_VERSIONS.get(ANALYSIS_VERSION), ANALYZER_VERSIONS,
+            'ANALYZER_VERSIONS 가 바뀌면 ANALYSIS_VERSION 을 올리고 KNOWN_ANALYSIS_VERSIONS 에 추가하세요.',
+        )
+        self.assertEqual(ANALYSIS_VERSION, max(self.KNOWN_ANALYSIS_VERSIONS))
+        # 이전 버전의 구역 버전 조합을 다시 쓰지 않음
+        self.assertEqual(
+            len({tuple(sorted(versions.items())) for versions in self.KNOWN_ANALYSIS_VERSIONS.values()}),
+            len(self.KNOWN_ANALYSIS_VERSIONS),
+        )
+
+    def test_incomplete_result_is_outdated(self):
+        def failing(ctx):
+            return {'error': '실패'}
+
+        analyzers = [(key, failing if key == 'colors' else analyzer, version)
+                     for key, analyzer, version in utils.ANALYZERS]
+        with mock.patch.object(utils, 'ANALYZERS', analyzers):
+            analysis_result = self.current_result()
+
+        self.assertEqual(analysis_result['analysis_version'], INCOMPLETE_ANALYSIS_VERSION)
+        self.assertLess(INCOMPLETE_ANALYSIS_VERSION, ANALYSIS_VERSION)
+        self.assertEqual(stale_sections(analysis_result), {'colors'})
+
+        # 실패한 구역만 다시 실행하면 현재 버전이 됨
+        refreshed = refresh_analysis(make_image(), analysis_result)
+        self.assertEqual(refreshed['analysis_version'], ANALYSIS_VERSION)
+
+    def test_stale_sections(self):
+        analysis_result = self.current_result()
+
+        self.assertEqual(analysis_result['analyzer_versions'], ANALYZER_VERSIONS)
+        self.assertEqual(analysis_result['analysis_version'], ANALYSIS_VERSION)
+        self.assertEqual(stale_sections(analysis_result), set())
+        self.assertEqual(stale_sections(self.outdated(analysis_result, 'colors')), {'colors'})
+        self.assertEqual(stale_sections(self.outdated(analysis_result, removed=1)), {'removed'})
+        for previous in (None, {}, {'error': 'x'}, {'colors': {}}):
+            with self.subTest(previous=previous):
+                self.assertIsNone(stale_sections(previous))
+
+    def test_current_result_is_returned_without_reading_file(self):
+        analysis_result = self.current_result()
+
+        # 파일을 열지 않으므로 이미지 대신 None 을 넘겨도 됨
+        self.assertIs(refresh_analysis(None, analysis_result), analysis_result)
+
+    def test_only_stale_sections_are_recomputed(self):
+        image_file = make_image()
+        analysis_result = self.current_result(image_file)
+        previous = self.outdated(analysis_result, 'colors', removed=1)
+        previous['brightness'] = self.SENTINEL
+        previous['removed'] = self.SENTINEL
+
+        image_file.seek(0)
+        refreshed = refresh_analysis(image_file, previous)
+
+        self.assertEqual(refreshed['colors'], analysis_result['colors'])
+        self.assertEqual(refreshed['brightness'], self.SENTINEL)
+        self.assertNotIn('removed', refreshed)
+        self.assertEqual(refreshed['analyzer_versions'], ANALYZER_VERSIONS)
+        self.assertEqual(refreshed['analysis_version'], ANALYSIS_VERSION)
+        # 이전 결과는 고치지 않음
+        self.assertEqual(previous['colors'], self.SENTINEL)
+
+    def test_base_change_or_full_reanalyzes_everything(self):
+        image_file = make_image()
+        analysis_result = self.current_result(image_file)
+
+        for previous, full in ((self.outdated(analysis_result, 'base'), False),
+                               (self.outdated(analysis_result, 'colors'), True)):
+            with self.subTest(full=full):
+                previous['brightness'] = self.SENTINEL
+                image_file.seek(0)
+                refreshed = refresh_analysis(image_file, previous, full=full)
+
+                self.assertEqual(refreshed['brightness'], analysis_result['brightness'])
+                self.assertEqual(refreshed['colors'], analysis_result['colors'])
+
+    def store_outdated(self, created, *keys):
+        instance = UploadedImage.objects.get(pk=created['id'])
+        previous = self.outdated(instance.analysis_result, *keys)
+        previous['brightness'] = self.SENTINEL
+        UploadedImage.objects.filter(pk=instance.pk).update(
+            analysis_result=previous, analysis_version=ANALYSIS_VERSION - 1
+        )
+        return instance
+
+    def test_analyze_action_refreshes_stale_sections(self):
+        created = self.upload(make_image())
+        instance = self.store_outdated(created, 'colors')
+
+        response = self.client.post(f"/api/images/{created['id']}/analyze/")
+
+        self.assertEqual(response.status_code, 200)
+        instance.refresh_from_db()
+        self.assertEqual(instance.analysis_result['colors'], created['analysis_result']['colors'])
+        self.assertEqual(instance.analysis_result['brightness'], self.SENTINEL)
+        self.assertEqual(instance.analysis_version, ANALYSIS_VERSION)
+
+        self.client.post(f"/api/images/{created['id']}/analyze/?full=true")
+
+        instance.refresh_from_db()
+        self.assertEqual(instance.analysis_result['brightness'], created['analysis_result']['brightness'])
+
+    def test_reanalyze_outdated_command(self):
+        outdated = self.store_outdated(self.upload(make_image(color=(10, 20, 30))), 'colors')
+        current = self.upload(make_image(color=(200, 210, 220)))
+        checkpoint = os.path.join(self.media_root, 'checkpoint.json')
+
+        call_command('reanalyze', outdated=True, workers=0, checkpoint=checkpoint, stdout=io.StringIO())
+
+        outdated.refresh_from_db()
+        self.assertEqual(outdated.analysis_version, ANALYSIS_VERSION)
+        self.assertNotEqual(outdated.analysis_result['colors'], self.SENTINEL)
+        self.assertEqual(outdated.analysis_result['brightness'], self.SENTINEL)
+        self.assertEqual(
+            UploadedImage.objects.get(pk=current['id']).analysis_result, current['analysis_result']
+        )
+        self.assertFalse(os.path.exists(checkpoint))
+
+
+class StubSpotifyServer:
+    """
+    응답 상태를 순서대로 지정할 수 있는 로컬 Spotify API 서버
+
+    fail('token' | 'recommendations' | 'search', 상태 코드, ...) 로 지정한 상태를 먼저 응답하고
+    그다음부터 정상 응답합니다. 토큰은 발급할 때마다 token-1, token-2, ... 로 바뀝니다.
+    """
+
+    def __init__(self):
+        self.tracks = [fake_spotify_track(index) for index in range(5)]
+        self._lock = threading.Lock()
+        self.reset()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_port}'
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self):
+        self.counts = {'token': 0, 'recommendations': 0, 'search': 0}
+        self.authorizations = []
+        self.failures = {'token': [], 'recommendations': [], 'search': []}
+        self.retry_after = '0'
+
+    def fail(self, endpoint, *status_codes):
+        self.failures[endpoint].extend(status_codes)
+
+    def _next(self, endpoint):
+        with self._lock:
+            self.counts[endpoint] += 1
+            failures = self.failures[endpoint]
+            return (failures.pop(0) if failures else 200), self.counts[endpoint]
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status_code, body):
+                payload = json.dumps(body).encode('utf-8')
+                self.send_response(status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                if status_code == 429:
+                    self.send_header('Retry-After', stub.retry_after)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                status_code, count = stub._next('token')
+                if status_code != 200:
+                    self._send(status_code, {'error': 'invalid_client'})
+                    return
+                self._send(200, {'access_token': f'token-{count}', 'token_type': 'Bearer', 'expires_in': 3600})
+
+            def do_GET(self):
+                endpoint = 'recommendations' if self.path.startswith('/v1/recommendations') else 'search'
+                stub.authorizations.append(self.headers.get('Authorization'))
+                status_code, _ = stub._next(endpoint)
+                if status_code != 200:
+                    self._send(status_code, {'error': {'status': status_code}})
+                elif endpoint == 'recommendations':
+                    self._send(200, {'tracks': stub.tracks})
+                else:
+                    self._send(200, {'tracks': {'items': stub.tracks}})
+
+        return Handler
+
+
+def fake_spotify_track(index):
+    return {
+        'id': f'track{index}',
+        'name': f'Track {index}',
+        'artists': [{'name': 'Artist'}],
+        'album': {'name': 'Album', 'images': [{'url': 'https://example.com/cover.jpg'}]},
+        'preview_url': f'https://example.com/preview{index}.mp3',
+        'external_urls': {'spotify': f'https://open.spotify.com/track/track{index}'},
+        'duration_ms': 180000,
+    }
+
+
+class StubSpotifyMixin:
+    """클래스마다 스텁 서버 하나를 띄우고 테스트마다 새 SpotifyService 와 빈 캐시로 시작"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = StubSpotifyServer()
+        cls.addClassCleanup(cls.server.stop)
+
+    def setUp(self):
+        self.server.reset()
+        override = override_settings(
+            SPOTIFY_CLIENT_ID='client', SPOTIFY_CLIENT_SECRET='secret',
+            SPOTIFY_TOKEN_URL=self.server.url + '/api/token', SPOTIFY_API_URL=self.server.url + '/v1',
+            SPOTIFY_BACKOFF_FACTOR=0, SPOTIFY_MAX_RETRIES=2,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.service = SpotifyService()
+
+
+class SpotifyTokenTests(StubSpotifyMixin, SimpleTestCase):
+    """토큰 캐시/갱신과 업스트림 오류 재시도 (로컬 스텁 서버)"""
+
+    def test_token_is_cached_and_shared(self):
+        for _ in range(3):
+            self.assertEqual(len(self.service.recommend_tracks('intense')), 5)
+
+        # 같은 캐시를 쓰는 다른 인스턴스(다른 프로세스)도 새로 발급받지 않음
+        self.assertEqual(SpotifyService().get_access_token(), 'token-1')
+        self.assertEqual(self.server.counts['token'], 1)
+        self.assertEqual(self.server.authorizations, ['Bearer token-1'] * 3)
+
+    def test_concurrent_requests_fetch_one_token(self):
+        threads = [threading.Thread(target=self.service.get_access_token) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.counts['token'], 1)
+
+    def test_token_refreshed_before_expiry(self):
+        self.service.get_access_token()
+        # 만료 여유 시간 안으로 들어온 토큰은 (공유 캐시에서도 만료되어) 새로 발급
+        self.service.token_expires_at = time.time() + TOKEN_EXPIRY_MARGIN - 1
+        cache.delete(TOKEN_CACHE_KEY)
+
+        self.assertEqual(self.service.get_access_token(), 'token-2')
+        self.assertEqual(self.server.counts['token'], 2)
+
+    def test_server_errors_are_retried(self):
+        self.server.fail('recommendations', 503, 429)
+
+        self.assertEqual(len(self.service.recommend_tracks('intense')), 5)
+        self.assertEqual(self.server.counts['recommendations'], 3)
+
+    @override_settings(SPOTIFY_MAX_RETRY_AFTER=0.05)
+    def test_retry_after_is_capped(self):
+        self.server.retry_after = '3600'
+        self.server.fail('recommendations', 429)
+
+        started = time.monotonic()
+        tracks = SpotifyService().recommend_tracks('intense')
+
+        self.assertEqual(len(tracks), 5)
+        self.assertEqual(self.server.counts['recommendations'], 2)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_retries_are_bounded(self):
+        self.server.fail('search', 500, 500, 500)
+
+        with self.assertRaisesMessage(Exception, '음악 검색 실패'):
+            self.service.search_tracks('intense')
+        self.assertEqual(self.server.counts['search'], 3)
+
+    def test_rejected_token_is_invalidated(self):
+        self.service.get_access_token()
+        self.server.fail('recommendations', 401)
+
+        self.assertEqual(self.service.recommend_tracks('intense'), [])
+        self.assertIsNone(cache.get(TOKEN_CACHE_KEY))
+
+        # 다음 요청은 새 토큰으로
+        self.assertEqual(len(self.service.recommend_tracks('intense')), 5)
+        self.assertEqual(self.server.authorizations[-1], 'Bearer token-2')
+
+    def test_token_endpoint_errors(self):
+        self.server.fail('token', 400)
+        with self.assertRaisesMessage(Exception, 'Spotify 인증 실패'):
+            self.service.get_access_token()
+
+        with override_settings(SPOTIFY_CLIENT_ID=''):
+            with self.assertRaisesMessage(Exception, 'Spotify API 설정이 없습니다.'):
+                SpotifyService().get_access_token()
+
+    def test_async_client_retries_and_refreshes_rejected_token(self):
+        self.service.get_access_token()
+        self.server.fail('recommendations', 503, 401)
+
+        async def recommend():
+            async with httpx.AsyncClient() as client:
+                return await async_spotify.arecommend_tracks(client, 'intense')
+
+        with mock.patch.object(async_spotify, 'spotify_service', self.service):
+            tracks = asyncio.run(recommend())
+
+        self.assertEqual(len(tracks), 5)
+        self.assertEqual(self.server.counts['recommendations'], 3)
+        self.assertEqual(self.server.authorizations[-1], 'Bearer token-2')
+
+
+@override_settings(
+    IMAGE_THUMBNAIL_SIZES={'thumb': 32, 'card': 96}, IMAGE_THUMBNAIL_FORMATS=['webp', 'jpeg'],
+)
+class DerivativeTests(MediaTestCase):
+    """원본 내용 해시별 경로에 만드는 썸네일(파생 이미지)"""
+
+    def thumbnail_url(self, pk, size='thumb', fmt='webp'):
+        return f'/api/images/{pk}/thumbnail/{size}/{fmt}/'
+
+    def stored(self, *parts):
+        return os.path.join(self.media_root, *parts)
+
+    def read_thumbnail(self, response):
+        img = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        img.load()
+        return img
+
+    def test_eager_generation_uses_content_hash_paths(self):
+        with override_settings(IMAGE_THUMBNAIL_EAGER=True):
+            created = self.upload(make_image(size=(300, 200)))
+
+        content_hash = UploadedImage.objects.get(pk=created['id']).content_hash
+        self.assertEqual(
+            sorted(os.listdir(self.stored('derivatives', content_hash))),
+            ['card.jpeg', 'card.webp', 'thumb.jpeg', 'thumb.webp'],
+        )
+        self.assertEqual(set(created['thumbnails']), {'thumb', 'card'})
+        self.assertTrue(created['thumbnails']['thumb']['webp'].endswith(self.thumbnail_url(created['id'])))
+
+    def test_lazy_generation_and_conditional_requests(self):
+        created = self.upload(make_image(size=(300, 200)))
+        content_hash = UploadedImage.objects.get(pk=created['id']).content_hash
+        self.assertFalse(os.path.exists(self.stored('derivatives')))
+
+        response = self.client.get(self.thumbnail_url(created['id']))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertEqual(self.read_thumbnail(response).size, (32, 21))
+        self.assertEqual(os.listdir(self.stored('derivatives', content_hash)), ['thumb.webp'])
+
+        cached = self.client.get(self.thumbnail_url(created['id']), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_unknown_size_or_format_is_not_found(self):
+        created = self.upload(make_image())
+
+        for size, fmt in (('huge', 'webp'), ('thumb', 'png'), ('thumb', 'avif')):
+            with self.subTest(size=size, fmt=fmt):
+                self.assertEqual(self.client.get(self.thumbnail_url(created['id'], size, fmt)).status_code, 404)
+        self.assertEqual(self.client.get(self.thumbnail_url(created['id'] + 1)).status_code, 404)
+
+    def test_upload_named_like_derivative_does_not_replace_thumbnail(self):
+        with override_settings(IMAGE_THUMBNAIL_EAGER=True):
+            original = self.upload(make_image(color=(200, 30, 30), name='photo.png'))
+            self.upload(make_image(color=(30, 30, 200), fmt='WEBP', name='photo.thumb.webp'))
+
+        response = self.client.get(self.thumbnail_url(original['id']))
+
+        red, _, blue = self.read_thumbnail(response).convert('RGB').getpixel((8, 8))
+        self.assertGreater(red, blue)
+
+    def test_derivative_name_falls_back_to_path_hash(self):
+        content_hash = 'a' * 64
+
+        self.assertEqual(
+            derivative_name('uploads/x.png', content_hash, 'thumb', 'webp'), f'derivatives/{content_hash}/thumb.webp'
+        )
+        fallback = derivative_name('uploads/x.png', '', 'thumb', 'webp')
+        self.assertEqual(fallback, f"derivatives/{hashlib.sha256(b'uploads/x.png').hexdigest()}/thumb.webp")
+        self.assertEqual(derivative_name('uploads/x.png', '../../etc', 'thumb', 'webp'), fallback)
+
+    @override_settings(IMAGE_THUMBNAIL_FORMATS=['avif', 'webp', 'gif'])
+    def test_unavailable_formats_are_dropped_with_one_warning(self):
+        Image.init()
+        # 설치된 Pillow 에 AVIF 인코더가 있어도 없는 환경처럼
+        with mock.patch.dict(Image.SAVE), mock.patch.object(thumbnails, '_unavailable_warned', set()):
+            Image.SAVE.pop('AVIF', None)
+
+            with self.assertLogs('image_analysis.thumbnails', 'WARNING') as logs:
+                self.assertEqual(get_formats(), ['webp'])
+            self.assertEqual(len(logs.records), 2)
+
+            with self.assertNoLogs('image_analysis.thumbnails', 'WARNING'):
+                self.assertEqual(get_formats(), ['webp'])
+
+
+@override_settings(IMAGE_STREAMING_STRIP_BYTES=4096, IMAGE_STREAMING_MIN_PIXELS=0)
+class StreamingDecodeTests(SimpleTestCase):
+    """스트립 단위 축소 디코드가 전체 디코드 후 reduce() 와 같은 픽셀을 만드는지"""
+
+    # 홀수 크기: 마지막 스트립과 reduce 의 가장자리 블록이 잘리는 경우 포함
+    SIZE = (203, 157)
+
+    def source_image(self):
+        """그레이디언트(Up/Paeth 필터)와 노이즈(Sub/None 필터)가 섞인 RGBA 이미지"""
+        generator = random.Random(23)
+        width, height = self.SIZE
+        gradient = Image.linear_gradient('L').resize(self.SIZE)
+        noise = Image.frombytes('L', self.SIZE, generator.randbytes(width * height))
+        alpha = Image.radial_gradient('L').resize(self.SIZE)
+        return Image.merge('RGBA', (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), alpha))
+
+    def encode(self, img, fmt, **options):
+        buffer = io.BytesIO()
+        img.save(buffer, fmt, **options)
+        buffer.seek(0)
+        return buffer
+
+    def expected(self, buffer, factor):
+        img = Image.open(buffer)
+        img.load()
+        if img.mode not in REDUCIBLE_MODES:
+            img = img.convert('RGBA' if 'transparency' in img.info else 'RGB')
+        return img.reduce(factor)
+
+    def assert_stream_matches(self, buffer, factor):
+        img = Image.open(buffer)
+        self.assertTrue(can_stream(img))
+        self.assertTrue(should_stream(img))
+        reduced = stream_reduce(img, factor)
+
+        buffer.seek(0)
+        expected = self.expected(buffer, factor)
+        self.assertEqual(reduced.mode, expected.mode)
+        self.assertEqual(reduced.size, expected.size)
+        self.assertEqual(reduced.tobytes(), expected.tobytes())
+
+    def cases(self):
+        source = self.source_image()
+        palette = source.convert('RGB').quantize(64)
+        transparent_palette = palette.copy()
+        transparent_palette.info['transparency'] = 3
+        yield 'png-rgb', self.encode(source.convert('RGB'), 'PNG')
+        yield 'png-rgba', self.encode(source, 'PNG')
+        yield 'png-l', self.encode(source.convert('L'), 'PNG')
+        yield 'png-la', self.encode(source.convert('LA'), 'PNG')
+        yield 'png-p', self.encode(palette, 'PNG')
+        yield 'png-p-trns', self.encode(transparent_palette, 'PNG')
+        yield 'png-1', self.encode(source.convert('1'), 'PNG')
+        yield 'png-rgb-trns', self.encode(source.convert('RGB'), 'PNG', transparency=(0, 0, 0))
+        yield 'bmp-rgb', self.encode(source.convert('RGB'), 'BMP')
+        yield 'bmp-p', self.encode(palette, 'BMP')
+        yield 'bmp-1', self.encode(source.convert('1'), 'BMP')
+
+    def test_matches_full_decode_and_reduce(self):
+        for name, buffer in self.cases():
+            for factor in (2, 3, 4):
+                with self.subTest(case=name, factor=factor):
+                    buffer.seek(0)
+                    self.assert_stream_matches(buffer, factor)
+
+    def test_unsupported_images_are_not_streamed(self):
+        source = self.source_image().convert('RGB')
+        # Pillow 는 인터레이스 PNG 를 쓰지 않으므로 IHDR 의 인터레이스 바이트만 바꾸고 CRC 를 다시 계산
+        data = bytearray(self.encode(source, 'PNG').getvalue())
+        data[28] = 1
+        data[29:33] = struct.pack('>I', zlib.crc32(bytes(data[12:29])))
+        cases = {
+            'interlaced': io.BytesIO(bytes(data)),
+            '16-bit': self.encode(source.convert('I;16'), 'PNG'),
+            'jpeg': self.encode(source, 'JPEG'),
+            'gif': self.encode(source.convert('P'), 'GIF'),
+        }
+        for name, buffer in cases.items():
+            with self.subTest(case=name):
+                self.assertFalse(can_stream(Image.open(buffer)))
+
+    def test_truncated_png_raises(self):
+        data = self.encode(self.source_image().convert('RGB'), 'PNG').getvalue()
+        img = Image.open(io.BytesIO(data[:len(data) // 2]))
+
+        with self.assertRaises(OSError):
+            stream_reduce(img, 2)
+
+
+@override_settings(IMAGE_ANALYSIS_WORKERS=1, IMAGE_ANALYSIS_RETRY_DELAY=0.01)
+class AsyncAnalysisQueueTests(MediaMixin, TransactionTestCase):
+    """비동기 분석 모드: 202 로 응답하고 워커 스레드가 'pending' -> 'completed' 로 기록"""
+
+    def setUp(self):
+        super().setUp()
+        override = override_settings(IMAGE_ANALYSIS_ASYNC=True)
+        override.enable()
+        self.addCleanup(override.disable)
+        # 테스트마다 새 대기열과 워커 (싱글톤의 워커가 다른 테스트의 작업을 가져가지 않도록)
+        self.queue = AnalysisQueue()
+        patcher = mock.patch('image_analysis.views.analysis_queue', self.queue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def wait_for_queue(self):
+        """
+        대기열의 작업이 모두 끝날 때까지 대기
+
+        테스트 DB(공유 캐시 인메모리 SQLite)는 테이블 잠금을 기다리지 않으므로
+        워커가 기록하는 동안에는 DB 를 읽지 않음
+        """
+        self.queue._queue.join()
+
+    def status_of(self, pk):
+        return self.client.get(f'/api/images/{pk}/status/').json()
+
+    def test_upload_is_accepted_and_analyzed_in_background(self):
+        response = self.client.post('/api/images/', {'image': make_image()})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['analysis_status'], 'pending')
+        self.wait_for_queue()
+        status = self.status_of(response.json()['id'])
+        self.assertEqual(status['analysis_status'], 'completed')
+        self.assertTrue(status['analysis_completed'])
+
+        instance = UploadedImage.objects.get(pk=response.json()['id'])
+        self.assertIn('colors', instance.analysis_result)
+        self.assertTrue(ImageColor.objects.filter(image=instance).exists())
+
+    @override_settings(IMAGE_ANALYSIS_MAX_RETRIES=1)
+    def test_failed_analysis_is_retried_then_marked_failed(self):
+        with mock.patch('image_analysis.tasks.batch_analyzer.run', return_value={'error': 'boom'}) as run, \
+                self.assertLogs('image_analysis.tasks', 'WARNING') as logs:
+            response = self.client.post('/api/images/', {'image': make_image()})
+            # 재시도는 타이머로 다시 등록되므로 두 번째 실행이 시작된 뒤 대기열이 빌 때까지 대기
+            deadline = time.monotonic() + 10
+            while run.call_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.wait_for_queue()
+
+        self.assertEqual(run.call_count, 2)
+        self.assertEqual([record.levelname for record in logs.records], ['WARNING', 'ERROR'])
+        self.assertEqual(self.status_of(response.json()['id'])['analysis_status'], 'failed')
+        self.assertEqual(UploadedImage.objects.get(pk=response.json()['id']).analysis_result['error'], 'boom')
+
+    @override_settings(IMAGE_ANALYSIS_WORKERS=0, IMAGE_ANALYSIS_QUEUE_SIZE=1)
+    def test_full_queue_rejects_before_saving(self):
+        # 워커가 없으므로 첫 작업이 대기열에 남아 있음
+        self.assertEqual(self.client.post('/api/images/', {'image': make_image()}).status_code, 202)
+
+        response = self.client.post('/api/images/', {'image': make_image(color=(1, 2, 3))})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertEqual(UploadedImage.objects.count(), 1)
+        self.assertEqual(self.queue.depth(), 1)
+
+
+class ResumeAnalysisTests(MediaTestCase):
+    """resume_analysis: 재시작으로 대기열에서 사라진 'pending'/'processing' 작업만 다시 분석"""
+
+    def create(self, status, color):
+        created = self.upload(make_image(color=color))
+        UploadedImage.objects.filter(pk=created['id']).update(
+            analysis_status=status, analysis_completed=status == 'completed',
+        )
+        return created['id']
+
+    def status_of(self, pk):
+        return UploadedImage.objects.get(pk=pk).analysis_status
+
+    def test_unfinished_rows_are_analyzed(self):
+        pending = self.create('pending', (10, 10, 10))
+        processing = self.create('processing', (20, 20, 20))
+        failed = self.create('failed', (30, 30, 30))
+        completed = self.create('completed', (40, 40, 40))
+
+        call_command('resume_analysis', workers=0, stdout=io.StringIO())
+
+        self.assertEqual(self.status_of(pending), 'completed')
+        self.assertEqual(self.status_of(processing), 'completed')
+        self.assertEqual(self.status_of(failed), 'failed')
+        self.assertEqual(self.status_of(completed), 'completed')
+
+    def test_pending_only_leaves_running_jobs(self):
+        pending = self.create('pending', (10, 10, 10))
+        processing = self.create('processing', (20, 20, 20))
+
+        call_command('resume_analysis', workers=0, pending_only=True, stdout=io.StringIO())
+
+        self.assertEqual(self.status_of(pending), 'completed')
+        self.assertEqual(self.status_of(processing), 'processing')
+
+    def test_missing_source_is_marked_failed(self):
+        pending = self.create('pending', (10, 10, 10))
+        os.remove(UploadedImage.objects.get(pk=pending).image.path)
+
+        stderr = io.StringIO()
+        call_command('resume_analysis', workers=0, stdout=io.StringIO(), stderr=stderr)
+
+        self.assertEqual(self.status_of(pending), 'failed')
+        self.assertIn(str(pending), stderr.getvalue())
+
+
+class BatchUploadTests(MediaTestCase):
+    """POST /api/images/batch/ 의 NDJSON 스트림 (분석 줄, 저장 오류 줄, 요약)"""
+
+    def post_batch(self, *files):
+        response = self.client.post('/api/images/batch/', {'images': list(files)})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertTrue(lines[-1]['summary'])
+        return lines[:-1], lines[-1]
+
+    def by_index(self, lines):
+        grouped = {}
+        for line in lines:
+            grouped.setdefault(line['index'], []).append(line)
+        return grouped
+
+    def stored_files(self):
+        return [name for _, _, names in os.walk(os.path.join(self.media_root, 'uploads')) for name in names]
+
+    def test_one_line_per_item_and_shared_files(self):
+        red = make_image(color=(200, 30, 30), name='red.png').getvalue()
+        broken = io.BytesIO(b'not an image')
+        broken.name = 'broken.png'
+        files = [
+            make_image(color=(200, 30, 30), name='red.png'),
+            make_image(color=(30, 30, 200), name='blue.png'),
+            io.BytesIO(red),
+            broken,
+        ]
+        files[2].name = 'red-copy.png'
+
+        lines, summary = self.post_batch(*files)
+
+        grouped = self.by_index(lines)
+        self.assertEqual(sorted(grouped), [0, 1, 2, 3])
+        self.assertTrue(all(len(item_lines) == 1 for item_lines in grouped.values()))
+        self.assertEqual([grouped[index][0]['status'] for index in range(4)], ['analyzed'] * 3 + ['error'])
+        self.assertEqual(grouped[2][0]['analysis_result'], grouped[0][0]['analysis_result'])
+
+        created = {row['index']: row['id'] for row in summary['created']}
+        self.assertEqual(sorted(created), [0, 1, 2])
+        images = UploadedImage.objects.in_bulk(created.values())
+        self.assertEqual(len(images), 3)
+        self.assertEqual(images[created[2]].file_name, 'red-copy.png')
+        # 같은 내용의 파일은 한 번만 저장
+        self.assertEqual(images[created[0]].image.name, images[created[2]].image.name)
+        self.assertEqual(len(self.stored_files()), 2)
+        self.assertTrue(ImageColor.objects.filter(image_id=created[1]).exists())
+
+    def test_previously_analyzed_content_is_cached(self):
+        existing = self.upload(make_image(color=(10, 120, 10)))
+
+        lines, summary = self.post_batch(make_image(color=(10, 120, 10), name='again.png'))
+
+        self.assertTrue(lines[0]['cached'])
+        instance = UploadedImage.objects.get(pk=summary['created'][0]['id'])
+        self.assertEqual(instance.image.name, UploadedImage.objects.get(pk=existing['id']).image.name)
+
+    def test_save_failure_adds_error_line(self):
+        original_save = FileSystemStorage.save
+
+        def failing_save(storage, name, *args, **kwargs):
+            if 'bad' in name:
+                raise OSError('디스크가 가득 찼습니다.')
+            return original_save(storage, name, *args, **kwargs)
+
+        with mock.patch.object(FileSystemStorage, 'save', failing_save):
+            lines, summary = self.post_batch(
+                make_image(color=(200, 30, 30), name='good.png'), make_image(color=(30, 30, 200), name='bad.png'),
+            )
+
+        grouped = self.by_index(lines)
+        self.assertEqual([line['status'] for line in grouped[1]], ['analyzed', 'error'])
+        self.assertEqual(grouped[1][1]['error'], '디스크가 가득 찼습니다.')
+        self.assertEqual(len(grouped[0]), 1)
+        self.assertEqual([row['index'] for row in summary['created']], [0])
+        self.assertEqual(UploadedImage.objects.count(), 1)
+
+    def test_database_failure_removes_saved_files(self):
+        with mock.patch.object(ImageColor, 'replace_for', side_effect=RuntimeError('기록 실패')):
+            lines, summary = self.post_batch(make_image(name='a.png'), make_image(color=(1, 2, 3), name='b.png'))
+
+        grouped = self.by_index(lines)
+        self.assertEqual([[line['status'] for line in grouped[index]] for index in (0, 1)], [['analyzed', 'error']] * 2)
+        self.assertEqual(summary['created'], [])
+        self.assertEqual(summary['error'], '기록 실패')
+        self.assertFalse(UploadedImage.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+
+class ReanalyzeCommandTests(MediaTestCase):
+    """reanalyze: 낮은 버전의 결과만 청크 단위로 다시 기록하고 체크포인트부터 이어서 실행"""
+
+    def setUp(self):
+        super().setUp()
+        self.checkpoint = os.path.join(self.media_root, 'checkpoint.json')
+
+    def create(self, color, analysis_version=ANALYSIS_VERSION):
+        """analysis_version 이 현재보다 낮으면 colors 구역을 이전 버전 결과로 바꿔 저장"""
+        created = self.upload(make_image(color=color))
+        instance = UploadedImage.objects.get(pk=created['id'])
+        analysis_result = instance.analysis_result
+        if analysis_version is None:
+            analysis_result = {key: value for key, value in analysis_result.items()
+                               if key not in ('analyzer_versions', 'analysis_version')}
+        elif analysis_version < ANALYSIS_VERSION:
+            analysis_result['analyzer_versions']['colors'] -= ANALYSIS_VERSION - analysis_version
+            analysis_result['colors'] = {'outdated': True}
+        UploadedImage.objects.filter(pk=instance.pk).update(
+            analysis_result=analysis_result, analysis_version=analysis_version, brightness_average=None,
+        )
+        return instance.pk
+
+    def reanalyze(self, stop_after=None, **options):
+        """처리한 청크의 id 목록 (stop_after 개 청크를 기록한 뒤 중단)"""
+        chunks = []
+        process_chunk = ReanalyzeCommand.process_chunk
+
+        def spy(command, analyzer, chunk, *args, **kwargs):
+            if stop_after is not None and len(chunks) == stop_after:
+                raise KeyboardInterrupt
+            chunks.append([instance.pk for instance in chunk])
+            return process_chunk(command, analyzer, chunk, *args, **kwargs)
+
+        with mock.patch.object(ReanalyzeCommand, 'process_chunk', spy):
+            call_command(
+                'reanalyze', outdated=True, workers=0, checkpoint=self.checkpoint, stdout=io.StringIO(),
+                stderr=io.StringIO(), **options,
+            )
+        return chunks
+
+    def test_only_lower_versions_are_updated(self):
+        missing = self.create((10, 10, 10), analysis_version=None)
+        older = self.create((20, 20, 20), analysis_version=ANALYSIS_VERSION - 1)
+        current = self.create((30, 30, 30))
+        newer = self.create((40, 40, 40), analysis_version=ANALYSIS_VERSION + 1)
+
+        self.assertEqual(self.reanalyze(), [[missing, older]])
+
+        rows = UploadedImage.objects.in_bulk()
+        for pk in (missing, older):
+            self.assertEqual(rows[pk].analysis_version, ANALYSIS_VERSION)
+            self.assertEqual(rows[pk].analysis_result['analysis_version'], ANALYSIS_VERSION)
+            self.assertNotIn('outdated', rows[pk].analysis_result['colors'])
+            # bulk_update 로 요약 컬럼도 다시 기록
+            self.assertIsNotNone(rows[pk].brightness_average)
+        self.assertIsNone(rows[current].brightness_average)
+        self.assertEqual(rows[newer].analysis_version, ANALYSIS_VERSION + 1)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resume_continues_after_checkpoint(self):
+        pks = [self.create((index * 40, 0, 0), analysis_version=ANALYSIS_VERSION - 1) for index in range(4)]
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.reanalyze(stop_after=2, chunk_size=1)
+
+        with open(self.checkpoint) as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertEqual((checkpoint['last_id'], checkpoint['processed']), (pks[1], 2))
+        versions = UploadedImage.objects.in_bulk(pks)
+        self.assertEqual(
+            [versions[pk].analysis_version for pk in pks], [ANALYSIS_VERSION] * 2 + [ANALYSIS_VERSION - 1] * 2
+        )
+
+        self.assertEqual(self.reanalyze(chunk_size=1, resume=True), [[pks[2]], [pks[3]]])
+        self.assertEqual(
+            set(UploadedImage.objects.filter(pk__in=pks).values_list('analysis_version', flat=True)),
+            {ANALYSIS_VERSION},
+        )
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resume_requires_matching_checkpoint(self):
+        self.create((20, 20, 20), analysis_version=ANALYSIS_VERSION - 1)
+        self.create((30, 30, 30), analysis_version=ANALYSIS_VERSION - 1)
+        with self.assertRaises(KeyboardInterrupt):
+            self.reanalyze(stop_after=1, chunk_size=1)
+
+        with self.assertRaisesMessage(CommandError, '체크포인트의 조건'):
+            self.reanalyze(chunk_size=1, resume=True, full=True)
+
+
+class AsyncSpotifyTests(StubSpotifyMixin, TestCase):
+    """비동기 추천 뷰: 추천/검색 경쟁, 같은 카테고리 조회 공유, Retry-After 제한"""
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(async_spotify, 'spotify_service', self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fetch(self, *categories):
+        async def fetch_all():
+            return await asyncio.gather(*(async_spotify.afetch_tracks_shared(category) for category in categories))
+        return asyncio.run(fetch_all())
+
+    def recommend(self, **data):
+        return self.client.post('/api/spotify/recommend/', data, content_type='application/json')
+
+    @override_settings(SPOTIFY_TRACK_POOL_LOW_WATERMARK=0)
+    def test_recommend_view_uses_track_pool(self):
+        first = self.recommend(category='intense')
+
+        self.assertEqual(first.status_code, 200)
+        self.assertIn(first.json()['id'], [track['id'] for track in self.server.tracks])
+
+        # 두 번째 요청은 첫 조회로 채운 풀에서 (같은 곡을 다시 주지 않음)
+        second = self.recommend(category='intense')
+        self.assertNotEqual(second.json()['id'], first.json()['id'])
+        stats = self.service.track_pool.get_stats()
+        self.assertEqual((stats['misses'], stats['hits']), (2, 1))
+        self.assertEqual(stats['pools'], {'intense': 3})
+
+    def test_recommend_view_uses_image_mood(self):
+        image = UploadedImage.objects.create(image='uploads/x.png', file_name='x.png', mood='dark_cool')
+
+        track = fake_spotify_track(0)
+        with mock.patch('image_analysis.views.aget_recommendation', mock.AsyncMock(return_value=track)) as get:
+            response = self.recommend(image_id=image.pk, category='intense')
+
+        self.assertEqual(response.json()['id'], track['id'])
+        get.assert_awaited_once_with('dark_cool')
+
+        self.assertEqual(self.recommend(image_id='x').status_code, 400)
+        self.assertEqual(self.recommend(image_id=image.pk + 1).status_code, 404)
+
+    def test_race_falls_back_to_search(self):
+        self.server.fail('recommendations', 500, 500, 500)
+
+        [tracks] = self.fetch('intense')
+
+        self.assertEqual(len(tracks), 5)
+        self.assertEqual(self.server.counts['search'], 1)
+
+    def test_race_error_when_both_fail(self):
+        self.server.fail('recommendations', 500, 500, 500)
+        self.server.fail('search', 500, 500, 500)
+
+        response = self.recommend(category='intense')
+
+        self.assertEqual(response.status_code, 500)
+        self.assertIn('음악 검색 실패', response.json()['error'])
+
+    def test_concurrent_fetches_share_one_upstream_lookup(self):
+        results = self.fetch('intense', 'intense', 'intense', 'intense')
+
+        self.assertTrue(all(tracks is results[0] for tracks in results))
+        self.assertLessEqual(self.server.counts['recommendations'], 1)
+        self.assertLessEqual(self.server.counts['search'], 1)
+        self.assertEqual(async_spotify._inflight, {})
+
+    @override_settings(SPOTIFY_MAX_RETRY_AFTER=1)
+    def test_retry_after_is_capped(self):
+        self.server.retry_after = '3600'
+        self.server.fail('recommendations', 429)
+        self.server.fail('search', 429)
+
+        with mock.patch.object(async_spotify.asyncio, 'sleep', mock.AsyncMock()) as sleep:
+            [tracks] = self.fetch('intense')
+
+        self.assertEqual(len(tracks), 5)
+        self.assertTrue(sleep.await_args_list)
+        self.assertTrue(all(call.args == (1,) for call in sleep.await_args_list))
+
+
+class InstrumentationTests(MediaTestCase):
+    """Server-Timing 헤더, 뷰별 히스토그램, 운영 통계 엔드포인트 접근 제한"""
+
+    SERVER_TIMING_ENTRY = re.compile(r'^[A-Za-z0-9_.-]+;dur=\d+\.\d{2};desc="x\d+"$')
+
+    def setUp(self):
+        super().setUp()
+        # 히스토그램은 프로세스 단위로 누적되므로 테스트마다 빈 상태에서 시작
+        series = mock.patch.object(request_metrics, '_series', {})
+        series.start()
+        self.addCleanup(series.stop)
+
+    @override_settings(IMAGE_SERVER_TIMING=True)
+    def test_server_timing_header_and_request_metrics(self):
+        response = self.client.post('/api/images/', {'image': make_image()})
+
+        self.assertEqual(response.status_code, 201)
+        *entries, total = response['Server-Timing'].split(', ')
+        self.assertRegex(total, r'^total;dur=\d+\.\d{2}$')
+        for entry in entries:
+            self.assertRegex(entry, self.SERVER_TIMING_ENTRY)
+        names = [entry.split(';')[0] for entry in entries]
+        self.assertIn('db', names)
+        self.assertIn('decode', names)
+
+        counts, seconds, count = request_metrics._series[('image-list', 'POST', '201')]
+        self.assertEqual(count, 1)
+        self.assertEqual(sum(counts), 1)
+        self.assertAlmostEqual(seconds, float(total.split('=')[1]) / 1000, delta=0.001)
+
+    def test_server_timing_is_off_by_default(self):
+        with override_settings(IMAGE_SERVER_TIMING=False):
+            response = self.client.get('/api/images/')
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertIn(('image-list', 'GET', '200'), request_metrics._series)
+
+    @override_settings(IMAGE_METRICS_ENABLED=False)
+    def test_stats_endpoints_are_hidden_unless_enabled_or_staff(self):
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+        self.assertEqual(self.client.get('/api/spotify/stats/').status_code, 404)
+
+        self.client.force_login(User.objects.create_user('viewer'))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 404)
+
+        self.client.force_login(User.objects.create_user('operator', is_staff=True))
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+        self.assertEqual(self.client.get('/api/spotify/stats/').status_code, 200)
+
+    @override_settings(IMAGE_METRICS_ENABLED=True)
+    def test_metrics_renders_observed_requests(self):
+        self.client.get('/api/images/')
+
+        response = self.client.get('/api/metrics/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(
+            'image_analysis_request_duration_seconds_count{view="image-list",method="GET",status="200"} 1',
+            response.content.decode(),
+        )
+
+
+class ExifTests(MediaTestCase):
+    """허용 목록 태그만 analysis_result 에, 원본 전체는 ImageExif 와 /exif/ 로"""
+
+    FULL_EXIF = {
+        'Make': 'TestCam',
+        'Model': 'Model 1',
+        'Orientation': 6,
+        'Artist': 'someone',
+        'Exif': {'ExposureTime': 0.004, 'MakerNote': 'AQJiaW5hcnk=', 'FNumber': 2.8, 'ISOSpeedRatings': 200},
+        'GPSInfo': {'GPSLatitudeRef': 'S', 'GPSLatitude': [37.0, 30.0, 36.0]},
+    }
+
+    def test_only_allowlisted_tags_are_stored_with_their_types(self):
+        data = self.upload(make_exif_jpeg())
+
+        self.assertEqual(data['analysis_result']['metadata'], {
+            'Make': 'TestCam',
+            'Model': 'Model 1',
+            'Orientation': 6,
+            'ExposureTime': 0.004,
+            'FNumber': 2.8,
+            'ISOSpeedRatings': 200,
+        })
+
+    @override_settings(IMAGE_EXIF_TAGS=['Make', 'MakerNote', 'GPSLatitude'])
+    def test_gps_is_converted_and_binary_is_dropped(self):
+        data = self.upload(make_exif_jpeg())
+
+        # 남위는 음수, 37 + 30/60 + 36/3600 / MakerNote 는 바이너리라 제외
+        self.assertEqual(data['analysis_result']['metadata'], {'Make': 'TestCam', 'GPSLatitude': -37.51})
+
+    def test_exif_endpoint_returns_raw_tags(self):
+        data = self.upload(make_exif_jpeg())
+
+        response = self.client.get(f'/api/images/{data["id"]}/exif/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'id': data['id'], 'exif': self.FULL_EXIF})
+        self.assertTrue(ImageExif.objects.get(image_id=data['id']).data)
+
+    def test_exif_is_read_from_file_for_images_without_stored_raw(self):
+        data = self.upload(make_exif_jpeg())
+        ImageExif.objects.filter(image_id=data['id']).delete()
+
+        response = self.client.get(f'/api/images/{data["id"]}/exif/')
+
+        self.assertEqual(response.json()['exif'], self.FULL_EXIF)
+        self.assertTrue(ImageExif.objects.filter(image_id=data['id']).exists())
+
+    def test_image_without_exif(self):
+        data = self.upload(make_image(fmt='JPEG'))
+
+        self.assertNotIn('metadata', data['analysis_result'])
+        self.assertEqual(self.client.get(f'/api/images/{data["id"]}/exif/').json()['exif'], {})
+
+    def test_zero_denominator_rational_is_dropped(self):
+        data = self.upload(make_exif_jpeg(zero_rational=True))
+
+        self.assertNotIn('FNumber', data['analysis_result']['metadata'])
+        self.assertEqual(data['analysis_result']['metadata']['ExposureTime'], 0.004)
+        exif = self.client.get(f'/api/images/{data["id"]}/exif/').json()['exif']
+        self.assertIsNone(exif['Exif']['FNumber'])
+
+    def test_value_coercion(self):
+        self.assertEqual(exif_value(IFDRational(1, 3)), 0.333333)
+        self.assertIsNone(exif_value(IFDRational(1, 0)))
+        self.assertIsNone(exif_value(float('inf')))
+        self.assertIs(exif_value(True), True)
+        self.assertEqual(exif_value(' Canon\x00\x00'), 'Canon')
+        self.assertIsNone(exif_value('\x00'))
+        self.assertEqual(len(exif_value('x' * 1000)), 256)
+        self.assertEqual(len(exif_value('x' * 1000, keep_binary=True)), 1000)
+        self.assertEqual(exif_value((7,)), 7)
+        self.assertEqual(exif_value((IFDRational(1, 2), 3)), [0.5, 3])
+        self.assertIsNone(exif_value((1, b'x')))
+        self.assertIsNone(exif_value(b'\xff\xd8'))
+        self.assertEqual(exif_value(b'\xff\xd8', keep_binary=True), '/9g=')
+
+
+class AnimationTests(MediaTestCase):
+    """애니메이션 프레임 수/재생 시간/반복과 고른 프레임 전체로 계산하는 색상/밝기"""
+
+    def analyze(self, image_file):
+        return self.upload(image_file)['analysis_result']
+
+    def test_timeline_is_read_from_headers(self):
+        for fmt in ('GIF', 'WEBP', 'PNG'):
+            with self.subTest(fmt=fmt):
+                result = self.analyze(make_animation(frames=3, fmt=fmt))
+
+                self.assertEqual(result['animation'], {
+                    'is_animated': True,
+                    'frame_count': 3,
+                    'duration_ms': 300,
+                    'average_frame_ms': 100.0,
+                    'loop': 0,
+                    'sampled_frames': [0, 1, 2],
+                    'truncated': False,
+                })
+
+    def test_frame_durations_and_loop_count(self):
+        animation = self.analyze(make_animation(frames=4, duration=50, loop=2))['animation']
+
+        self.assertEqual(animation['duration_ms'], 200)
+        self.assertEqual(animation['average_frame_ms'], 50.0)
+        self.assertEqual(animation['loop'], 2)
+
+    def test_still_image(self):
+        self.assertEqual(self.analyze(make_image())['animation'], {'is_animated': False, 'frame_count': 1})
+
+    def test_colors_and_brightness_include_later_frames(self):
+        with override_settings(IMAGE_ANIMATION_SAMPLE_FRAMES=1):
+            first_only = self.analyze(make_animation(frames=3))
+        # 같은 내용이므로 저장된 결과와 분석 캐시를 지우고 다시 분석
+        cache.clear()
+        analysis_cache._local.clear()
+        UploadedImage.objects.all().delete()
+
+        sampled = self.analyze(make_animation(frames=3))
+
+        self.assertEqual(first_only['animation']['sampled_frames'], [0])
+        first_colors = [tuple(color['rgb']) for color in first_only['colors']['dominant_colors']]
+        self.assertEqual(first_colors, [(0, 80, 160)])
+        # 세 번째 프레임에만 있는 색이 팔레트에 들어가고 밝기도 달라짐
+        colors = [tuple(color['rgb']) for color in sampled['colors']['dominant_colors']]
+        self.assertIn((120, 80, 160), colors)
+        self.assertAlmostEqual(sum(color['percentage'] for color in sampled['colors']['dominant_colors']), 100, delta=0.1)
+        self.assertGreater(sampled['brightness']['average'], first_only['brightness']['average'])
+
+    @override_settings(IMAGE_ANIMATION_FRAME_BUDGET=2)
+    def test_frames_beyond_budget_are_not_decoded(self):
+        animation = self.analyze(make_animation(frames=4))['animation']
+
+        self.assertEqual(animation['frame_count'], 4)
+        self.assertEqual(animation['sampled_frames'], [0, 1])
+        self.assertTrue(animation['truncated'])
+        # 재생 시간은 헤더에서 읽으므로 예산과 상관없이 전체
+        self.assertEqual(animation['duration_ms'], 400)
+
+    def test_sample_indices(self):
+        self.assertEqual(sample_indices(100, samples=8, budget=64), ([0, 9, 18, 27, 36, 45, 54, 63], True))
+        self.assertEqual(sample_indices(5, samples=8, budget=64), ([0, 1, 2, 3, 4], False))
+        self.assertEqual(sample_indices(3, samples=1, budget=64), ([0], False))
+
+
+class ListFilterTests(TestCase):
+    """목록 필터는 analysis_result JSON 이 아니라 요약 컬럼으로 거름"""
+
+    def setUp(self):
+        rows = [
+            # (밝기, 레벨, 분위기, 그레이스케일, 투명도, 고유 색상 수, 비율, 대표 색상)
+            (10.0, 'dark', 'dark_cool', True, False, 50, 1.0, 0x1e40af),
+            (50.0, 'medium', 'balanced', False, True, 500, 1.5, 0xff0000),
+            (90.0, 'bright', 'bright_warm', False, False, 5000, 2.0, 0xffcc00),
+        ]
+        self.dark, self.medium, self.bright = [
+            UploadedImage.objects.create(
+                image=f'uploads/{index}.png', file_name=f'{index}.png',
+                brightness_average=average, brightness_level=level, mood=mood, is_grayscale=grayscale,
+                has_transparency=transparency, unique_colors=unique_colors, aspect_ratio=aspect_ratio,
+                dominant_color=dominant_color,
+                # JSON 은 컬럼과 반대 값 (필터가 JSON 을 읽으면 결과가 달라짐)
+                analysis_result={'brightness': {'average': 100 - average, 'level': 'medium'}},
+            )
+            for index, (average, level, mood, grayscale, transparency, unique_colors, aspect_ratio, dominant_color)
+            in enumerate(rows)
+        ]
+        # 분석 전 이미지 (요약 컬럼이 비어 있어 어떤 필터에도 걸리지 않음)
+        UploadedImage.objects.create(image='uploads/pending.png', file_name='pending.png')
+
+    def ids(self, query):
+        response = self.client.get(f'/api/images/?{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return {row['id'] for row in response.json()['results']}
+
+    def test_range_filters_are_inclusive(self):
+        self.assertEqual(self.ids('min_brightness=20&max_brightness=60'), {self.medium.pk})
+        self.assertEqual(self.ids('max_brightness=50'), {self.dark.pk, self.medium.pk})
+        self.assertEqual(self.ids('min_aspect_ratio=1.5'), {self.medium.pk, self.bright.pk})
+        self.assertEqual(self.ids('min_unique_colors=50&max_unique_colors=500'), {self.dark.pk, self.medium.pk})
+
+    def test_category_and_boolean_filters(self):
+        self.assertEqual(self.ids('mood=dark_cool'), {self.dark.pk})
+        self.assertEqual(self.ids('brightness_level=bright'), {self.bright.pk})
+        self.assertEqual(self.ids('is_grayscale=true'), {self.dark.pk})
+        self.assertEqual(self.ids('has_transparency=0'), {self.dark.pk, self.bright.pk})
+        self.assertEqual(self.ids('dominant_color=%231E40AF'), {self.dark.pk})
+        self.assertEqual(self.ids('mood=balanced&has_transparency=true&min_brightness=40'), {self.medium.pk})
+
+    def test_filters_query_summary_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.ids('min_brightness=80&brightness_level=bright'), {self.bright.pk})
+
+        [select] = [query['sql'] for query in queries.captured_queries if 'image_analysis_uploadedimage' in query['sql']]
+        self.assertIn('"brightness_average" >= 80.0', select)
+        self.assertIn('"brightness_level" = \'bright\'', select)
+        self.assertNotIn('analysis_result', select)
+
+    def test_invalid_values_are_bad_requests(self):
+        for query, field in [
+            ('mood=happy', 'mood'),
+            ('brightness_level=dim', 'brightness_level'),
+            ('is_grayscale=maybe', 'is_grayscale'),
+            ('min_brightness=abc', 'min_brightness'),
+            ('max_unique_colors=1.5', 'max_unique_colors'),
+            ('dominant_color=zzzzzz', 'dominant_color'),
+            ('dominant_color=fff', 'dominant_color'),
+        ]:
+            with self.subTest(query=query):
+                response = self.client.get(f'/api/images/?{query}')
+
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(field, response.json())
+
+
+class MoodClassificationTests(SimpleTestCase):
+    """
+    서버 분위기 분류가 프론트엔드 musicGenerator.classifyImageMood 와 같은 라벨을 냄
+
+    기대값은 같은 입력을 프론트엔드 classifyImageMood 에 넣어 얻은 라벨입니다.
+    임계값(밝기 120/80/100, warmth 0.6, coolness 0.5, red 150)은 모두 초과/미만 비교입니다.
+    """
+
+    # (주요 색상 목록, brightness.average, 라벨)
+    CASES = [
+        # 밝기 120 은 bright_warm 이 아님 (밝기가 0-100 이므로 실제 결과에서는 나오지 않음)
+        ([(255, 200, 0)], 120, 'intense'),
+        ([(255, 200, 0)], 120.5, 'bright_warm'),
+        ([(103, 100, 90)], 121, 'soft_pastel'),  # warmth 가 정확히 0.6
+        # 밝기 80 은 dark_cool 이 아님
+        ([(40, 40, 140)], 80, 'balanced'),
+        ([(40, 40, 140)], 79.5, 'dark_cool'),
+        ([(40, 40, 127), (40, 40, 128)], 70, 'balanced'),  # coolness 가 정확히 0.5
+        ([(40, 40, 129)], 70, 'dark_cool'),
+        # 밝기 100 은 soft_pastel 이 아님
+        ([(150, 140, 130)], 100, 'balanced'),
+        ([(150, 140, 130)], 100.5, 'soft_pastel'),
+        ([(200, 200, 200)], 100, 'intense'),
+        ([(150, 100, 100)], 50, 'balanced'),
+        ([(151, 100, 100)], 50, 'intense'),
+        ([(60, 120, 60)], 50, 'nature_green'),
+        ([(60, 100, 60)], 50, 'balanced'),
+        # 주요 색상은 비율 가중치 없이 평균
+        ([(255, 0, 0), (0, 0, 255)], 50, 'balanced'),
+    ]
+
+    @staticmethod
+    def analysis(colors, average):
+        return {
+            'brightness': {'average': average, 'contrast': 10.0},
+            'colors': {'dominant_colors': [{'rgb': rgb, 'count': 1, 'percentage': 50.0} for rgb in colors]},
+        }
+
+    def test_boundaries_match_frontend(self):
+        for colors, average, mood in self.CASES:
+            with self.subTest(colors=colors, brightness=average):
+                self.assertEqual(get_mood_fields(self.analysis(colors, average))['mood'], mood)
+
+    def test_missing_brightness_defaults_like_frontend(self):
+        # 프론트엔드의 brightness?.average || 50 과 같이 0 이나 값이 없으면 50
+        for average in (0, None):
+            features = extract_mood_features(self.analysis([(40, 40, 140)], average))
+            self.assertEqual(features['brightness'], 50)
+
+    def test_results_without_colors(self):
+        for result in (None, {}, {'error': 'x'}, self.analysis([], 50)):
+            with self.subTest(result=result):
+                fields = get_mood_fields(result)
+
+                self.assertEqual(fields['mood'], '')
+                self.assertIsNone(fields['feature_brightness'])
+
+
+class RecordingUploadHandler(StreamingImageUploadHandler):
+    """작은 청크로 받고, 받은 업로드 파일과 임시 파일에 실제로 쓴 바이트 수를 기록하는 핸들러"""
+
+    chunk_size = 1024
+    uploads = []
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        RecordingUploadHandler.uploads.append((upload, os.path.getsize(upload.temporary_file_path())))
+        return upload
+
+
+@override_settings(FILE_UPLOAD_HANDLERS=['image_analysis.tests.RecordingUploadHandler'])
+class StreamingUploadHandlerTests(MediaTestCase):
+    """받으면서 해시/포맷 판별/크기 검사, 거절할 업로드는 나머지를 디스크에 쓰지 않음"""
+
+    def setUp(self):
+        super().setUp()
+        RecordingUploadHandler.uploads = []
+
+    @staticmethod
+    def noise(size=(128, 96), fmt='PNG'):
+        """압축되지 않아 여러 청크에 걸치는 잡음 이미지 바이트"""
+        img = Image.frombytes('RGB', size, random.Random(0).randbytes(size[0] * size[1] * 3))
+        buffer = io.BytesIO()
+        img.save(buffer, fmt)
+        return buffer.getvalue()
+
+    def post(self, name, content, content_type='image/png'):
+        response = self.client.post('/api/images/', {'image': SimpleUploadedFile(name, content, content_type)})
+        [(upload, written)] = RecordingUploadHandler.uploads
+        return response, upload, written
+
+    def test_hash_matches_compute_content_hash(self):
+        content = self.noise()
+        self.assertGreater(len(content), RecordingUploadHandler.chunk_size * 10)
+
+        response, upload, written = self.post('gradient.png', content)
+
+        self.assertEqual(response.status_code, 201, response.content)
+        expected = compute_content_hash(io.BytesIO(content))
+        self.assertEqual(upload.content_hash, expected)
+        self.assertEqual(UploadedImage.objects.get(pk=response.json()['id']).content_hash, expected)
+        self.assertEqual(upload.sniffed_format, 'PNG')
+        self.assertEqual(written, len(content))
+
+    @override_settings(IMAGE_UPLOAD_MAX_SIZE=4096)
+    def test_oversize_upload_stops_writing_at_the_limit(self):
+        content = self.noise()
+        self.assertGreater(len(content), 4096 * 4)
+
+        response, upload, written = self.post('large.png', content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('크기', response.json()['image'][0])
+        self.assertTrue(upload.exceeds_max_size)
+        self.assertEqual(upload.content_hash, '')
+        self.assertLessEqual(written, 4096)
+        self.assertEqual(upload.size, len(content))
+        self.assertFalse(UploadedImage.objects.exists())
+
+    def test_unknown_magic_stops_writing_after_first_chunk(self):
+        content = b'not an image, ' * 1000
+
+        response, upload, written = self.post('fake.png', content)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('이미지 형식을 알 수 없습니다', response.json()['image'][0])
+        self.assertIsNone(upload.sniffed_format)
+        self.assertEqual(upload.content_hash, '')
+        # 헤더를 받은 첫 청크까지만 씀
+        self.assertLessEqual(written, RecordingUploadHandler.chunk_size * 2)
+
+    @override_settings(IMAGE_UPLOAD_ALLOWED_FORMATS=['PNG'])
+    def test_disallowed_format_stops_writing_after_first_chunk(self):
+        content = self.noise(fmt='BMP')
+
+        response, upload, written = self.post('image.bmp', content, 'image/bmp')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('지원되지 않는 이미지 포맷', response.json()['image'][0])
+        self.assertEqual(upload.sniffed_format, 'BMP')
+        self.assertLessEqual(written, RecordingUploadHandler.chunk_size * 2)
+
+
+class PaletteTests(MediaTestCase):
+    """대표 색상 팔레트: LAB 거리(ΔE)가 가까운 색은 하나로 합치고 비율은 합쳐서 100"""
+
+    @staticmethod
+    def palette(left, right, k=5):
+        return extract_palette(Image.open(make_split_image(left, right)).convert('RGB'), k)
+
+    @staticmethod
+    def distance(first, second):
+        swatch = Image.new('RGB', (2, 1))
+        swatch.putdata([first, second])
+        return lab_distance(*to_lab(swatch).getdata())
+
+    def test_near_duplicate_halves_are_merged(self):
+        for left, right in [((200, 30, 30), (205, 32, 28)), ((120, 120, 120), (126, 126, 126))]:
+            with self.subTest(left=left, right=right):
+                self.assertLess(self.distance(left, right), PALETTE_MIN_DISTANCE)
+
+                [(count, rgb)] = self.palette(left, right)
+
+                self.assertEqual(count, 64 * 48)
+                for channel, low, high in zip(rgb, left, right):
+                    self.assertLessEqual(min(low, high) - 1, channel)
+                    self.assertLessEqual(channel, max(low, high) + 1)
+
+    def test_distinct_halves_are_kept(self):
+        self.assertGreater(self.distance((120, 120, 120), (170, 170, 170)), PALETTE_MIN_DISTANCE)
+
+        palette = self.palette((120, 120, 120), (170, 170, 170))
+
+        self.assertEqual([count for count, _ in palette], [64 * 48 // 2] * 2)
+        self.assertEqual({rgb for _, rgb in palette}, {(120, 120, 120), (170, 170, 170)})
+
+    def test_at_most_k_colors_by_pixel_count(self):
+        # 서로 먼 색 7개의 줄무늬 (앞쪽일수록 넓음)
+        stripes = [((255, 0, 0), 30), ((0, 255, 0), 20), ((0, 0, 255), 12), ((255, 255, 0), 8),
+                   ((0, 255, 255), 5), ((255, 0, 255), 3), ((0, 0, 0), 2)]
+        img = Image.new('RGB', (80, 10))
+        left = 0
+        for color, width in stripes:
+            img.paste(color, (left, 0, left + width, 10))
+            left += width
+
+        palette = extract_palette(img, 3)
+
+        self.assertEqual(palette, [(300, (255, 0, 0)), (200, (0, 255, 0)), (120, (0, 0, 255))])
+
+    def test_dominant_color_percentages_sum_to_100(self):
+        for left, right, colors in [((200, 30, 30), (205, 32, 28), 1), ((200, 30, 30), (30, 30, 200), None)]:
+            with self.subTest(left=left, right=right):
+                data = self.upload(make_split_image(left, right, name=f'{left}-{right}.png'))
+
+                dominant = data['analysis_result']['colors']['dominant_colors']
+                if colors is not None:
+                    self.assertEqual(len(dominant), colors)
+                self.assertAlmostEqual(sum(color['percentage'] for color in dominant), 100, delta=0.05)
+                self.assertEqual(data['dominant_color'], '#%02x%02x%02x' % tuple(dominant[0]['rgb']))
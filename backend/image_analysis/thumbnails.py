@@ -0,0 +1,197 @@
+"""
+업로드 이미지의 썸네일(파생 이미지)
+
+원본과 분리된 경로에 원본 내용 해시별로 크기/포맷별 파생 이미지를 저장합니다.
+    uploads/2024/01/01/photo.jpg (content_hash abcd...) -> derivatives/abcd.../thumb.webp, card.jpeg ...
+
+파생 이미지 경로는 업로드 파일 이름에서 만들지 않으므로, 'photo.thumb.webp' 같은 이름의 업로드가
+다른 이미지의 파생 이미지 자리를 차지하거나 덮어쓸 수 없습니다.
+
+업로드 시 설정된 크기를 미리 만들고, 없는 파생 이미지는 처음 요청될 때 만들어 저장합니다.
+같은 내용의 업로드는 해시가 같으므로 파생 이미지도 함께 공유됩니다.
+
+설정 (settings.py):
+    IMAGE_THUMBNAIL_SIZES: {이름: 긴 변 픽셀} (기본 {'thumb': 256, 'card': 640})
+    IMAGE_THUMBNAIL_FORMATS: 생성할 포맷 (기본 ['webp', 'jpeg'], 'avif' 도 지정 가능.
+                             설치된 Pillow 가 저장할 수 없는 포맷은 경고를 남기고 제외)
+    IMAGE_THUMBNAIL_QUALITY: 인코딩 품질 (기본 80)
+    IMAGE_THUMBNAIL_EAGER: 업로드 시 미리 생성 여부 (기본 True)
+"""
+import hashlib
+import io
+import logging
+import re
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .instrumentation import stage
+from .streaming import should_stream, stream_reduce
+from .utils import REDUCING_GAP
+
+logger = logging.getLogger(__name__)
+
+# URL 의 포맷 이름 -> (Pillow 포맷, Content-Type)
+FORMATS = {
+    'avif': ('AVIF', 'image/avif'),
+    'webp': ('WEBP', 'image/webp'),
+    'jpeg': ('JPEG', 'image/jpeg'),
+}
+
+DEFAULT_SIZES = {'thumb': 256, 'card': 640}
+DEFAULT_FORMATS = ['webp', 'jpeg']
+
+DERIVATIVES_DIR = 'derivatives'
+
+_HASH_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+# 사용할 수 없다고 이미 경고한 포맷 (요청마다 경고하지 않도록)
+_unavailable_warned = set()
+
+# 같은 파생 이미지를 동시에 만들지 않도록 이름별 잠금
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def get_sizes():
+    return getattr(settings, 'IMAGE_THUMBNAIL_SIZES', DEFAULT_SIZES)
+
+
+def get_formats():
+    """설정된 포맷 중 설치된 Pillow 가 저장할 수 있는 것 (없는 포맷은 처음 한 번 경고)"""
+    Image.init()
+    formats = []
+    for fmt in getattr(settings, 'IMAGE_THUMBNAIL_FORMATS', DEFAULT_FORMATS):
+        if fmt in FORMATS and FORMATS[fmt][0] in Image.SAVE:
+            formats.append(fmt)
+        elif fmt not in _unavailable_warned:
+            _unavailable_warned.add(fmt)
+            if fmt not in FORMATS:
+                logger.warning('IMAGE_THUMBNAIL_FORMATS 의 %r 는 지원하지 않는 썸네일 포맷입니다. (%s)', fmt, ', '.join(FORMATS))
+            else:
+                logger.warning(
+                    'IMAGE_THUMBNAIL_FORMATS 의 %r 포맷은 설치된 Pillow %s 에서 저장할 수 없어 썸네일을 만들지 않습니다.',
+                    fmt, Image.__version__,
+                )
+    return formats
+
+
+def derivative_name(image_name, content_hash, size, fmt):
+    """
+    파생 이미지 경로: derivatives/<원본 내용 해시>/<크기>.<포맷>
+
+    해시가 없거나 형식이 다르면(이전 행 등) 저장 경로의 해시를 대신 사용합니다.
+    """
+    if not _HASH_PATTERN.fullmatch(content_hash or ''):
+        content_hash = hashlib.sha256(image_name.encode()).hexdigest()
+    return f'{DERIVATIVES_DIR}/{content_hash}/{size}.{fmt}'
+
+
+def _prepare_mode(img, fmt):
+    """포맷이 저장할 수 있는 모드로 변환 (JPEG 는 투명 영역을 흰 배경에 합성)"""
+    has_alpha = img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+    if fmt == 'jpeg':
+        if has_alpha:
+            rgba = img.convert('RGBA')
+            background = Image.new('RGB', rgba.size, (255, 255, 255))
+            background.paste(rgba, mask=rgba.getchannel('A'))
+            return background
+        return img if img.mode == 'RGB' else img.convert('RGB')
+    if has_alpha:
+        return img if img.mode == 'RGBA' else img.convert('RGBA')
+    return img if img.mode == 'RGB' else img.convert('RGB')
+
+
+def encode(img, fmt):
+    """이미지를 포맷에 맞게 인코딩한 바이트"""
+    quality = getattr(settings, 'IMAGE_THUMBNAIL_QUALITY', 80)
+    options = {'quality': quality}
+    if fmt == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    elif fmt == 'webp':
+        options['method'] = 4
+
+    buffer = io.BytesIO()
+    _prepare_mode(img, fmt).save(buffer, FORMATS[fmt][0], **options)
+    return buffer.getvalue()
+
+
+def generate_derivatives(image_name, content_hash, sizes=None, formats=None):
+    """
+    저장된 원본에서 아직 없는 파생 이미지를 만들어 저장합니다.
+
+    원본은 한 번만 열고, 큰 크기부터 줄여 가며 작은 크기는 앞 단계 결과에서 만듭니다.
+
+    Returns:
+        list: 새로 저장한 파생 이미지 경로
+    """
+    all_sizes = get_sizes()
+    sizes = [size for size in (sizes or all_sizes) if size in all_sizes]
+    formats = [fmt for fmt in (formats or get_formats()) if fmt in FORMATS]
+
+    missing = {
+        size: [fmt for fmt in formats if not default_storage.exists(derivative_name(image_name, content_hash, size, fmt))]
+        for size in sizes
+    }
+    missing = {size: fmts for size, fmts in missing.items() if fmts}
+    if not missing:
+        return []
+
+    created = []
+    with stage('thumbnails'), default_storage.open(image_name, 'rb') as image_file:
+        img = Image.open(image_file)
+        largest = max(all_sizes[size] for size in missing)
+        # JPEG 는 필요한 크기에 가깝게 축소 디코드
+        img.draft('RGB', (largest, largest))
+        # 아주 큰 PNG/BMP 는 스트립 단위로 디코드하며 먼저 줄임 (전체 픽셀을 메모리에 올리지 않음)
+        factor = int(max(img.size) / largest / REDUCING_GAP)
+        if factor > 1 and should_stream(img):
+            img = stream_reduce(img, factor)
+        img = ImageOps.exif_transpose(img)
+
+        for size in sorted(missing, key=lambda name: all_sizes[name], reverse=True):
+            edge = all_sizes[size]
+            img.thumbnail((edge, edge), reducing_gap=REDUCING_GAP)
+            for fmt in missing[size]:
+                name = derivative_name(image_name, content_hash, size, fmt)
+                saved = default_storage.save(name, ContentFile(encode(img, fmt)))
+                created.append(saved)
+    return created
+
+
+def generate_derivatives_safely(image_name, content_hash):
+    """업로드 시 미리 생성 (실패해도 업로드는 계속 진행, 없는 크기는 요청 시 생성됨)"""
+    if not getattr(settings, 'IMAGE_THUMBNAIL_EAGER', True):
+        return []
+    try:
+        return generate_derivatives(image_name, content_hash)
+    except Exception as e:
+        logger.warning('썸네일 생성 실패 (%s): %s', image_name, e)
+        return []
+
+
+def get_derivative(image_name, content_hash, size, fmt):
+    """
+    파생 이미지 경로를 반환합니다. 없으면 지금 만들어 저장합니다.
+
+    Returns:
+        str: 저장된 파생 이미지 경로, 설정에 없는 크기/포맷이면 None
+    """
+    if size not in get_sizes() or fmt not in get_formats():
+        return None
+
+    name = derivative_name(image_name, content_hash, size, fmt)
+    if default_storage.exists(name):
+        return name
+
+    with _locks_lock:
+        lock = _locks.setdefault(name, threading.Lock())
+    with lock:
+        if not default_storage.exists(name):
+            generate_derivatives(image_name, content_hash, [size], [fmt])
+    with _locks_lock:
+        _locks.pop(name, None)
+    return name
@@ -0,0 +1,66 @@
+"""
+이미지 업로드 스트리밍 핸들러
+
+요청 본문이 들어오는 동안 한 번만 읽으면서
+    - SHA-256 내용 해시 계산 (중복 업로드 판별용)
+    - 앞부분 매직 넘버로 포맷 판별 (허용하지 않는 포맷이면 나머지는 디스크에 쓰지 않음)
+    - 크기 제한 검사 (초과분은 디스크에 쓰지 않음)
+를 하고 임시 파일에 저장합니다. 이후 단계는 다시 읽지 않고 이 값들을 사용합니다.
+
+임시 파일은 MEDIA_ROOT 밖이지만 같은 파일 시스템(FILE_UPLOAD_TEMP_DIR)에 만들어지므로
+공개 경로로 노출되지 않고, 저장 시 FileSystemStorage 가 복사 대신 rename 으로 옮깁니다.
+
+설정 (settings.py):
+    FILE_UPLOAD_HANDLERS 에 'image_analysis.upload_handlers.StreamingImageUploadHandler' 등록
+    IMAGE_UPLOAD_MAX_SIZE: 최대 파일 크기 (기본 10MB)
+    IMAGE_UPLOAD_ALLOWED_FORMATS: 허용 포맷 (header.py)
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+from .header import get_allowed_formats
+from .utils import SNIFF_BYTES, sniff_format
+
+
+def get_max_upload_size():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_SIZE', 10 * 1024 * 1024)
+
+
+class StreamingImageUploadHandler(TemporaryFileUploadHandler):
+    """받는 즉시 해시/포맷 판별/크기 검사를 하며 임시 파일에 쓰는 업로드 핸들러"""
+
+    def new_file(self, *args, **kwargs):
+        if settings.FILE_UPLOAD_TEMP_DIR:
+            os.makedirs(settings.FILE_UPLOAD_TEMP_DIR, exist_ok=True)
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.header = b''
+        self.received = 0
+        self.max_size = get_max_upload_size()
+        self.unknown_format = False
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > self.max_size or self.unknown_format:
+            # 크기 초과/허용하지 않는 포맷: 나머지는 읽기만 하고 버림 (검증 단계에서 거절)
+            return None
+
+        if len(self.header) < SNIFF_BYTES:
+            self.header += raw_data[:SNIFF_BYTES - len(self.header)]
+            # 헤더를 다 받은 청크까지는 써 둠 (검증 단계가 같은 파일에서 포맷을 다시 읽어 거절 사유를 정함)
+            self.unknown_format = (
+                len(self.header) == SNIFF_BYTES and sniff_format(self.header) not in get_allowed_formats()
+            )
+        self.digest.update(raw_data)
+        self.file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        upload = super().file_complete(file_size)
+        upload.exceeds_max_size = self.received > self.max_size
+        upload.content_hash = '' if upload.exceeds_max_size or self.unknown_format else self.digest.hexdigest()
+        upload.sniffed_format = sniff_format(self.header)
+        return upload
@@ -1,11 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ImageAnalysisViewSet, spotify_recommend
+from .views import ImageAnalysisViewSet, image_thumbnail, metrics, spotify_recommend, spotify_stats
 
 router = DefaultRouter()
 router.register(r'images', ImageAnalysisViewSet, basename='image')
 
 urlpatterns = [
+    path('images/<int:pk>/thumbnail/<str:size>/<str:fmt>/', image_thumbnail, name='image-thumbnail'),
     path('', include(router.urls)),
     path('spotify/recommend/', spotify_recommend, name='spotify-recommend'),
+    path('spotify/stats/', spotify_stats, name='spotify-stats'),
+    path('metrics/', metrics, name='metrics'),
 ]
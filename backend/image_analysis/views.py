@@ -1,15 +1,46 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
+from rest_framework.request import Empty
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.core.files.uploadedfile import InMemoryUploadedFile
-from PIL import Image
-import io
-
-from .models import UploadedImage
-from .serializers import UploadedImageSerializer, ImageAnalysisRequestSerializer
-from .utils import analyze_image, get_image_metadata
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import JsonResponse, StreamingHttpResponse, FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+import json
+
+from .models import ImageColor, ImageExif, UploadedImage, get_analysis_fields
+from .serializers import (
+    UploadedImageSerializer, UploadedImageListSerializer, ImageAnalysisRequestSerializer,
+    get_requested_fields,
+)
+from .pagination import KeysetPagination
+from .utils import analyze_with_metadata, get_analysis_context, refresh_analysis, release_analysis_context
+from .mood import extract_mood_features, classify_mood
 from .spotify_service import spotify_service
+from .async_spotify import aget_recommendation
+from .tasks import analysis_queue
+from .cache import analysis_cache
+from .header import rejection_stats
+from .instrumentation import render_metrics, stage
+from .batch import process_batch
+from .features import filter_images
+from .exif import exif_to_dict
+from .similarity import find_similar, get_default_distance, get_limit, get_max_distance
+from .color_index import (
+    find_by_color, get_default_share, get_default_tolerance, get_max_tolerance, parse_color,
+    get_limit as get_color_limit,
+)
+from .thumbnails import FORMATS, get_derivative, get_sizes, generate_derivatives_safely
+
+
+def _read_raw_exif(instance):
+    """저장된 원본 파일 헤더에서 EXIF 원본 바이트를 읽습니다."""
+    with instance.image.open('rb') as image_file, get_analysis_context(image_file) as ctx:
+        return ctx.raw_exif
 
 
 class ImageAnalysisViewSet(viewsets.ModelViewSet):
@@ -22,26 +53,63 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
     - update/partial_update: 이미지 정보 수정
     - destroy: 이미지 삭제
     - analyze: 이미지 재분석
+    - analysis_status: 분석 진행 상태 조회 (비동기 분석 모드)
+    - batch: 여러 이미지 일괄 업로드 및 분석
+    - similar: 지각 해시가 비슷한 이미지 조회
+    - exif: 원본 EXIF 전체 조회
+    - by_color: 색상으로 이미지 찾기
     """
 
     queryset = UploadedImage.objects.all()
     serializer_class = UploadedImageSerializer
     parser_classes = (MultiPartParser, FormParser)
+    pagination_class = KeysetPagination
+
+    # 목록 쿼리에서 항상 읽어야 하는 컬럼 (키셋 커서)
+    list_required_fields = ('id', 'uploaded_at')
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # 업로드 파일의 메모리 매핑은 응답을 만든 직후 해제 (스트리밍 응답은 스트림이 끝날 때 batch 에서 해제)
+        files = request._files
+        if files is not Empty and files and not getattr(response, 'streaming', False):
+            for image_file in files.values():
+                release_analysis_context(image_file)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return UploadedImageListSerializer
+        return super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+
+        # 요약 컬럼 필터 (?brightness_level=, ?min_aspect_ratio= 등, JSON 을 읽지 않고 SQL 로)
+        queryset = filter_images(queryset, self.request.query_params)
+
+        # 목록에는 analysis_result 가 없으므로 읽지 않음, ?fields= 가 있으면 해당 컬럼만 읽음
+        requested = get_requested_fields(self.request)
+        if requested:
+            model_fields = {field.name for field in UploadedImage._meta.concrete_fields}
+            columns = {name for name in requested if name in model_fields}
+            ordering_field, _ = self.paginator.get_ordering(self.request)
+            return queryset.only(*columns.union(self.list_required_fields, [ordering_field]))
+        return queryset.defer('analysis_result')
 
     def create(self, request, *args, **kwargs):
         """이미지 업로드 및 자동 분석"""
-        print("=== Image Upload Request ===")
-        print("FILES:", request.FILES)
-        print("DATA:", request.data)
-
-        serializer = self.get_serializer(data=request.data)
-
-        if not serializer.is_valid():
-            print("Serializer errors:", serializer.errors)
+        # 업로드 본문은 처음 접근할 때 읽음 (스트리밍 업로드 핸들러가 해시/포맷 판별을 함께 수행)
+        with stage('upload'):
+            data = request.data
+        serializer = self.get_serializer(data=data)
+
+        with stage('validate'):
+            valid = serializer.is_valid()
+        if not valid:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # serializer.is_valid(raise_exception=True)
-
         # 이미지 파일 가져오기
         image_file = request.FILES.get('image')
         if not image_file:
@@ -53,43 +121,108 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
         # 파일 이름 저장
         file_name = image_file.name
 
-        # 이미지 정보 추출
+        # 이미지 정보 추출 (검증 단계에서 연 컨텍스트 재사용)
         try:
-            img = Image.open(image_file)
-            width, height = img.size
+            ctx = get_analysis_context(image_file)
+            width, height = ctx.width, ctx.height
             file_size = image_file.size
+            content_hash = ctx.content_hash
 
             # 파일 포인터 초기화
-            image_file.seek(0)
+            ctx.rewind()
         except Exception as e:
             return Response(
                 {'error': f'이미지 파일을 읽을 수 없습니다: {str(e)}'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        # 같은 내용의 이미지가 이미 분석되어 있으면 저장된 파일과 결과를 재사용
+        duplicate = UploadedImage.objects.filter(
+            content_hash=content_hash, analysis_completed=True
+        ).first()
+        if duplicate is not None:
+            analysis_cache.record_db_hit()
+            # 이전 버전 분석기로 만든 결과면 바뀐 분석기만 다시 실행
+            analysis_result = refresh_analysis(ctx, duplicate.analysis_result)
+            if 'error' in analysis_result:
+                analysis_result = duplicate.analysis_result
+            elif analysis_result is not duplicate.analysis_result:
+                analysis_cache.set(content_hash, analysis_result)
+            instance = UploadedImage.objects.create(
+                image=duplicate.image.name,
+                file_name=file_name,
+                file_size=file_size,
+                image_width=width,
+                image_height=height,
+                content_hash=content_hash,
+                analysis_result=analysis_result,
+                analysis_completed=True,
+                analysis_status=UploadedImage.AnalysisStatus.COMPLETED,
+                **get_analysis_fields(analysis_result)
+            )
+            ImageColor.replace_for([instance])
+            ImageExif.store([(instance, ctx.raw_exif)])
+            response_serializer = self.get_serializer(instance)
+            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+        # 비동기 분석 모드에서 대기열이 가득 차면 저장 전에 거절
+        use_async = getattr(settings, 'IMAGE_ANALYSIS_ASYNC', False)
+        if use_async and analysis_queue.is_full():
+            return Response(
+                {'error': '분석 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '5'}
+            )
+
         # 모델 인스턴스 생성
         instance = serializer.save(
             file_name=file_name,
             file_size=file_size,
             image_width=width,
-            image_height=height
+            image_height=height,
+            content_hash=content_hash
         )
+        # EXIF 원본은 분석 결과와 따로 저장 (헤더에서 읽음, 디코드 없음)
+        ImageExif.store([(instance, ctx.raw_exif)])
+
+        # 썸네일 미리 생성 (비동기 분석 모드에서는 워커가 생성)
+        if not use_async:
+            generate_derivatives_safely(instance.image.name, instance.content_hash)
+
+        # 같은 내용의 분석 결과가 캐시에 있으면 디코드 없이 재사용 (버전이 바뀐 분석기만 다시 실행)
+        cached_result = analysis_cache.get(content_hash)
+        if cached_result is not None:
+            refreshed = refresh_analysis(ctx, cached_result)
+            if refreshed is not cached_result and 'error' not in refreshed:
+                analysis_cache.set(content_hash, refreshed)
+            cached_result = None if 'error' in refreshed else refreshed
+        if cached_result is not None:
+            instance.analysis_result = cached_result
+            instance.analysis_completed = True
+            instance.analysis_status = UploadedImage.AnalysisStatus.COMPLETED
+            instance.apply_analysis(cached_result)
+            instance.save()
+            ImageColor.replace_for([instance])
+            response_serializer = self.get_serializer(instance)
+            return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
-        # 이미지 분석 수행
-        try:
-            image_file.seek(0)
-            analysis_result = analyze_image(image_file)
+        # 비동기 분석: 대기열에 넣고 즉시 응답 (대기열에 못 넣으면 요청 내에서 분석)
+        if use_async and analysis_queue.submit(instance.pk):
+            response_serializer = self.get_serializer(instance)
+            return Response(response_serializer.data, status=status.HTTP_202_ACCEPTED)
 
-            # EXIF 메타데이터 추출
-            image_file.seek(0)
-            metadata = get_image_metadata(image_file)
-            if metadata:
-                analysis_result['metadata'] = metadata
+        # 이미지 분석 수행 (EXIF 메타데이터 포함)
+        try:
+            analysis_result = analyze_with_metadata(ctx)
 
             # 분석 결과 저장
             instance.analysis_result = analysis_result
             instance.analysis_completed = True
+            instance.analysis_status = UploadedImage.AnalysisStatus.COMPLETED
+            instance.apply_analysis(analysis_result)
             instance.save()
+            ImageColor.replace_for([instance])
+            analysis_cache.set(content_hash, analysis_result)
 
         except Exception as e:
             instance.analysis_result = {
@@ -97,6 +230,7 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
                 'message': '이미지 분석 중 오류가 발생했습니다.'
             }
             instance.analysis_completed = False
+            instance.analysis_status = UploadedImage.AnalysisStatus.FAILED
             instance.save()
 
         # 응답 반환
@@ -106,30 +240,27 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def analyze(self, request, pk=None):
         """
-        특정 이미지 재분석
+        특정 이미지 재분석 (버전이 바뀐 분석기만 다시 실행, ?full=true 면 전체)
         POST /api/images/{id}/analyze/
         """
         instance = self.get_object()
+        full = request.query_params.get('full', '').lower() in ('1', 'true')
 
         try:
-            # 저장된 이미지 파일 열기
-            image_file = instance.image.open('rb')
-
-            # 이미지 분석
-            analysis_result = analyze_image(image_file)
-
-            # EXIF 메타데이터 추출
-            image_file.seek(0)
-            metadata = get_image_metadata(image_file)
-            if metadata:
-                analysis_result['metadata'] = metadata
+            # 저장된 이미지 파일 열기 (모든 분석기가 현재 버전이면 디코드하지 않음)
+            with instance.image.open('rb') as image_file, get_analysis_context(image_file) as ctx:
+                analysis_result = refresh_analysis(ctx, instance.analysis_result, full=full)
+            if analysis_result is instance.analysis_result:
+                return Response(self.get_serializer(instance).data)
 
             # 결과 저장
             instance.analysis_result = analysis_result
             instance.analysis_completed = True
+            instance.analysis_status = UploadedImage.AnalysisStatus.COMPLETED
+            instance.apply_analysis(analysis_result)
             instance.save()
-
-            image_file.close()
+            ImageColor.replace_for([instance])
+            analysis_cache.set(instance.content_hash, analysis_result)
 
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
@@ -140,14 +271,31 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=True, methods=['get'], url_path='status')
+    def analysis_status(self, request, pk=None):
+        """
+        분석 진행 상태 조회
+        GET /api/images/{id}/status/
+        """
+        instance = self.get_object()
+        return Response({
+            'id': instance.id,
+            'analysis_status': instance.analysis_status,
+            'analysis_completed': instance.analysis_completed,
+            'queue_depth': analysis_queue.depth(),
+        })
+
     @action(detail=False, methods=['post'])
     def quick_analyze(self, request):
         """
         이미지를 저장하지 않고 즉시 분석
         POST /api/images/quick_analyze/
         """
-        serializer = ImageAnalysisRequestSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+        with stage('upload'):
+            data = request.data
+        serializer = ImageAnalysisRequestSerializer(data=data)
+        with stage('validate'):
+            serializer.is_valid(raise_exception=True)
 
         image_file = request.FILES.get('image')
         if not image_file:
@@ -157,13 +305,26 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            # 이미지 분석
-            analysis_result = analyze_image(image_file)
+            # 같은 내용의 이미지는 캐시된 결과를 사용 (디코드 생략)
+            ctx = get_analysis_context(image_file)
+            analysis_result = analysis_cache.get(ctx.content_hash)
+
+            if analysis_result is not None:
+                # 이전 버전 분석기로 만든 결과면 바뀐 분석기만 다시 실행
+                refreshed = refresh_analysis(ctx, analysis_result)
+                if refreshed is not analysis_result:
+                    analysis_result = refreshed
+                    analysis_cache.set(ctx.content_hash, analysis_result)
+            else:
+                # 이미지 분석 (EXIF 메타데이터 포함)
+                analysis_result = analyze_with_metadata(ctx)
+                analysis_cache.set(ctx.content_hash, analysis_result)
+
+            analysis = dict(analysis_result)
+            metadata = analysis.pop('metadata', None)
 
             # 기본 정보 추가
-            image_file.seek(0)
-            img = Image.open(image_file)
-            width, height = img.size
+            width, height = ctx.width, ctx.height
 
             result = {
                 'file_name': image_file.name,
@@ -172,15 +333,17 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
                     'width': width,
                     'height': height
                 },
-                'analysis': analysis_result
+                'analysis': analysis
             }
 
-            # EXIF 메타데이터 추출
-            image_file.seek(0)
-            metadata = get_image_metadata(image_file)
             if metadata:
                 result['metadata'] = metadata
 
+            # 분위기 분류 (프론트엔드 classifyImageMood 와 같은 규칙)
+            features = extract_mood_features(analysis)
+            result['mood'] = classify_mood(features)
+            result['mood_features'] = features
+
             return Response(result, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -189,11 +352,197 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        여러 이미지 일괄 업로드 및 분석
+        POST /api/images/batch/  (multipart, 'images' 필드에 파일 여러 개)
+
+        분석은 프로세스 풀에서 병렬로 하고, 결과는 끝나는 순서대로 한 줄에 하나씩
+        NDJSON 으로 스트리밍합니다. 검증/분석에 실패한 항목은 'error' 를 담아 보내며,
+        마지막 줄은 저장된 행의 id 목록입니다. ({"summary": true, "created": [...]})
+        """
+        with stage('upload'):
+            files = request.FILES.getlist('images')
+        if not files:
+            return Response(
+                {'error': '이미지 파일이 필요합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_files = getattr(settings, 'IMAGE_ANALYSIS_BATCH_MAX_FILES', 50)
+        if len(files) > max_files:
+            return Response(
+                {'error': f'한 번에 최대 {max_files}개의 이미지만 업로드할 수 있습니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 항목별 검증 (잘못된 파일이 있어도 나머지는 처리)
+        items = []
+        rejected = []
+        for index, image_file in enumerate(files):
+            serializer = self.get_serializer(data={'image': image_file})
+            with stage('validate'):
+                valid = serializer.is_valid()
+            if not valid:
+                rejected.append({
+                    'index': index,
+                    'file_name': image_file.name,
+                    'status': 'error',
+                    'error': ' '.join(str(message) for message in serializer.errors.get('image', [])),
+                })
+                continue
+
+            # 검증 단계에서 연 컨텍스트로 내용 해시 계산
+            ctx = get_analysis_context(image_file)
+            items.append((index, image_file, ctx.content_hash))
+            ctx.rewind()
+
+        def stream():
+            try:
+                for line in rejected:
+                    yield json.dumps(line, ensure_ascii=False) + '\n'
+                if items:
+                    for line in process_batch(items):
+                        yield json.dumps(line, ensure_ascii=False) + '\n'
+                else:
+                    yield json.dumps({'summary': True, 'created': []}) + '\n'
+            finally:
+                for image_file in files:
+                    release_analysis_context(image_file)
+
+        return StreamingHttpResponse(stream(), content_type='application/x-ndjson')
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """
+        지각 해시가 비슷한 이미지 (재인코딩, 크기 변경, 스크린샷 등)
+        GET /api/images/{id}/similar/?max_distance=8&limit=20
+        """
+        instance = self.get_object()
+        if not instance.perceptual_hash:
+            return Response(
+                {'error': '이 이미지의 지각 해시가 없습니다. 재분석 후 다시 시도해주세요.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            max_distance = int(request.query_params.get('max_distance', get_default_distance()))
+            limit = int(request.query_params.get('limit', get_limit()))
+        except ValueError:
+            return Response(
+                {'error': 'max_distance 와 limit 은 정수여야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_distance = max(0, min(max_distance, get_max_distance()))
+        limit = max(1, min(limit, get_limit()))
+
+        matches = find_similar(
+            UploadedImage.objects.all(), instance.perceptual_hash, max_distance, limit, exclude_pk=instance.pk
+        )
+        images = UploadedImage.objects.defer('analysis_result').in_bulk([pk for pk, _ in matches])
+        matches = [(images[pk], distance) for pk, distance in matches if pk in images]
+
+        serializer = UploadedImageListSerializer(
+            [image for image, _ in matches], many=True, context=self.get_serializer_context()
+        )
+        results = []
+        for data, (_, distance) in zip(serializer.data, matches):
+            data['distance'] = distance
+            results.append(data)
+
+        return Response({
+            'id': instance.pk,
+            'perceptual_hash': instance.perceptual_hash,
+            'max_distance': max_distance,
+            'results': results,
+        })
+
+    @action(detail=True, methods=['get'])
+    def exif(self, request, pk=None):
+        """
+        원본 EXIF 전체 (모든 IFD, 바이너리 값은 base64)
+        GET /api/images/{id}/exif/
+
+        분석 결과의 metadata 에는 허용 목록의 태그만 있으므로 나머지 태그가 필요할 때 사용합니다.
+        """
+        instance = self.get_object()
+        try:
+            raw = ImageExif.load_for(instance, _read_raw_exif)
+        except (OSError, ValueError):
+            return Response({'error': '원본 파일을 읽을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'id': instance.pk, 'exif': exif_to_dict(raw)})
+
+    @action(detail=False, methods=['get'])
+    def by_color(self, request):
+        """
+        색상으로 이미지 찾기 (기준 색에 가까운 색이 차지하는 비율이 큰 순서)
+        GET /api/images/by_color/?color=1e40af&tolerance=20&min_share=0.2&limit=20
+        """
+        try:
+            rgb = parse_color(request.query_params.get('color', ''))
+        except ValueError:
+            return Response(
+                {'error': 'color 는 16진수 RGB 값이어야 합니다. (예: 1e40af)'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            tolerance = float(request.query_params.get('tolerance', get_default_tolerance()))
+            min_share = float(request.query_params.get('min_share', get_default_share()))
+            limit = int(request.query_params.get('limit', get_color_limit()))
+        except ValueError:
+            return Response(
+                {'error': 'tolerance, min_share 는 숫자, limit 은 정수여야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        tolerance = max(0.0, min(tolerance, get_max_tolerance()))
+        min_share = max(0.01, min(min_share, 1.0))
+        limit = max(1, min(limit, get_color_limit()))
+
+        matches = find_by_color(ImageColor.objects.all(), rgb, tolerance, min_share, limit)
+        images = UploadedImage.objects.defer('analysis_result').in_bulk([pk for pk, _ in matches])
+        matches = [(images[pk], share) for pk, share in matches if pk in images]
+
+        serializer = UploadedImageListSerializer(
+            [image for image, _ in matches], many=True, context=self.get_serializer_context()
+        )
+        results = []
+        for data, (_, share) in zip(serializer.data, matches):
+            data['color_share'] = share
+            results.append(data)
+
+        return Response({
+            'color': '#{:02x}{:02x}{:02x}'.format(*rgb),
+            'tolerance': tolerance,
+            'min_share': min_share,
+            'results': results,
+        })
+
+    @action(detail=False, methods=['get'])
+    def cache_stats(self, request):
+        """
+        분석 결과 캐시 적중/실패 통계 (현재 프로세스 기준)
+        GET /api/images/cache_stats/
+        """
+        return Response(analysis_cache.get_stats())
+
+    @action(detail=False, methods=['get'])
+    def upload_stats(self, request):
+        """
+        디코드 전에 헤더 검사로 거절한 업로드 통계 (현재 프로세스 기준)
+        GET /api/images/upload_stats/
+        """
+        return Response(rejection_stats.get_stats())
+
     def list(self, request, *args, **kwargs):
-        """업로드된 이미지 목록 조회"""
+        """
+        업로드된 이미지 목록 조회 (최신순, 키셋 페이지네이션)
+        GET /api/images/?page_size=50&cursor=...&fields=id,file_name
+        """
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     def retrieve(self, request, *args, **kwargs):
         """특정 이미지 상세 조회"""
@@ -202,20 +551,123 @@ class ImageAnalysisViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-@api_view(['POST'])
-def spotify_recommend(request):
+def _get_request_data(request):
+    """JSON 또는 폼 요청 본문을 dict 로 반환합니다."""
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return {}
+        return data if isinstance(data, dict) else {}
+    return request.POST
+
+
+@require_GET
+def image_thumbnail(request, pk, size, fmt):
     """
-    Spotify 음악 추천 API
+    썸네일(파생 이미지) 조회
+    GET /api/images/{id}/thumbnail/{size}/{format}/
+
+    없는 크기는 처음 요청될 때 만들어 derivatives/<내용 해시>/ 에 저장하고,
+    ETag/Last-Modified 로 조건부 요청(304)을 지원합니다.
+    """
+    instance = UploadedImage.objects.filter(pk=pk).only('id', 'image', 'content_hash').first()
+    if instance is None or not instance.image:
+        raise Http404('이미지를 찾을 수 없습니다.')
+
+    try:
+        name = get_derivative(instance.image.name, instance.content_hash, size, fmt)
+    except OSError:
+        raise Http404('원본 이미지 파일을 찾을 수 없습니다.')
+    if name is None:
+        raise Http404('지원하지 않는 썸네일 크기 또는 포맷입니다.')
+
+    # 파생 이미지 내용은 원본 내용, 크기, 포맷으로 정해짐
+    etag = quote_etag(f'{instance.content_hash[:16] or instance.pk}-{size}{get_sizes()[size]}-{fmt}')
+    last_modified = int(default_storage.get_modified_time(name).timestamp())
+    max_age = getattr(settings, 'IMAGE_THUMBNAIL_MAX_AGE', 60 * 60 * 24 * 30)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = FileResponse(default_storage.open(name, 'rb'), content_type=FORMATS[fmt][1])
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = f'public, max-age={max_age}'
+    return response
+
+
+@csrf_exempt
+@require_POST
+async def spotify_recommend(request):
+    """
+    Spotify 음악 추천 API (비동기 뷰)
     POST /api/spotify/recommend/
-    Body: { "category": "bright_warm" }
+    Body: { "category": "bright_warm" } 또는 { "image_id": 1 }
+
+    image_id 를 주면 서버에 저장된 이미지의 분위기 카테고리를 사용합니다.
+    ASGI(uvicorn/daphne)에서는 업스트림 호출을 기다리는 동안 워커를 점유하지 않습니다.
     """
-    category = request.data.get('category', 'balanced')
+    data = _get_request_data(request)
+    category = data.get('category', 'balanced')
+
+    image_id = data.get('image_id')
+    if image_id is not None:
+        try:
+            mood = await UploadedImage.objects.filter(pk=int(image_id)).values_list('mood', flat=True).afirst()
+        except (TypeError, ValueError):
+            return JsonResponse(
+                {'error': '잘못된 image_id 입니다.'},
+                status=status.HTTP_400_BAD_REQUEST,
+                json_dumps_params={'ensure_ascii': False}
+            )
+        if mood is None:
+            return JsonResponse(
+                {'error': '이미지를 찾을 수 없습니다.'},
+                status=status.HTTP_404_NOT_FOUND,
+                json_dumps_params={'ensure_ascii': False}
+            )
+        # 분석이 끝나지 않아 분위기가 없으면 요청의 category 사용
+        category = mood or category
 
     try:
-        track = spotify_service.get_recommendations(category)
-        return Response(track, status=status.HTTP_200_OK)
+        track = await aget_recommendation(category)
+        return JsonResponse(track, status=status.HTTP_200_OK, json_dumps_params={'ensure_ascii': False})
     except Exception as e:
-        return Response(
+        return JsonResponse(
             {'error': str(e), 'message': '음악 추천에 실패했습니다.'},
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            json_dumps_params={'ensure_ascii': False}
         )
+
+
+def get_metrics_enabled():
+    return getattr(settings, 'IMAGE_METRICS_ENABLED', settings.DEBUG)
+
+
+def _check_metrics_access(request):
+    """운영 통계는 IMAGE_METRICS_ENABLED 이거나 staff 사용자일 때만 보여 줍니다. (아니면 404 로 숨김)"""
+    user = getattr(request, 'user', None)
+    if not (get_metrics_enabled() or (user is not None and user.is_staff)):
+        raise Http404()
+
+
+@api_view(['GET'])
+def spotify_stats(request):
+    """
+    Spotify HTTP 클라이언트 및 트랙 풀 통계 (현재 프로세스 기준)
+    GET /api/spotify/stats/
+    """
+    _check_metrics_access(request)
+    stats = spotify_service.get_http_stats()
+    stats['track_pool'] = spotify_service.track_pool.get_stats()
+    return Response(stats, status=status.HTTP_200_OK)
+
+
+@require_GET
+def metrics(request):
+    """
+    단계별/뷰별 처리 시간 히스토그램 (Prometheus 텍스트 형식, 현재 프로세스 기준)
+    GET /api/metrics/
+    """
+    _check_metrics_access(request)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
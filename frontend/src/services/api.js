@@ -30,9 +30,9 @@ export const imageApi = {
     return response.data;
   },
 
-  // 이미지 목록 조회
-  getImages: async () => {
-    const response = await api.get('/images/');
+  // 이미지 목록 조회 (최신순, { next, results } 형태. 다음 페이지는 next URL 사용)
+  getImages: async (nextUrl = null) => {
+    const response = nextUrl ? await api.get(nextUrl) : await api.get('/images/');
     return response.data;
   },
 };